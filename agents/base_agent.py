@@ -1,33 +1,165 @@
 from abc import ABC, abstractmethod
+import hashlib
+import inspect
 import json
-from pathlib import Path
+import time
+from utils.artifact_store import get_artifact_store
+from utils.llm_cache import get_llm_cache
+from utils.model_router import get_model_router
+from utils.scheduler import get_scheduler
+from utils.tokens import cached_prompt_tokens, estimate_tokens, prompt_fingerprint
+from utils.tracing import current_run_id, get_tracer
 
 class BaseAgent(ABC):
+    # Bump when the agent's prompt template changes so stale cached responses are not reused
+    PROMPT_VERSION = "1"
+    # Ask for a JSON object response from models that support it
+    JSON_RESPONSE = False
+
     def __init__(self, name):
         self.name = name
-        self.output_dir = Path("data") / name
-        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.artifacts = get_artifact_store()
+        self.cache = get_llm_cache()
+        self.tracer = get_tracer()
+        self.scheduler = get_scheduler()
+        self.router = get_model_router()
 
     @abstractmethod
     def process(self, input_data):
         """Process the input data and return the result"""
         pass
 
-    def save_output(self, data, filename):
-        """Save the output data for debugging"""
-        output_path = self.output_dir / filename
-        with open(output_path, 'w', encoding='utf-8') as f:
-            if isinstance(data, (dict, list)):
-                json.dump(data, f, indent=2)
+    def fingerprint(self):
+        """Hash of what shapes this agent's output: model settings, prompt version and the prompts' source.
+
+        Editing a prompt in the agent's module changes the fingerprint, so results
+        cached under the old prompt stop matching.
+        """
+        llm = getattr(self, "llm", None)
+        try:
+            source = inspect.getsource(inspect.getmodule(type(self)))
+        except (OSError, TypeError):
+            source = ""
+        payload = json.dumps([
+            type(self).__name__,
+            self.PROMPT_VERSION,
+            getattr(llm, "model_name", None),
+            getattr(llm, "temperature", None),
+            self.router.fingerprint(self.name),
+            source
+        ])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _cache_key(self, messages, model):
+        return self.cache.make_key(
+            model,
+            self.llm.temperature,
+            f"{self.name}:{self.PROMPT_VERSION}",
+            messages
+        )
+
+    @staticmethod
+    def prompt_prefix(messages):
+        """Fingerprint of the static prompt prefix: the leading system messages.
+
+        Requests with the same prefix can be served from the provider's prompt cache,
+        so agents keep per-request values out of their system prompts.
+        """
+        prefix = []
+        for message in messages:
+            if message.type != "system":
+                break
+            prefix.append(message.content)
+        return prompt_fingerprint(*prefix)
+
+    def route(self, messages):
+        """Models to try for these messages, chosen by the router, or just the agent's own model"""
+        estimated = sum(estimate_tokens(m.content) for m in messages)
+        return self.router.route(self.name, estimated) or [self.llm.model_name]
+
+    def _call_kwargs(self, model):
+        kwargs = {"model": model}
+        if self.JSON_RESPONSE and self.router.supports_json_mode(model):
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def invoke_llm(self, messages, validate=None, models=None):
+        """Send messages to the agent's LLM and return the content, reusing cached responses.
+
+        ``models`` defaults to the routed models. A response rejected by ``validate``
+        is not cached, and the request is retried on the next, bigger model; if every
+        model fails validation the last response is returned.
+        """
+        models = models or self.route(messages)
+        estimated = sum(estimate_tokens(m.content) for m in messages)
+        for attempt, model in enumerate(models):
+            with self.tracer.span(self.name, model=model) as span:
+                span["prompt_prefix"] = self.prompt_prefix(messages)
+                key = self._cache_key(messages, model)
+                content = self.cache.get(key)
+                if content is not None:
+                    span["cache_hit"] = True
+                    return content
+
+                kwargs = self._call_kwargs(model)
+                result = self.scheduler.call(lambda: self.llm.generate([messages], **kwargs), tokens=estimated, span=span)
+                content = result.generations[0][0].message.content
+                usage = (result.llm_output or {}).get("token_usage", {})
+                span["prompt_tokens"] = usage.get("prompt_tokens", 0)
+                span["cached_prompt_tokens"] = cached_prompt_tokens(usage)
+                span["completion_tokens"] = usage.get("completion_tokens", 0)
+                self.scheduler.record_usage(estimated, usage.get("total_tokens", 0))
+                if validate is None or validate(content):
+                    self.cache.set(key, content)
+                    return content
+                span["error"] = "validation failed"
+            if attempt + 1 < len(models):
+                print(f"{self.name}: response from {model} failed validation, retrying with {models[attempt + 1]}")
+        return content
+
+    def stream_llm(self, messages, model=None, validate=None):
+        """Yield the LLM response in chunks as they arrive, caching the full text at the end.
+
+        ``model`` defaults to the routed model. A cached response is yielded as a
+        single chunk, so the joined result always matches what invoke_llm returns
+        for the same messages. As in invoke_llm, a response rejected by ``validate``
+        is not cached (and a cached one it rejects is requested again).
+        """
+        model = model or self.route(messages)[0]
+        with self.tracer.span(self.name, model=model) as span:
+            span["prompt_prefix"] = self.prompt_prefix(messages)
+            key = self._cache_key(messages, model)
+            content = self.cache.get(key)
+            if content is not None and (validate is None or validate(content)):
+                span["cache_hit"] = True
+                yield content
+                return
+
+            # Streaming responses carry no usage block, so token counts are estimated
+            # and prompt cache hits are not known
+            estimated = sum(estimate_tokens(m.content) for m in messages)
+            kwargs = self._call_kwargs(model)
+            started = time.perf_counter()
+            chunks = []
+            for chunk in self.scheduler.stream(lambda: self.llm.stream(messages, **kwargs), tokens=estimated, span=span):
+                if chunk.content:
+                    if not chunks:
+                        span["first_token_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            content = "".join(chunks)
+            span["prompt_tokens"] = estimated
+            span["completion_tokens"] = estimate_tokens(content)
+            self.scheduler.record_usage(estimated, estimated + span["completion_tokens"])
+            if validate is None or validate(content):
+                self.cache.set(key, content)
             else:
-                f.write(str(data))
-
-    def load_output(self, filename):
-        """Load previously saved output"""
-        output_path = self.output_dir / filename
-        if output_path.exists():
-            with open(output_path, 'r', encoding='utf-8') as f:
-                if filename.endswith('.json'):
-                    return json.load(f)
-                return f.read()
-        return None
+                span["error"] = "validation failed"
+
+    def save_output(self, data, filename):
+        """Save the output data for debugging under the current run; the write happens in the background"""
+        self.artifacts.put(current_run_id(), self.name, filename, data)
+
+    def load_output(self, filename, run_id=None):
+        """Load output saved in a run, by default the current one (or the latest outside a run)"""
+        return self.artifacts.get(run_id or current_run_id(), self.name, filename)
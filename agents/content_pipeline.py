@@ -0,0 +1,191 @@
+import hashlib
+from utils.pipeline import Pipeline, Stage
+from utils.result_cache import is_degraded
+
+# Per-stage timeouts in seconds, None for no limit
+STAGE_TIMEOUTS = {
+    "transcript": 60,
+    "seo": None,
+    "article": None,
+    "edited_article": None,
+    "social": None,
+}
+
+
+def _load_transcript(agent, source):
+    result = agent.load(source)
+    stats = {k: v for k, v in result.items() if k != "text"}
+    return {"transcript": result["text"], "normalization": stats}
+
+
+def _analyze_seo(agent, transcript, emit):
+    """Run SEO analysis, publishing the core fields as seo_core as soon as they stream in"""
+    core = {}
+
+    def on_core(fields):
+        core.update(fields)
+        emit(seo_core=fields)
+
+    seo = agent.analyze(transcript, on_core=on_core)
+    return {"seo_core": core, "seo": seo}
+
+
+def _sum_timeouts(*timeouts):
+    """Combine the timeouts of merged stages, None if any of them is unlimited"""
+    return None if None in timeouts else sum(timeouts)
+
+
+def draft_and_edit(journalist, editor, transcript, seo, watch=None):
+    """Stream the draft straight into the editor so paragraphs are edited while later ones are written.
+
+    ``watch`` may wrap the draft chunk iterator, e.g. to display the draft as it streams.
+    """
+    draft = []
+
+    def chunks():
+        for chunk in journalist.stream_article(transcript, seo):
+            draft.append(chunk)
+            yield chunk
+
+    edited = editor.edit_as_streamed(chunks() if watch is None else watch(chunks()))
+    return {"article": "".join(draft), "edited_article": edited}
+
+
+def build_content_pipeline(agents, social_from_draft=False, incremental_edit=False, overlap_edit=False,
+                           max_workers=4, timeouts=None):
+    """Build the Transcript -> SEO -> Journalist -> Editor -> Social stage graph.
+
+    With social_from_draft the social posts are written from the unedited draft,
+    so they run concurrently with editing instead of after it. With
+    incremental_edit the editor works paragraph by paragraph and reuses earlier
+    edits of unchanged paragraphs. With overlap_edit drafting and editing run as
+    one "draft_and_edit" stage that edits each paragraph as soon as it is written.
+    """
+    timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+    social_input = "article" if social_from_draft else "edited_article"
+    edit = agents["editor"].edit_incremental if incremental_edit else agents["editor"].edit
+
+    if overlap_edit:
+        writing = [
+            Stage("draft_and_edit",
+                  lambda transcript, seo_core: draft_and_edit(agents["journalist"], agents["editor"], transcript, seo_core),
+                  inputs=["transcript", "seo_core"], outputs=["article", "edited_article"],
+                  timeout=_sum_timeouts(timeouts["article"], timeouts["edited_article"])),
+        ]
+    else:
+        writing = [
+            Stage("article", lambda transcript, seo_core: agents["journalist"].write_article(transcript, seo_core),
+                  inputs=["transcript", "seo_core"], timeout=timeouts["article"]),
+            Stage("edited_article", lambda article: edit(article),
+                  inputs=["article"], timeout=timeouts["edited_article"]),
+        ]
+
+    return Pipeline([
+        Stage("transcript", lambda source: _load_transcript(agents["transcript"], source),
+              inputs=["source"], outputs=["transcript", "normalization"], timeout=timeouts["transcript"]),
+        Stage("seo", lambda transcript, emit: _analyze_seo(agents["seo"], transcript, emit),
+              inputs=["transcript"], outputs=["seo_core", "seo"], emits=["seo_core"], timeout=timeouts["seo"]),
+        *writing,
+        Stage("social", lambda seo, **content: agents["social"].generate_posts(content[social_input], seo),
+              inputs=[social_input, "seo"], timeout=timeouts["social"]),
+    ], max_workers=max_workers)
+
+
+def output_fingerprints(agents, social_from_draft=False, incremental_edit=False, overlap_edit=False):
+    """Fingerprint each pipeline output by the agents and options that produce it and everything upstream"""
+    def chain(*parts):
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+    transcript = chain("transcript", agents["transcript"].fingerprint())
+    seo = chain(transcript, agents["seo"].fingerprint())
+    article = chain(seo, agents["journalist"].fingerprint())
+    edit_mode = "overlap" if overlap_edit else "incremental" if incremental_edit else "full"
+    edited_article = chain(article, agents["editor"].fingerprint(), edit_mode)
+    social = chain(article if social_from_draft else edited_article, agents["social"].fingerprint())
+    return {
+        "transcript": transcript,
+        "normalization": transcript,
+        "seo_core": seo,
+        "seo": seo,
+        "article": article,
+        "edited_article": edited_article,
+        "social": social
+    }
+
+
+def reuse_near_duplicate(agents, index, cache, fingerprints, source_key, transcript, on_match=None):
+    """Find an already processed near-duplicate of a transcript and return the outputs to take from it.
+
+    Returns (match, outputs), or (None, {}) when there is no usable match;
+    ``on_match(match)`` is called once a usable match is found. Depending
+    on the index policy the stored SEO data, article, edit and social posts are
+    reused as they are, or the SEO data is reused and the stored article adapted
+    to the new transcript in a single call.
+    """
+    signature = index.signature(transcript)
+    matches = index.query(signature, exclude=source_key)
+    index.add(source_key, signature)
+
+    for match_key, similarity in matches:
+        stored = cache.get_many(match_key, fingerprints)
+        if not all(output in stored for output in ("seo_core", "seo", "edited_article")):
+            continue  # still running, or produced by older prompts
+        mode = index.mode(similarity)
+        match = {"source_key": match_key, "similarity": round(similarity, 3), "mode": mode}
+        if on_match:
+            on_match(match)
+        if mode == "reuse":
+            outputs = {o: stored[o] for o in ("seo_core", "seo", "article", "edited_article", "social") if o in stored}
+        else:
+            adapted = agents["journalist"].adapt_article(stored["edited_article"], transcript, stored["seo"])
+            outputs = {"seo_core": stored["seo_core"], "seo": stored["seo"],
+                       "article": adapted, "edited_article": adapted}
+        return match, outputs
+    return None, {}
+
+
+def run_cached(pipeline, agents, source, fingerprints, cache, values=None, on_cached=None, on_stage_done=None,
+               near_duplicates=None, **run_kwargs):
+    """Run the pipeline, seeding it with outputs cached for this source and storing new ones.
+
+    Outputs already in ``values`` take precedence over cached ones. ``on_cached``
+    is called with the cached outputs used before the remaining stages run,
+    since no stage callbacks fire for them. With a ``near_duplicates`` index the
+    transcript is loaded first, and outputs of a near-duplicate video are reused
+    as a "near_duplicate" stage before the LLM stages run.
+    """
+    source_key = agents["transcript"].source_key(source)
+    values = values or {}
+    cached = {k: v for k, v in cache.get_many(source_key, fingerprints).items() if k not in values}
+    if on_cached and cached:
+        on_cached(cached)
+
+    stage_inputs = {stage.name: stage.inputs for stage in pipeline.stages}
+    degraded = set()
+
+    def store(name, outputs):
+        # A stage that fell back on a placeholder, or worked from one, is run again next time,
+        # so none of its outputs are kept
+        if any(is_degraded(value) for value in outputs.values()) or degraded & set(stage_inputs.get(name, [])):
+            degraded.update(outputs)
+        else:
+            for output, value in outputs.items():
+                if output in fingerprints:
+                    cache.put(source_key, output, fingerprints[output], value)
+        if on_stage_done:
+            on_stage_done(name, outputs)
+
+    values = {"source": source, **cached, **values}
+    remaining = [o for s in pipeline.stages for o in s.outputs if o not in values]
+    if near_duplicates is not None and near_duplicates.enabled and set(remaining) - {"transcript", "normalization"}:
+        values = pipeline.run(values, on_stage_done=store, targets=["transcript"], **run_kwargs)
+        on_stage_start = run_kwargs.get("on_stage_start")
+        match, reused = reuse_near_duplicate(
+            agents, near_duplicates, cache, fingerprints, source_key, values["transcript"],
+            on_match=lambda match: on_stage_start and on_stage_start("near_duplicate")
+        )
+        reused = {k: v for k, v in reused.items() if k not in values}
+        if match:
+            store("near_duplicate", {"near_duplicate": match, **reused})
+            values.update(near_duplicate=match, **reused)
+    return pipeline.run(values, on_stage_done=store, **run_kwargs)
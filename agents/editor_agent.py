@@ -1,14 +1,37 @@
 from .base_agent import BaseAgent
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+from langchain.schema.messages import HumanMessage
+from concurrent.futures import ThreadPoolExecutor
+from utils.http_clients import get_openai_client
+import contextvars
+import re
+
+PARAGRAPH_PROMPT = """You are a senior editor at The New York Times.
+            You are editing one paragraph of a longer article. Edit it to ensure it:
+            1. Maintains The New York Times style and tone
+            2. Has clear and concise language
+            3. Uses proper grammar and punctuation
+            4. Flows naturally from the paragraph before it
+            5. Maintains journalistic integrity
+
+            The surrounding paragraphs are context only and must not be returned.
+            Return only the edited paragraph."""
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def split_paragraphs(text):
+    """Split text into non-empty paragraphs on blank lines"""
+    return [p.strip() for p in _PARAGRAPH_BREAK.split(text) if p.strip()]
 
 class EditorAgent(BaseAgent):
+    MAX_WORKERS = 4
+
     def __init__(self):
         super().__init__("editor_agent")
-        self.llm = ChatOpenAI(temperature=0.3)  # Lower temperature for more consistent editing
+        self.llm = ChatOpenAI(temperature=0.3, client=get_openai_client().chat.completions)  # Lower temperature for more consistent editing
 
-    def edit(self, article):
-        """Edit the article to meet New York Times standards"""
+    def _build_messages(self, article):
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a senior editor at The New York Times.
             Review and edit the article to ensure it meets the following criteria:
@@ -23,13 +46,122 @@ class EditorAgent(BaseAgent):
             ("user", "{article}")
         ])
 
-        chain = prompt | self.llm
-        edited = chain.invoke({"article": article})
+        return prompt.format_messages(article=article)
+
+    def edit(self, article):
+        """Edit the article to meet New York Times standards"""
+        edited = self.invoke_llm(self._build_messages(article))
         
         # Save the edited article for debugging
-        self.save_output(edited.content, "edited_article.txt")
+        self.save_output(edited, "edited_article.txt")
         
-        return edited.content
+        return edited
+
+    def stream_edit(self, article):
+        """Yield the edited article in chunks as it is generated"""
+        chunks = []
+        for chunk in self.stream_llm(self._build_messages(article)):
+            chunks.append(chunk)
+            yield chunk
+
+        self.save_output("".join(chunks), "edited_article.txt")
+
+    def _paragraph_memo_key(self, paragraph):
+        return self.cache.make_key(
+            self.llm.model_name,
+            self.llm.temperature,
+            f"{self.name}:paragraph-memo:{self.PROMPT_VERSION}:{self.router.fingerprint(self.name)}",
+            [HumanMessage(content=paragraph)]
+        )
+
+    def edit_paragraph(self, paragraph, previous=None, following=None):
+        """Edit one paragraph, using its neighbours as read-only context.
+
+        Edits are remembered per paragraph text, so an unchanged paragraph is
+        never sent again even when its neighbours change.
+        """
+        memo_key = self._paragraph_memo_key(paragraph)
+        edited = self.cache.get(memo_key)
+        if edited is not None:
+            return edited
+
+        parts = []
+        if previous:
+            parts.append(f"Previous paragraph (context only):\n{previous}")
+        parts.append(f"Paragraph to edit:\n{paragraph}")
+        if following:
+            parts.append(f"Next paragraph (context only):\n{following}")
+        prompt = ChatPromptTemplate.from_messages([("system", PARAGRAPH_PROMPT), ("user", "{content}")])
+        edited = self.invoke_llm(prompt.format_messages(content="\n\n".join(parts))).strip()
+        self.cache.set(memo_key, edited)
+        return edited
+
+    def edit_incremental(self, article):
+        """Edit the article paragraph by paragraph, only sending paragraphs not edited before.
+
+        Re-editing a revised draft therefore costs in proportion to what changed.
+        """
+        paragraphs = split_paragraphs(article)
+        with self.tracer.span(f"{self.name}:incremental", model=self.llm.model_name) as span:
+            edited = {}
+            for i, paragraph in enumerate(paragraphs):
+                memo = self.cache.get(self._paragraph_memo_key(paragraph))
+                if memo is not None:
+                    edited[i] = memo
+            pending = [i for i in range(len(paragraphs)) if i not in edited]
+            span["paragraphs"] = len(paragraphs)
+            span["paragraphs_edited"] = len(pending)
+            span["cache_hit"] = not pending
+
+            def edit_at(i):
+                previous = paragraphs[i - 1] if i > 0 else None
+                following = paragraphs[i + 1] if i + 1 < len(paragraphs) else None
+                return self.edit_paragraph(paragraphs[i], previous, following)
+
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+                # Copy the caller's context so paragraph calls are traced under the same run
+                futures = {i: pool.submit(contextvars.copy_context().run, edit_at, i) for i in pending}
+                edited.update({i: f.result() for i, f in futures.items()})
+            edited = "\n\n".join(edited[i] for i in range(len(paragraphs)))
+
+        # Save the edited article for debugging
+        self.save_output(edited, "edited_article.txt")
+
+        return edited
+
+    def edit_as_streamed(self, chunks):
+        """Edit a draft while it is still being streamed and return the edited article.
+
+        Each paragraph is handed to an editor worker as soon as the blank line
+        after it arrives, so editing overlaps with writing and finishes about one
+        paragraph edit after the draft does. Paragraphs are reassembled in order.
+        """
+        with self.tracer.span(f"{self.name}:overlap", model=self.llm.model_name) as span:
+            futures = []
+            previous = None
+            buffer = ""
+            with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+                def submit(paragraph):
+                    nonlocal previous
+                    paragraph = paragraph.strip()
+                    if paragraph:
+                        # Copy the caller's context so paragraph calls are traced under the same run
+                        futures.append(pool.submit(contextvars.copy_context().run, self.edit_paragraph, paragraph, previous))
+                        previous = paragraph
+
+                for chunk in chunks:
+                    buffer += chunk
+                    *complete, buffer = _PARAGRAPH_BREAK.split(buffer)
+                    for paragraph in complete:
+                        submit(paragraph)
+                submit(buffer)
+                edited = "\n\n".join(f.result() for f in futures)
+            span["paragraphs"] = len(futures)
+
+        # Save the edited article for debugging
+        self.save_output(edited, "edited_article.txt")
+
+        return edited
 
     def process(self, input_data):
         return self.edit(input_data)
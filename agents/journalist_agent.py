@@ -1,43 +1,80 @@
 from .base_agent import BaseAgent
 from langchain.chat_models import ChatOpenAI
 from langchain.schema.messages import HumanMessage, SystemMessage
+from utils.http_clients import get_openai_client
+
+# Static system prompts; per-request values go in the user message after the transcript,
+# so every request shares the same cacheable prefix
+SYSTEM_PROMPT = """You are a professional journalist writing for The New York Times.
+        Write an informative article based on the provided transcript and SEO requirements.
+
+        Requirements:
+        1. Use the given keywords naturally
+        2. Follow journalistic best practices and NYT style
+        3. Make the content engaging and informative
+        4. Include relevant quotes from the transcript
+        5. Target the given user intent
+        6. Keep the tone professional and authoritative
+        7. Use the given title"""
+
+ADAPT_PROMPT = """You are a professional journalist writing for The New York Times.
+        The article you are given was written from another upload of nearly the same video.
+        Update it so that it is accurate for the new transcript: correct names, numbers,
+        quotes and details that differ, and add or remove passages only where the content differs.
+        Keep everything else, including the title, structure and style, unchanged.
+        Return only the updated article."""
 
 class JournalistAgent(BaseAgent):
+    PROMPT_VERSION = "2"
+
     def __init__(self):
         super().__init__("journalist_agent")
-        self.llm = ChatOpenAI(temperature=0.7)
+        self.llm = ChatOpenAI(temperature=0.7, client=get_openai_client().chat.completions)
 
-    def write_article(self, transcript, seo_data):
-        """Write an article based on the transcript and SEO recommendations"""
+    def _build_messages(self, transcript, seo_data):
         # Format keywords and user intent
         keywords_str = ", ".join(seo_data["keywords"]) if isinstance(seo_data["keywords"], list) else seo_data["keywords"]
         user_intent_str = ", ".join(seo_data["user_intent"]) if isinstance(seo_data["user_intent"], list) else seo_data["user_intent"]
 
-        system_prompt = f"""You are a professional journalist writing for The New York Times.
-        Write an informative article based on the provided transcript and SEO requirements.
-        
-        Requirements:
-        1. Use these keywords naturally: {keywords_str}
-        2. Follow journalistic best practices and NYT style
-        3. Make the content engaging and informative
-        4. Include relevant quotes from the transcript
-        5. Target this user intent: {user_intent_str}
-        6. Keep the tone professional and authoritative
-        
-        Title: {seo_data["title"]}"""
-
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Write an article based on this transcript: {transcript}")
+        return [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=(
+                f"Write an article based on this transcript: {transcript}\n\n"
+                f"Keywords: {keywords_str}\n"
+                f"User intent: {user_intent_str}\n"
+                f"Title: {seo_data['title']}"
+            ))
         ]
 
-        # Generate the article
-        article = self.llm.invoke(messages)
+    def write_article(self, transcript, seo_data):
+        """Write an article based on the transcript and SEO recommendations"""
+        article = self.invoke_llm(self._build_messages(transcript, seo_data))
 
         # Save the article for debugging
-        self.save_output(article.content, "article.txt")
+        self.save_output(article, "article.txt")
         
-        return article.content
+        return article
+
+    def adapt_article(self, article, transcript, seo_data):
+        """Update an article written from a near-duplicate video so that it matches this transcript"""
+        article = self.invoke_llm([
+            SystemMessage(content=ADAPT_PROMPT),
+            HumanMessage(content=f"Title: {seo_data['title']}\n\nArticle:\n{article}\n\nNew transcript: {transcript}")
+        ])
+
+        # Save the article for debugging
+        self.save_output(article, "article.txt")
+
+        return article
+
+    def stream_article(self, transcript, seo_data):
+        """Yield the article in chunks as it is generated"""
+        chunks = []
+        for chunk in self.stream_llm(self._build_messages(transcript, seo_data)):
+            chunks.append(chunk)
+            yield chunk
+
+        self.save_output("".join(chunks), "article.txt")
 
     def process(self, input_data):
         transcript, seo_data = input_data
@@ -0,0 +1,50 @@
+import importlib
+import threading
+
+# Agent modules pull in langchain, openai and the YouTube client, so they are
+# only imported when an agent is first needed
+AGENT_CLASSES = {
+    "transcript": ("agents.transcript_agent", "TranscriptAgent"),
+    "seo": ("agents.seo_agent", "SEOAgent"),
+    "journalist": ("agents.journalist_agent", "JournalistAgent"),
+    "editor": ("agents.editor_agent", "EditorAgent"),
+    "social": ("agents.social_media_agent", "SocialMediaAgent"),
+}
+
+_agents = {}
+_lock = threading.Lock()
+
+
+def get_agent_class(name):
+    """Import and return the class registered under name"""
+    module, cls = AGENT_CLASSES[name]
+    return getattr(importlib.import_module(module), cls)
+
+
+def get_agent(name):
+    """Return the process-wide instance of the named agent, creating it on first use"""
+    agent = _agents.get(name)
+    if agent is None:
+        with _lock:
+            agent = _agents.get(name)
+            if agent is None:
+                agent = get_agent_class(name)()
+                _agents[name] = agent
+    return agent
+
+
+def get_agents():
+    """Return every agent keyed by registry name"""
+    return {name: get_agent(name) for name in AGENT_CLASSES}
+
+
+def warm_up(connect=False):
+    """Construct all agents and optionally open a pooled connection to the API ahead of the first request"""
+    agents = get_agents()
+    if connect:
+        from utils.http_clients import get_openai_client
+        try:
+            get_openai_client().models.list()
+        except Exception as e:
+            print(f"Connection warm-up failed: {str(e)}")
+    return agents
@@ -1,67 +1,284 @@
 from .base_agent import BaseAgent
 from langchain.chat_models import ChatOpenAI
 from langchain.schema.messages import HumanMessage, SystemMessage
+from utils.http_clients import get_openai_client
 from slugify import slugify
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from utils import keywords
+from utils.json_stream import JSONFieldStream, repair_json
+from utils.keywords import extract_keywords, extract_keywords_batch
+from utils.result_cache import DegradedOutput
+from utils.tokens import estimate_tokens, split_into_windows
+import contextvars
+import hashlib
+import inspect
 import json
+import os
 
-class SEOAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("seo_agent")
-        self.llm = ChatOpenAI(temperature=0.7)
+SYSTEM_PROMPT = """You are an SEO expert. Analyze the content and provide SEO recommendations.
+        Return your response in the following JSON format, with the fields in this order:
+        {
+            "title": "SEO optimized title",
+            "keywords": ["keyword1", "keyword2", "etc"],
+            "user_intent": ["search intent1", "search intent2", "etc"],
+            "tldr_points": ["point1", "point2", "etc"],
+            "meta_description": "Compelling meta description"
+        }"""
 
-    def analyze(self, content):
-        """Analyze content and generate SEO recommendations"""
-        system_prompt = """You are an SEO expert. Analyze the content and provide SEO recommendations.
-        Return your response in the following JSON format:
+SEEDED_PROMPT = """You are an SEO expert. Analyze the content and provide SEO recommendations.
+        Candidate keywords have already been extracted from the content; prefer them where they fit.
+        Return your response in the following JSON format, with the fields in this order:
         {
             "title": "SEO optimized title",
-            "meta_description": "Compelling meta description",
+            "keywords": ["keyword1", "keyword2", "etc"],
+            "user_intent": ["search intent1", "search intent2", "etc"],
+            "meta_description": "Compelling meta description"
+        }"""
+
+# llm: the model writes everything; seeded: local keyword candidates go into a shorter prompt and
+# the TLDR comes from local sentence candidates; fast: no model call at all
+MODES = ("llm", "seeded", "fast")
+
+# Fields the journalist needs, requested first so writing can start before the rest arrives
+CORE_FIELDS = ("title", "keywords", "user_intent")
+
+WINDOW_PROMPT = """You are an SEO expert. You are given one section of a longer video transcript.
+        Extract the SEO signals from this section only.
+        Return your response in the following JSON format:
+        {
+            "title": "Working title for this section",
             "keywords": ["keyword1", "keyword2", "etc"],
             "tldr_points": ["point1", "point2", "etc"],
             "user_intent": ["search intent1", "search intent2", "etc"]
         }"""
 
-        messages = [
-            SystemMessage(content=system_prompt),
-            HumanMessage(content=f"Analyze this content: {content}")
-        ]
+class SEOAgent(BaseAgent):
+    # Transcripts estimated above this many tokens are analyzed in windows and merged
+    CHUNK_TOKENS = 6000
+    WINDOW_OVERLAP_TOKENS = 200
+    MAX_WORKERS = 4
+    # Ask for a JSON object via the API's structured output mode; turn off for models without it
+    JSON_RESPONSE = os.getenv("SEO_JSON_MODE", "on").lower() not in ("0", "off", "false")
+
+    def __init__(self, mode=None):
+        super().__init__("seo_agent")
+        self.mode = (mode or os.getenv("SEO_MODE", "llm")).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown SEO mode '{self.mode}', expected one of {', '.join(MODES)}")
+        self.llm = ChatOpenAI(temperature=0.7, client=get_openai_client().chat.completions)
+
+    def analyze(self, content, on_core=None):
+        """Analyze content and generate SEO recommendations.
+
+        The reply is streamed and parsed as it arrives. ``on_core`` is called with
+        the title, keywords and user intent as soon as all three are complete,
+        before the TLDR and meta description have been written.
+        """
+        reported = []
+
+        def report(core):
+            # Downstream work may already be using the first report, so never send a second
+            if on_core and not reported:
+                reported.append(core)
+                on_core(core)
+
+        if self.mode == "fast":
+            seo_data = self._finalize(self.local_seo(extract_keywords(content)))
+        elif estimate_tokens(content) > self.CHUNK_TOKENS:
+            seo_data = self.analyze_chunked(content)
+        elif self.mode == "seeded":
+            seo_data = self._finalize(self.analyze_seeded(content, report))
+        else:
+            seo_data = self._finalize(self._stream_request([
+                SystemMessage(content=SYSTEM_PROMPT),
+                HumanMessage(content=f"Analyze this content: {content}")
+            ], report))
+        report(self.core(seo_data))
+        return seo_data
 
+    def analyze_batch(self, contents):
+        """Analyze many transcripts; in fast mode keywords are extracted for all of them in one pass"""
+        if self.mode != "fast":
+            return [self.analyze(content) for content in contents]
+        return [self._finalize(self.local_seo(candidates)) for candidates in extract_keywords_batch(contents)]
+
+    def analyze_seeded(self, content, on_core=None):
+        """One shorter model call that picks from locally extracted keywords; the TLDR is taken locally"""
+        candidates = extract_keywords(content)
+        seo_data = self._stream_request([
+            SystemMessage(content=SEEDED_PROMPT),
+            HumanMessage(content=(
+                f"Candidate keywords: {', '.join(candidates['keywords'])}\n\n"
+                f"Analyze this content: {content}"
+            ))
+        ], on_core)
+        if seo_data is not None:
+            seo_data.setdefault("tldr_points", candidates["tldr_candidates"])
+        return seo_data
+
+    @staticmethod
+    def local_seo(candidates):
+        """SEO data built from extracted candidates alone, for when throughput matters more than polish.
+
+        Returns None when the content has no keywords, so the usual fallback structure is used.
+        """
+        top_keywords = candidates["keywords"]
+        tldr_points = candidates["tldr_candidates"]
+        if not top_keywords:
+            return None
+        title = ": ".join(keyword.title() for keyword in top_keywords[:2])
+        meta_description = tldr_points[0] if tldr_points else ""
+        if len(meta_description) > 155:
+            meta_description = meta_description[:152].rsplit(" ", 1)[0] + "..."
+        return {
+            "title": title,
+            "meta_description": meta_description,
+            "keywords": top_keywords,
+            "url_slug": candidates["url_slug"],
+            "tldr_points": tldr_points,
+            "user_intent": [f"Learn about {keyword}" for keyword in top_keywords[:3]]
+        }
+
+    def fingerprint(self):
+        """Include the mode, and in the local modes the keyword extractor that shapes the output"""
+        parts = super().fingerprint() + self.mode
+        if self.mode != "llm":
+            parts += inspect.getsource(keywords)
+        return hashlib.sha256(parts.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def core(seo_data):
+        """The subset of the SEO data the article is written from"""
+        return {field: seo_data[field] for field in CORE_FIELDS}
+
+    def _stream_request(self, messages, on_core=None):
+        """Stream the reply, reporting the core fields early, and parse (or repair) the whole object.
+
+        A reply that cannot be parsed is requested again from the router's bigger fallback models.
+        """
+        models = self.route(messages)
+        parser = JSONFieldStream()
+        chunks = []
+        for chunk in self.stream_llm(messages, model=models[0], validate=self._parses):
+            chunks.append(chunk)
+            if parser.feed(chunk) and on_core and all(f in parser.fields for f in CORE_FIELDS):
+                on_core(self.core(self._normalize(parser.fields)))
+        seo_data = self._parse("".join(chunks))
+        if seo_data is None and len(models) > 1:
+            print(f"{self.name}: unparseable response from {models[0]}, retrying with {models[1]}")
+            seo_data = self._parse(self.invoke_llm(messages, validate=self._is_json, models=models[1:]))
+        return seo_data
+
+    def analyze_chunked(self, content):
+        """Analyze long content by mapping over token-bounded windows concurrently, then reducing"""
+        windows = split_into_windows(content, self.CHUNK_TOKENS, self.WINDOW_OVERLAP_TOKENS)
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as pool:
+            # Copy the caller's context so window calls are traced under the same run
+            futures = [pool.submit(contextvars.copy_context().run, self._analyze_window, w) for w in windows]
+            partials = [f.result() for f in futures]
+        partials = [p for p in partials if p]
+        if not partials:
+            return self._finalize(None)
+
+        seo_data = self._request([
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=(
+                "Combine these analyses of consecutive sections of one video into a single "
+                f"analysis of the whole video: {json.dumps(partials)}"
+            ))
+        ])
+        return self._finalize(seo_data or self._merge_partials(partials))
+
+    def _analyze_window(self, window):
+        return self._request([
+            SystemMessage(content=WINDOW_PROMPT),
+            HumanMessage(content=f"Analyze this section: {window}")
+        ])
+
+    def _request(self, messages):
+        """Send messages and parse the JSON reply, returning None if it cannot be parsed or repaired"""
+        return self._parse(self.invoke_llm(messages, validate=self._is_json))
+
+    @staticmethod
+    def _parse(result):
         try:
-            # Get response from LLM
-            result = self.llm.invoke(messages)
-            
-            # Parse the JSON response
-            seo_data = json.loads(result.content)
-            
-            # Ensure all required fields exist
-            seo_data = {
-                "title": seo_data.get("title", ""),
-                "meta_description": seo_data.get("meta_description", ""),
-                "keywords": seo_data.get("keywords", []),
-                "url_slug": slugify(seo_data.get("title", "")),
-                "tldr_points": seo_data.get("tldr_points", []),
-                "user_intent": seo_data.get("user_intent", [])
-            }
-            
-            # Save the SEO data for debugging
-            self.save_output(seo_data, "seo_analysis.json")
-            
-            return seo_data
-            
-        except (json.JSONDecodeError, KeyError) as e:
-            print(f"Error processing LLM response: {e}")
-            print(f"Raw response: {result.content}")
-            # If JSON parsing fails, create a basic structure
-            default_seo = {
+            seo_data = json.loads(result)
+        except json.JSONDecodeError as e:
+            seo_data = repair_json(result)
+            if seo_data is None:
+                print(f"Error processing LLM response: {e}")
+                print(f"Raw response: {result}")
+                return None
+            print(f"Repaired malformed JSON in LLM response: {e}")
+        return seo_data if isinstance(seo_data, dict) else None
+
+    @staticmethod
+    def _merge_partials(partials):
+        """Merge window analyses locally when the reduce call does not return valid JSON"""
+        keyword_counts = Counter(str(kw).lower() for p in partials for kw in p.get("keywords", []))
+        seen = set()
+        user_intent = []
+        for intent in (i for p in partials for i in p.get("user_intent", [])):
+            if str(intent).lower() not in seen:
+                seen.add(str(intent).lower())
+                user_intent.append(intent)
+        return {
+            "title": partials[0].get("title", ""),
+            "meta_description": (partials[0].get("tldr_points") or [""])[0],
+            "keywords": [kw for kw, _ in keyword_counts.most_common(10)],
+            "tldr_points": [p["tldr_points"][0] for p in partials if p.get("tldr_points")],
+            "user_intent": user_intent
+        }
+
+    def _finalize(self, seo_data):
+        """Normalize parsed SEO data, falling back to a basic structure when parsing failed"""
+        if seo_data is None:
+            # If JSON parsing fails, create a basic structure, kept out of the result cache
+            seo_data = DegradedOutput({
                 "title": "Article Title",
                 "meta_description": "Article description",
                 "keywords": ["article"],
                 "url_slug": "article",
                 "tldr_points": ["Key point from the content"],
                 "user_intent": ["General information"]
-            }
-            self.save_output(default_seo, "seo_analysis.json")
-            return default_seo
+            })
+        else:
+            seo_data = self._normalize(seo_data)
+
+        # Save the SEO data for debugging
+        self.save_output(seo_data, "seo_analysis.json")
+
+        return seo_data
+
+    @staticmethod
+    def _normalize(seo_data):
+        """Ensure all required fields exist; the slug is derived from the title unless one was extracted"""
+        return {
+            "title": seo_data.get("title", ""),
+            "meta_description": seo_data.get("meta_description", ""),
+            "keywords": seo_data.get("keywords", []),
+            "url_slug": seo_data.get("url_slug") or slugify(seo_data.get("title", "")),
+            "tldr_points": seo_data.get("tldr_points", []),
+            "user_intent": seo_data.get("user_intent", [])
+        }
+
+    @staticmethod
+    def _parses(text):
+        """Whether the reply parses, or can be repaired, into a JSON object"""
+        try:
+            seo_data = json.loads(text)
+        except json.JSONDecodeError:
+            seo_data = repair_json(text)
+        return isinstance(seo_data, dict)
+
+    @staticmethod
+    def _is_json(text):
+        try:
+            json.loads(text)
+            return True
+        except json.JSONDecodeError:
+            return False
 
     def process(self, input_data):
         return self.analyze(input_data)
@@ -1,46 +1,99 @@
 from .base_agent import BaseAgent
 from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+from utils.http_clients import get_openai_client
+from utils.json_stream import repair_json
+from utils.result_cache import DegradedOutput
+from utils.social_posts import PLATFORM_CONSTRAINTS, enforce_constraints, repair_post
+import json
 
-class SocialMediaAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("social_media_agent")
-        self.llm = ChatOpenAI(temperature=0.7)
+PLATFORMS = ("twitter", "linkedin", "facebook", "instagram")
+
+# Static system prompt; the platforms and their limits come last in the user message, so a
+# regeneration for a few platforms shares the system prompt and article with the first call
+SYSTEM_PROMPT = """You are a social media marketing expert.
+            Create engaging social media posts for the platforms listed after the article, respecting each one's limits.
 
-    def generate_posts(self, article, seo_data):
-        """Generate social media posts for different platforms"""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a social media marketing expert.
-            Create engaging social media posts for the following platforms:
-            - Twitter (X)
-            - LinkedIn
-            - Facebook
-            - Instagram
-            
             For each platform:
             1. Use appropriate tone and style
-            2. Include relevant hashtags
-            3. Optimize character count
+            2. Include relevant hashtags, no more than the platform's hashtag limit
+            3. Stay within the platform's character limit, hashtags included
             4. Include a compelling call-to-action
             5. Use the provided keywords when relevant
-            
-            Format the response as a JSON object with a key for each platform."""),
+
+            Format the response as a JSON object with a key for each platform and the post text as its value."""
+
+class SocialMediaAgent(BaseAgent):
+    PROMPT_VERSION = "3"
+    JSON_RESPONSE = True
+
+    def __init__(self):
+        super().__init__("social_media_agent")
+        self.llm = ChatOpenAI(temperature=0.7, client=get_openai_client().chat.completions)
+
+    def _build_messages(self, article, seo_data, platforms, feedback=None):
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
             ("user", """Article: {article}
             Keywords: {keywords}
-            Title: {title}""")
+            Title: {title}
+
+            Platforms:
+            {platforms}{feedback}""")
         ])
+        limits = "\n".join(
+            f"- {platform}: at most {PLATFORM_CONSTRAINTS[platform]['max_length']} characters "
+            f"and {PLATFORM_CONSTRAINTS[platform]['hashtag_limit']} hashtags"
+            for platform in platforms
+        )
+        return prompt.format_messages(
+            platforms=limits,
+            article=article,
+            keywords=", ".join(seo_data["keywords"]),
+            title=seo_data["title"],
+            feedback=f"\n\nYour previous posts broke these limits, rewrite them:\n{feedback}" if feedback else ""
+        )
+
+    def _request(self, messages):
+        """Send messages and parse the JSON object of posts, returning {} if it cannot be parsed"""
+        result = self.invoke_llm(messages, validate=lambda content: isinstance(self._parse(content), dict))
+        return self._parse(result) or {}
+
+    @staticmethod
+    def _parse(result):
+        try:
+            posts = json.loads(result)
+        except json.JSONDecodeError:
+            posts = repair_json(result)
+        return posts if isinstance(posts, dict) else None
+
+    def generate_posts(self, article, seo_data):
+        """Generate posts for every platform in one call, then enforce each platform's limits.
+
+        Small violations are repaired locally; only the platforms that still fail
+        are regenerated, together in one more call, and whatever fails after that
+        is trimmed to fit.
+        """
+        posts, failed = enforce_constraints(self._request(self._build_messages(article, seo_data, PLATFORMS)), PLATFORMS)
+        if failed:
+            feedback = "\n".join(f"- {p}: {', '.join(problems)}" for p, (_, problems) in failed.items())
+            print(f"Regenerating social posts that broke their limits:\n{feedback}")
+            retried = self._request(self._build_messages(article, seo_data, list(failed), feedback=feedback))
+            fixed, still_failed = enforce_constraints(retried, list(failed))
+            posts.update(fixed)
+            for platform, (text, _) in still_failed.items():
+                # Cut the retry (or the first attempt, if the retry is missing) down to the limits
+                text = text or failed[platform][0]
+                posts[platform] = repair_post(text, PLATFORM_CONSTRAINTS[platform], max_trim=None) or ""
+        posts = {platform: posts[platform] for platform in PLATFORMS if platform in posts}
+        if not all(posts.get(platform) for platform in PLATFORMS):
+            # Some platform is left without a post; keep it out of the result cache so it is retried
+            posts = DegradedOutput(posts)
 
-        chain = prompt | self.llm
-        posts = chain.invoke({
-            "article": article,
-            "keywords": ", ".join(seo_data["keywords"]),
-            "title": seo_data["title"]
-        })
-        
         # Save the social media posts for debugging
-        self.save_output(posts.content, "social_media_posts.json")
-        
-        return posts.content
+        self.save_output(posts, "social_media_posts.json")
+
+        return posts
 
     def process(self, input_data):
         article, seo_data = input_data
@@ -1,40 +1,135 @@
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._transcripts import TranscriptListFetcher
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import inspect
+import os
 from urllib.parse import urlparse, parse_qs
 from .base_agent import BaseAgent
+from utils import transcript_normalizer
+from utils.http_clients import YOUTUBE_ORIGIN, get_youtube_session
+from utils.transcript_normalizer import TranscriptNormalizer
+from utils.transcript_store import get_transcript_store
+from utils.youtube import YOUTUBE_HOSTS, collection_url, list_video_ids
 
 class TranscriptAgent(BaseAgent):
+    LANGUAGES = ('en',)
+    # Concurrent downloads when prefetching a playlist or channel
+    PREFETCH_WORKERS = int(os.getenv("TRANSCRIPT_PREFETCH_WORKERS", "16"))
+
     def __init__(self):
         super().__init__("transcript_agent")
+        self.store = get_transcript_store()
+        self.normalizer = TranscriptNormalizer()
 
     def get_video_id(self, url):
         """Extract video ID from YouTube URL"""
         parsed_url = urlparse(url)
         if parsed_url.hostname == 'youtu.be':
             return parsed_url.path[1:]
-        if parsed_url.hostname in ('www.youtube.com', 'youtube.com'):
+        if parsed_url.hostname in YOUTUBE_HOSTS:
             if parsed_url.path == '/watch':
-                return parse_qs(parsed_url.query)['v'][0]
+                return parse_qs(parsed_url.query).get('v', [None])[0]
+            for prefix in ('/shorts/', '/embed/', '/live/'):
+                if parsed_url.path.startswith(prefix):
+                    return parsed_url.path[len(prefix):].split('/')[0] or None
         return None
 
+    def expand(self, url):
+        """Return watch URLs for every video of a playlist or channel URL, or [url] for a single video"""
+        if collection_url(url) is None:
+            return [url]
+        return [f"{YOUTUBE_ORIGIN}/watch?v={video_id}" for video_id in list_video_ids(url)]
+
+    def prefetch(self, urls, max_workers=None, on_progress=None):
+        """Download the transcripts of many videos into the store concurrently.
+
+        ``on_progress(done, total, video_id, error)`` is called as each video
+        finishes. Returns {video_id: error message} for the videos that failed.
+        """
+        video_ids = list(dict.fromkeys(filter(None, (self.get_video_id(url) for url in urls))))
+        failed = {}
+        if not video_ids:
+            return failed
+        with ThreadPoolExecutor(max_workers=min(max_workers or self.PREFETCH_WORKERS, len(video_ids))) as pool:
+            futures = {pool.submit(self.store.get_or_fetch, video_id, self.download): video_id for video_id in video_ids}
+            for done, future in enumerate(as_completed(futures), 1):
+                video_id = futures[future]
+                error = None
+                try:
+                    future.result()
+                except Exception as e:
+                    error = failed[video_id] = str(e)
+                if on_progress:
+                    on_progress(done, len(video_ids), video_id, error)
+        return failed
+
+    def fingerprint(self):
+        """Include the normalizer rules, which shape the transcript every later stage sees"""
+        rules = inspect.getsource(transcript_normalizer)
+        return hashlib.sha256((super().fingerprint() + rules).encode("utf-8")).hexdigest()[:16]
+
+    def source_key(self, source):
+        """Stable identity of an input: its video ID, or a hash of pasted text"""
+        video_id = self.get_video_id(source) if source.startswith('http') else None
+        if video_id:
+            return f"video:{video_id}"
+        return "text:" + hashlib.sha256(source.encode('utf-8')).hexdigest()
+
     def fetch_from_url(self, url):
         """Fetch transcript from YouTube URL"""
+        return self.load(url)["text"]
+
+    def load(self, source):
+        """Fetch a URL's transcript or take pasted text, and normalize it before any LLM sees it.
+
+        Returns the normalized text along with token counts before and after.
+        """
+        video_id, segments = None, None
+        if source.startswith('http'):
+            video_id, entry = self.fetch_entry(source)
+            segments = [segment['text'] for segment in entry['segments']]
+
+        with self.tracer.span("transcript_normalizer") as span:
+            if segments is None:
+                result = self.normalizer.normalize_text(source)
+            else:
+                result = self.normalizer.normalize(segments)
+            span["tokens_saved"] = result["tokens_saved"]
+
+        if video_id:
+            # Save the transcript for debugging
+            self.save_output(result['text'], f'transcript_{video_id}.txt')
+
+        return result
+
+    def fetch_entry(self, url):
+        """Return the video ID and stored entry (raw segments and joined text) for a URL"""
         video_id = self.get_video_id(url)
         if not video_id:
             raise ValueError("Invalid YouTube URL")
 
-        try:
-            transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-            transcript_text = ' '.join([entry['text'] for entry in transcript_list])
-            
-            # Save the transcript for debugging
-            self.save_output(transcript_text, 'transcript.txt')
-            
-            return transcript_text
-        except Exception as e:
-            raise Exception(f"Failed to fetch transcript: {str(e)}")
+        with self.tracer.span(self.name) as span:
+            span["cache_hit"] = True
+
+            def download(video_id):
+                span["cache_hit"] = False
+                return self.download(video_id)
+
+            try:
+                entry = self.store.get_or_fetch(video_id, download)
+            except Exception as e:
+                raise Exception(f"Failed to fetch transcript: {str(e)}")
+
+        return video_id, entry
+
+    def download(self, video_id):
+        """Download the raw segment list and joined text for a video"""
+        # YouTubeTranscriptApi opens a new session per call; the fetcher takes the shared keep-alive one
+        transcript = TranscriptListFetcher(get_youtube_session()).fetch(video_id).find_transcript(self.LANGUAGES)
+        transcript_list = transcript.fetch()
+        transcript_text = ' '.join([entry['text'] for entry in transcript_list])
+        return transcript_list, transcript_text
 
     def process(self, input_data):
         """Process either URL or direct transcript input"""
-        if input_data.startswith('http'):
-            return self.fetch_from_url(input_data)
-        return input_data
+        return self.load(input_data)["text"]
@@ -1,12 +1,17 @@
 import streamlit as st
 from pathlib import Path
+import json
 import os
-from agents.transcript_agent import TranscriptAgent
-from agents.journalist_agent import JournalistAgent
-from agents.editor_agent import EditorAgent
-from agents.seo_agent import SEOAgent
-from agents.social_media_agent import SocialMediaAgent
+import threading
+import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from agents.content_pipeline import build_content_pipeline, draft_and_edit, output_fingerprints, run_cached
+from agents.registry import get_agent, get_agents, warm_up
 from utils.config import load_config
+from utils.job_queue import DONE, FAILED, QUEUED, RUNNING, get_job_queue
+from utils.pipeline import Stage
+from utils.result_cache import get_result_cache
+from utils.tracing import get_tracer
 
 # Page config must be the first Streamlit command
 st.set_page_config(
@@ -19,13 +24,318 @@ st.set_page_config(
 for dir in ["agents", "data", "configs", "utils", "styles"]:
     Path(dir).mkdir(exist_ok=True)
 
+# (running, finished) status labels per pipeline stage
+STAGE_LABELS = {
+    "cache": ("⚡ Loading saved results...", "⚡ Reused saved results!"),
+    "near_duplicate": ("♻️ Reusing results of a near-duplicate video...", "♻️ Reused results of a near-duplicate video!"),
+    "transcript": ("🎥 Fetching transcript...", "✅ Transcript ready!"),
+    "seo": ("🔍 Analyzing content for SEO...", "✅ SEO analysis complete!"),
+    "article": ("✍️ Writing article...", "✅ Article written!"),
+    "edited_article": ("📝 Editing content...", "✅ Editing complete!"),
+    "draft_and_edit": ("✍️ Writing and editing article...", "✅ Article written and edited!"),
+    "social": ("📱 Creating social media posts...", "✅ Social media content ready!"),
+}
+
+# Seconds between polls of a background job
+JOB_POLL_INTERVAL = 0.5
+
+def use_job_queue():
+    """True when background workers are running and the job queue has not been switched off"""
+    if os.getenv("JOB_QUEUE", "auto").lower() in ("0", "off", "false"):
+        return False
+    return get_job_queue().live_workers() > 0
+
 def local_css(file_name):
     with open(file_name) as f:
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
+@st.cache_resource
+def warm_up_agents():
+    """Build the shared agents once per server process, in the background so the first page renders at once.
+
+    A request that arrives before warm-up finishes simply waits for the agents it needs.
+    """
+    thread = threading.Thread(
+        target=warm_up,
+        kwargs={"connect": os.getenv("WARM_UP_CONNECTIONS", "").lower() in ("1", "true", "yes")},
+        name="agent-warm-up",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+def render_stream(placeholder, chunks, interval=0.05):
+    """Render streamed text into a placeholder as it arrives, passing the chunks through"""
+    text = ""
+    last_render = 0.0
+    for chunk in chunks:
+        text += chunk
+        if time.monotonic() - last_render >= interval:
+            placeholder.markdown(text + "▌")
+            last_render = time.monotonic()
+        yield chunk
+    placeholder.markdown(text)
+
+def stream_to(placeholder, chunks, interval=0.05):
+    """Render streamed text into a placeholder as it arrives and return the full text"""
+    return "".join(render_stream(placeholder, chunks, interval))
+
+def render_run_timeline(timeline, run_id):
+    """Show per-stage latency, tokens and cache hits recorded for a run"""
+    if not timeline:
+        return
+
+    st.markdown("### Run Timeline")
+    st.dataframe([{
+        "Stage": span["stage"],
+        "Start (s)": span["offset_ms"] / 1000,
+        "Duration (s)": span["wall_ms"] / 1000,
+        "Queue (s)": span["queue_ms"] / 1000,
+        "Prompt Tokens": span["prompt_tokens"],
+        "Cached Prompt Tokens": span.get("cached_prompt_tokens", 0),
+        "Completion Tokens": span["completion_tokens"],
+        "Cache Hit": span["cache_hit"],
+        "Error": span["error"] or ""
+    } for span in timeline], use_container_width=True)
+    st.bar_chart(
+        {"Stage": [span["stage"] for span in timeline], "Duration (s)": [span["wall_ms"] / 1000 for span in timeline]},
+        x="Stage",
+        y="Duration (s)"
+    )
+    st.download_button(
+        "Download trace (JSONL)",
+        data="".join(json.dumps(span) + "\n" for span in timeline),
+        file_name=f"trace_{run_id}.jsonl",
+        mime="application/jsonl"
+    )
+
+def render_results_header(title):
+    """Draw the results banner and tabs; returns the tabs and the article placeholder"""
+    # Results section
+    st.markdown("""
+        <div style='background: linear-gradient(90deg, #4776E6 0%, #8E54E9 100%); padding: 2px; border-radius: 12px; margin: 2rem 0;'>
+            <div style='background: white; padding: 1.5rem; border-radius: 11px;'>
+                <h2 style='margin-top: 0;'>Generated Content</h2>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Create tabs for different outputs
+    tabs = st.tabs(["📝 Article", "🎯 SEO Analysis", "📱 Social Media"])
+
+    with tabs[0]:
+        st.markdown(f"### {title}")
+        article = st.empty()
+    return tabs, article
+
+def render_results(values, tabs, timeline, run_id):
+    """Fill in the SEO and social tabs and the detailed outputs once every stage is done"""
+    transcript = values["transcript"]
+    seo_data = values["seo"]
+    article = values["article"]
+    edited_article = values["edited_article"]
+    social_content = values["social"]
+    tab1, tab2, tab3 = tabs
+
+    with tab2:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("### 🎯 Target Keywords")
+            for kw in seo_data['keywords']:
+                st.markdown(f"- {kw}")
+        with col2:
+            st.markdown("### 📊 TLDR Points")
+            for point in seo_data['tldr_points']:
+                st.markdown(f"- {point}")
+        st.markdown("### 📝 Meta Description")
+        st.info(seo_data['meta_description'])
+    
+    with tab3:
+        if isinstance(social_content, dict):
+            for platform, post in social_content.items():
+                with st.expander(f"📱 {platform.title()} Post"):
+                    st.write(post)
+
+    # Detailed outputs in expandable sections
+    st.markdown("""
+        <div style='background: linear-gradient(90deg, #4776E6 0%, #8E54E9 100%); padding: 2px; border-radius: 12px; margin: 2rem 0;'>
+            <div style='background: white; padding: 1.5rem; border-radius: 11px;'>
+                <h2 style='margin-top: 0;'>Detailed Agent Outputs</h2>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        with st.expander("🎥 Transcript"):
+            st.code(transcript, language="markdown")
+        
+        with st.expander("✍️ Original Draft"):
+            st.write(article)
+    
+    with col2:
+        with st.expander("🔍 Raw SEO Data"):
+            st.json(seo_data)
+        
+        with st.expander("📊 Content Analytics"):
+            st.markdown("### Content Statistics")
+            st.markdown(f"- **Word Count**: {len(edited_article.split())}")
+            st.markdown(f"- **Reading Time**: {len(edited_article.split()) // 200} minutes")
+            st.markdown(f"- **Keywords Used**: {len(seo_data['keywords'])}")
+            normalization = values["normalization"]
+            saved_pct = normalization["tokens_saved"] / max(normalization["tokens_before"], 1)
+            st.markdown(f"- **Transcript Tokens Saved**: {normalization['tokens_saved']} ({saved_pct:.0%})")
+            render_run_timeline(timeline, run_id)
+
+def run_inline(source, options):
+    """Run the pipeline in this script thread, streaming the article into the page"""
+    with st.spinner("🔄 Processing your content..."), get_tracer().run() as run_id:
+        # Shared agents live for the whole server process
+        journalist_agent = get_agent("journalist")
+        editor_agent = get_agent("editor")
+
+        # Progress updates render above the results, which fill in as stages finish
+        progress = st.container()
+        results = st.container()
+        ui = {}
+        header_lock = threading.Lock()
+
+        def show_header(title):
+            # The article can start from the early SEO fields, before the SEO stage is done
+            with header_lock:
+                if "tabs" not in ui:
+                    with results:
+                        ui["tabs"], ui["article"] = render_results_header(title)
+
+        pipeline = build_content_pipeline(get_agents(), **options)
+        if options["overlap_edit"]:
+            # Stream the draft into the Article tab, then swap in the edited article
+            def write_and_edit(transcript, seo_core):
+                show_header(seo_core["title"])
+                outputs = draft_and_edit(
+                    journalist_agent, editor_agent, transcript, seo_core,
+                    watch=lambda chunks: render_stream(ui["article"], chunks)
+                )
+                ui["article"].markdown(outputs["edited_article"])
+                return outputs
+
+            pipeline.add_stage(Stage(
+                "draft_and_edit", write_and_edit,
+                inputs=["transcript", "seo_core"], outputs=["article", "edited_article"]
+            ))
+        else:
+            # Stream the draft, then the edit, into the Article tab
+            def write_article(transcript, seo_core):
+                show_header(seo_core["title"])
+                return stream_to(ui["article"], journalist_agent.stream_article(transcript, seo_core))
+
+            pipeline.add_stage(Stage("article", write_article, inputs=["transcript", "seo_core"]))
+        if not options["incremental_edit"] and not options["overlap_edit"]:
+            pipeline.add_stage(Stage(
+                "edited_article",
+                lambda article: stream_to(ui["article"], editor_agent.stream_edit(article)),
+                inputs=["article"]
+            ))
+
+        def on_stage_start(name):
+            label = STAGE_LABELS.get(name, (f"⚙️ Running {name}...", ""))[0]
+            with progress:
+                ui[f"status_{name}"] = st.status(label)
+
+        def on_stage_done(name, outputs):
+            label = STAGE_LABELS.get(name, ("", f"✅ {name} complete!"))[1]
+            ui[f"status_{name}"].update(label=label, state="complete")
+            if "seo" in outputs:
+                show_header(outputs["seo"]["title"])
+            if "article" in ui and ("edited_article" in outputs or "article" in outputs):
+                ui["article"].markdown(outputs.get("edited_article") or outputs["article"])
+
+        def on_cached(values):
+            # Saved outputs skip their stages, so draw them the way finished stages are drawn
+            on_stage_start("cache")
+            on_stage_done("cache", values)
+
+        # Imported on first use, like the agents, to keep it off the startup path
+        from utils.near_duplicates import get_near_duplicate_index
+        # Worker threads need the script context to draw into the page
+        script_ctx = get_script_run_ctx()
+        agents = get_agents()
+        values = run_cached(
+            pipeline, agents, source, output_fingerprints(agents, **options), get_result_cache(),
+            on_cached=on_cached,
+            near_duplicates=get_near_duplicate_index(),
+            on_stage_start=on_stage_start,
+            on_stage_done=on_stage_done,
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), script_ctx)
+        )
+        render_results(values, ui["tabs"], get_tracer().timeline(run_id), run_id)
+
+def follow_job(job_id):
+    """Poll a background job, showing stage progress and partial results until it finishes"""
+    queue = get_job_queue()
+    progress = st.container()
+    results = st.container()
+    statuses = {}
+    values = {}
+    tabs = article = None
+    seq = 0
+    orphaned = None
+
+    with st.spinner("🔄 Processing your content in the background..."):
+        while True:
+            # Read the status before the events, so a finished job's last events are never missed
+            job = queue.get(job_id)
+            if job is None:
+                st.session_state.pop("job_id", None)
+                st.error("This job no longer exists")
+                return
+
+            for event in queue.events(job_id, after=seq):
+                seq = event["seq"]
+                name = event["stage"]
+                if event["kind"] == "start":
+                    with progress:
+                        statuses[name] = st.status(STAGE_LABELS.get(name, (f"⚙️ Running {name}...", ""))[0])
+                    continue
+
+                if name not in statuses:
+                    with progress:
+                        statuses[name] = st.status(STAGE_LABELS.get(name, (f"⚙️ Running {name}...", ""))[0])
+                statuses[name].update(label=STAGE_LABELS.get(name, ("", f"✅ {name} complete!"))[1], state="complete")
+                values.update(event["outputs"])
+                if "seo" in event["outputs"]:
+                    with results:
+                        tabs, article = render_results_header(values["seo"]["title"])
+                if article is not None and ("article" in values or "edited_article" in values):
+                    article.markdown(values.get("edited_article") or values["article"])
+
+            if job["status"] == DONE:
+                break
+            if job["status"] == FAILED:
+                st.error(f"Processing failed: {job['error']}")
+                return
+            if job["status"] in (QUEUED, RUNNING) and queue.live_workers() == 0:
+                # Every worker has stopped: put a job left running back in the queue, then take it back
+                queue.requeue_stale()
+                if queue.withdraw(job_id, "No worker was running; the app ran it instead"):
+                    orphaned = job
+                    break
+            time.sleep(JOB_POLL_INTERVAL)
+
+    if orphaned is not None:
+        st.session_state.pop("job_id", None)
+        progress.empty()
+        results.empty()
+        st.warning("No background worker is running, so the video is being processed here instead")
+        run_inline(orphaned["source"], orphaned["options"])
+        return
+    render_results(values, tabs, job["trace"], job_id)
+
 def main():
     # Load custom CSS
     local_css("styles/main.css")
+    warm_up_agents()
 
     # Header section with gradient background
     st.markdown("""
@@ -48,106 +358,36 @@ def main():
     # Optional transcript input with expander
     with st.expander("📝 Or paste transcript directly"):
         transcript_input = st.text_area("", placeholder="Paste your transcript here...", height=150)
+
+    with st.expander("⚙️ Options"):
+        options = {
+            "social_from_draft": st.checkbox(
+                "Write social posts from the draft while it is being edited",
+                help="Faster, but the posts are based on the unedited article"
+            ),
+            "incremental_edit": st.checkbox(
+                "Edit paragraph by paragraph",
+                help="Paragraphs edited in an earlier run are reused, so revised drafts only pay for what changed"
+            ),
+            "overlap_edit": st.checkbox(
+                "Edit paragraphs while the draft is being written",
+                help="Faster, but each paragraph is edited without seeing the one after it"
+            )
+        }
     
     if generate_button and (url_input or transcript_input):
-        with st.spinner("🔄 Processing your content..."):
-            # Initialize agents
-            transcript_agent = TranscriptAgent()
-            journalist_agent = JournalistAgent()
-            editor_agent = EditorAgent()
-            seo_agent = SEOAgent()
-            social_media_agent = SocialMediaAgent()
-
-            # Process flow
-            if url_input:
-                transcript = transcript_agent.fetch_from_url(url_input)
-            else:
-                transcript = transcript_input
-
-            # Get SEO recommendations first
-            with st.status("🔍 Analyzing content for SEO...") as status:
-                seo_data = seo_agent.analyze(transcript)
-                status.update(label="✅ SEO analysis complete!", state="complete")
-            
-            # Generate article
-            with st.status("✍️ Writing article...") as status:
-                article = journalist_agent.write_article(transcript, seo_data)
-                status.update(label="✅ Article written!", state="complete")
-            
-            # Edit article
-            with st.status("📝 Editing content...") as status:
-                edited_article = editor_agent.edit(article)
-                status.update(label="✅ Editing complete!", state="complete")
-            
-            # Generate social media content
-            with st.status("📱 Creating social media posts...") as status:
-                social_content = social_media_agent.generate_posts(edited_article, seo_data)
-                status.update(label="✅ Social media content ready!", state="complete")
-
-            # Results section
-            st.markdown("""
-                <div style='background: linear-gradient(90deg, #4776E6 0%, #8E54E9 100%); padding: 2px; border-radius: 12px; margin: 2rem 0;'>
-                    <div style='background: white; padding: 1.5rem; border-radius: 11px;'>
-                        <h2 style='margin-top: 0;'>Generated Content</h2>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-
-            # Create tabs for different outputs
-            tab1, tab2, tab3 = st.tabs(["📝 Article", "🎯 SEO Analysis", "📱 Social Media"])
-            
-            with tab1:
-                st.markdown(f"### {seo_data['title']}")
-                st.write(edited_article)
-            
-            with tab2:
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.markdown("### 🎯 Target Keywords")
-                    for kw in seo_data['keywords']:
-                        st.markdown(f"- {kw}")
-                with col2:
-                    st.markdown("### 📊 TLDR Points")
-                    for point in seo_data['tldr_points']:
-                        st.markdown(f"- {point}")
-                st.markdown("### 📝 Meta Description")
-                st.info(seo_data['meta_description'])
-            
-            with tab3:
-                if isinstance(social_content, dict):
-                    for platform, post in social_content.items():
-                        with st.expander(f"📱 {platform.title()} Post"):
-                            st.write(post)
-
-            # Detailed outputs in expandable sections
-            st.markdown("""
-                <div style='background: linear-gradient(90deg, #4776E6 0%, #8E54E9 100%); padding: 2px; border-radius: 12px; margin: 2rem 0;'>
-                    <div style='background: white; padding: 1.5rem; border-radius: 11px;'>
-                        <h2 style='margin-top: 0;'>Detailed Agent Outputs</h2>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                with st.expander("🎥 Transcript"):
-                    st.code(transcript, language="markdown")
-                
-                with st.expander("✍️ Original Draft"):
-                    st.write(article)
-            
-            with col2:
-                with st.expander("🔍 Raw SEO Data"):
-                    st.json(seo_data)
-                
-                with st.expander("📊 Content Analytics"):
-                    st.markdown("### Content Statistics")
-                    st.markdown(f"- **Word Count**: {len(edited_article.split())}")
-                    st.markdown(f"- **Reading Time**: {len(edited_article.split()) // 200} minutes")
-                    st.markdown(f"- **Keywords Used**: {len(seo_data['keywords'])}")
-
-    else:
+        source = url_input or transcript_input
+        # Hand the run to background workers when any are up, otherwise run it here
+        if use_job_queue():
+            st.session_state["job_id"] = get_job_queue().submit(source, options)
+        else:
+            st.session_state.pop("job_id", None)
+            run_inline(source, options)
+
+    if st.session_state.get("job_id"):
+        # Reruns re-attach to the job, so results survive widget interactions and reconnects
+        follow_job(st.session_state["job_id"])
+    elif not (generate_button and (url_input or transcript_input)):
         if generate_button:
             st.error("Please provide either a YouTube URL or paste a transcript")
         
@@ -0,0 +1,239 @@
+"""Headless batch runner: process many YouTube URLs or transcripts without the UI.
+
+Usage:
+    python batch.py inputs.txt --output results.jsonl --workers 8
+
+Each input line is a YouTube video, playlist or channel URL, a path to a
+transcript text file, or a JSON object with an optional "id" and either "url"
+or "transcript". Playlists and channels are expanded into their videos, and
+all transcripts are downloaded concurrently before the pipeline runs. Completed
+stages are appended to a checkpoint file, so rerunning the same command after
+a crash resumes where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from agents.content_pipeline import build_content_pipeline, output_fingerprints, run_cached
+from agents.registry import get_agent, get_agents
+from utils.config import load_config
+from utils.result_cache import get_result_cache
+from utils.tracing import get_tracer
+
+# Pipeline outputs written to each result record
+RESULT_FIELDS = ["transcript", "normalization", "seo", "article", "edited_article", "social"]
+
+
+def read_inputs(path):
+    """Parse the input file into a list of {"key", "source"} items"""
+    items = []
+    transcript_agent = get_agent("transcript")
+    for line in Path(path).read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('{'):
+            record = json.loads(line)
+            sources = [record.get("url") or record["transcript"]]
+            key = record.get("id")
+        elif line.startswith('http'):
+            # Playlists and channels become one item per video
+            sources, key = transcript_agent.expand(line), None
+        else:
+            sources, key = [Path(line).read_text(encoding='utf-8')], None
+
+        for source in sources:
+            item_key = key
+            if item_key is None and source.startswith('http'):
+                item_key = transcript_agent.get_video_id(source)
+            if item_key is None:
+                item_key = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+            items.append({"key": str(item_key), "source": source})
+    return items
+
+
+def prefetch_transcripts(items, workers):
+    """Download the transcripts of all URL items up front, concurrently, printing progress"""
+    urls = [item["source"] for item in items if item["source"].startswith('http')]
+    if not urls:
+        return
+    started = time.time()
+
+    def progress(done, total, video_id, error):
+        status = f"failed: {error}" if error else "ok"
+        print(f"Prefetched [{done}/{total}] {video_id}: {status} ({time.time() - started:.1f}s)")
+
+    failed = get_agent("transcript").prefetch(urls, max_workers=workers, on_progress=progress)
+    if failed:
+        # Their pipeline runs retry the download and record the error
+        print(f"{len(failed)} transcripts could not be prefetched")
+
+
+class Checkpoint:
+    """Append-only JSONL log of completed stages, safe to share between workers"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.stages = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # partially written last line from a crash
+                    self.stages.setdefault(entry["key"], {})[entry["stage"]] = entry["output"]
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def completed(self, key):
+        return dict(self.stages.get(key, {}))
+
+    def record(self, key, stage, output):
+        line = json.dumps({"key": key, "stage": stage, "output": output})
+        with self._lock:
+            self.stages.setdefault(key, {})[stage] = output
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def precompute_fast_seo(items, checkpoint, workers):
+    """In fast SEO mode, extract the SEO data of every pending item locally in one vectorized pass.
+
+    Transcripts and SEO data are written to the checkpoint, so the pipeline runs skip those stages.
+    """
+    seo_agent = get_agent("seo")
+    if seo_agent.mode != "fast":
+        return
+    pending = [item for item in items if "seo" not in checkpoint.completed(item["key"])]
+    transcript_agent = get_agent("transcript")
+
+    def load(item):
+        completed = checkpoint.completed(item["key"])
+        if "transcript" in completed:
+            return completed["transcript"], completed.get("normalization")
+        try:
+            result = transcript_agent.load(item["source"])
+        except Exception as e:
+            # Left to the item's own pipeline run, which records the error
+            print(f"Skipping fast SEO for {item['key']}: {str(e)}")
+            return None, None
+        return result["text"], {k: v for k, v in result.items() if k != "text"}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        loaded = [(item, *result) for item, result in zip(pending, pool.map(load, pending)) if result[0] is not None]
+    if not loaded:
+        return
+    started = time.time()
+    analyses = seo_agent.analyze_batch([transcript for _, transcript, _ in loaded])
+    for (item, transcript, normalization), seo in zip(loaded, analyses):
+        checkpoint.record(item["key"], "transcript", transcript)
+        checkpoint.record(item["key"], "normalization", normalization)
+        checkpoint.record(item["key"], "seo_core", seo_agent.core(seo))
+        checkpoint.record(item["key"], "seo", seo)
+    print(f"Extracted SEO data for {len(loaded)} videos locally in {time.time() - started:.1f}s")
+
+
+def run_item(item, pipeline, checkpoint, submitted, fingerprints):
+    """Run the remaining pipeline stages for one item and return its outputs and run ID.
+
+    Outputs are also read from and written to the shared result cache.
+    """
+    from utils.near_duplicates import get_near_duplicate_index
+    tracer = get_tracer()
+    queue_ms = (time.perf_counter() - submitted) * 1000
+
+    def record(stage, outputs):
+        for name, value in outputs.items():
+            checkpoint.record(item["key"], name, value)
+
+    with tracer.run() as run_id, tracer.span("pipeline", queue_ms=queue_ms):
+        completed = checkpoint.completed(item["key"])
+        outputs = run_cached(
+            pipeline, get_agents(), item["source"], fingerprints, get_result_cache(),
+            values=completed,
+            on_cached=lambda cached: record("cache", cached),
+            near_duplicates=get_near_duplicate_index(),
+            on_stage_done=record
+        )
+    return outputs, run_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the content pipeline over many videos")
+    parser.add_argument("input", help="File of YouTube URLs, transcript paths or JSON lines")
+    parser.add_argument("--output", "-o", default="results.jsonl", help="JSONL file with one result per video")
+    parser.add_argument("--checkpoint", help="Stage checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", "-w", type=int, default=4, help="Number of videos processed concurrently")
+    parser.add_argument("--prefetch-workers", type=int, default=None,
+                        help="Concurrent transcript downloads before processing (default: TRANSCRIPT_PREFETCH_WORKERS)")
+    parser.add_argument("--social-from-draft", action="store_true",
+                        help="Write social posts from the unedited draft, concurrently with editing")
+    parser.add_argument("--incremental-edit", action="store_true",
+                        help="Edit paragraph by paragraph, reusing earlier edits of unchanged paragraphs")
+    parser.add_argument("--overlap-edit", action="store_true",
+                        help="Edit each paragraph as soon as the journalist finishes writing it")
+    args = parser.parse_args()
+
+    load_config()
+    output_path = Path(args.output)
+    checkpoint = Checkpoint(args.checkpoint or f"{output_path}.checkpoint")
+
+    # Videos already written to the output file are finished
+    done = set()
+    if output_path.exists():
+        with open(output_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("status") == "ok":
+                    done.add(record["key"])
+
+    items = [item for item in read_inputs(args.input) if item["key"] not in done]
+    print(f"{len(done)} videos already done, {len(items)} to process with {args.workers} workers")
+    prefetch_transcripts(items, args.prefetch_workers)
+    precompute_fast_seo(items, checkpoint, args.workers)
+
+    options = {
+        "social_from_draft": args.social_from_draft,
+        "incremental_edit": args.incremental_edit,
+        "overlap_edit": args.overlap_edit
+    }
+    pipeline = build_content_pipeline(get_agents(), max_workers=2, **options)
+    fingerprints = output_fingerprints(get_agents(), **options)
+
+    started = time.time()
+    failed = 0
+    with open(output_path, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(run_item, item, pipeline, checkpoint, time.perf_counter(), fingerprints): item
+            for item in items
+        }
+        for count, future in enumerate(as_completed(futures), 1):
+            item = futures[future]
+            record = {"key": item["key"]}
+            try:
+                outputs, run_id = future.result()
+                record.update(status="ok", run_id=run_id, **{field: outputs[field] for field in RESULT_FIELDS})
+            except Exception as e:
+                failed += 1
+                print(f"Error processing {item['key']}: {str(e)}")
+                record.update(status="error", error=str(e))
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            print(f"[{count}/{len(items)}] {item['key']}: {record['status']} ({time.time() - started:.1f}s)")
+
+    checkpoint.close()
+    print(f"Finished: {len(items) - failed} succeeded, {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
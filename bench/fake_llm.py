@@ -0,0 +1,227 @@
+"""Local stand-in for the OpenAI chat-completions API that replays recorded responses.
+
+Responses are picked by matching a substring of the request's messages, then
+sent back after a configurable latency, at a configurable token rate, with
+optional injected errors. Both plain and streaming (SSE) requests are served,
+and requests that offer tools get the recorded content back as tool calls.
+Like a real model with parallel tool calls, a recorded object keyed by
+platform is split into one call per platform when a tool takes a
+``platform`` argument. Prompt prefix caching is simulated the way the provider reports
+it: a request repeating a prefix of 1024+ tokens seen earlier gets those
+tokens back as ``prompt_tokens_details.cached_tokens``, in steps of 128.
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from utils.tokens import estimate_tokens
+
+FIXTURES = Path(__file__).parent / "fixtures" / "responses.json"
+MIN_CACHED_PREFIX_TOKENS = 1024
+CACHED_PREFIX_STEP = 128
+
+
+def load_responses(path=FIXTURES):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def tool_calls(tools, content):
+    """The tool calls a model would make for a recorded response when offered ``tools``"""
+    functions = [tool["function"] for tool in tools]
+    per_platform = next(
+        (f for f in functions if "platform" in f.get("parameters", {}).get("properties", {})), None
+    )
+    try:
+        recorded = json.loads(content)
+    except json.JSONDecodeError:
+        recorded = None
+    if per_platform and isinstance(recorded, dict) and recorded and all(
+            isinstance(post, dict) for post in recorded.values()):
+        calls = [(per_platform["name"], json.dumps({**post, "platform": platform}))
+                 for platform, post in recorded.items()]
+    else:
+        calls = [(functions[0]["name"], content)]
+    return [{"id": f"call_{uuid.uuid4().hex[:8]}", "type": "function", "function": {"name": name, "arguments": args}}
+            for name, args in calls]
+
+
+class FakeLLMServer:
+    """Threaded HTTP server speaking enough of the chat-completions API for the agents"""
+
+    def __init__(self, responses=None, latency=0.2, tokens_per_second=400.0, error_rate=0.0, seed=0):
+        self.responses = responses if responses is not None else load_responses()
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._prompts = deque(maxlen=256)
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def pick_response(self, messages):
+        """Return the first recorded response whose match string appears in the messages"""
+        text = "\n".join(str(m.get("content") or "") for m in messages)
+        for response in self.responses:
+            if response.get("match", "") in text:
+                return response["content"]
+        return "OK"
+
+    def cached_tokens(self, request):
+        """Tokens of the longest prompt prefix shared with an earlier request; the prompt is then remembered"""
+        prompt = json.dumps(request.get("tools", []), sort_keys=True) + "".join(
+            str(m.get("content") or "") for m in request.get("messages", []))
+        with self._lock:
+            shared = max((len(os.path.commonprefix([prompt, seen])) for seen in self._prompts), default=0)
+            self._prompts.append(prompt)
+        cached = estimate_tokens(prompt[:shared])
+        if cached < MIN_CACHED_PREFIX_TOKENS:
+            return 0
+        return cached - cached % CACHED_PREFIX_STEP
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                return True
+        return False
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "not found"}})
+                    return
+
+                time.sleep(server.latency)
+                if server._should_fail():
+                    status = server.random.choice([429, 500])
+                    self._send_json(status, {"error": {"message": "injected error", "type": "fake_error", "code": str(status)}})
+                    return
+
+                content = server.pick_response(request.get("messages", []))
+                if request.get("stream"):
+                    self._stream(request, content)
+                else:
+                    self._complete(request, content)
+
+            def _usage(self, request, content):
+                prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in request.get("messages", []))
+                completion_tokens = estimate_tokens(content)
+                return {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                    "prompt_tokens_details": {"cached_tokens": min(server.cached_tokens(request), prompt_tokens)}
+                }
+
+            def _complete(self, request, content):
+                usage = self._usage(request, content)
+                time.sleep(usage["completion_tokens"] / server.tokens_per_second)
+                if request.get("tools"):
+                    message = {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": tool_calls(request["tools"], content)
+                    }
+                    finish_reason = "tool_calls"
+                else:
+                    message = {"role": "assistant", "content": content}
+                    finish_reason = "stop"
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                    "usage": usage
+                })
+
+            def _stream(self, request, content):
+                # Streamed prompts warm the prefix cache too, though no usage is reported
+                server.cached_tokens(request)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+                def send(delta, finish_reason=None):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.get("model", "fake"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                send({"role": "assistant", "content": ""})
+                for token in re.findall(r'\S+\s*|\s+', content):
+                    time.sleep(estimate_tokens(token) / server.tokens_per_second)
+                    send({"content": token})
+                send({}, finish_reason="stop")
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
@@ -0,0 +1,153 @@
+"""Local stand-in for the YouTube pages the transcript agent reads.
+
+Serves watch pages with a caption track, timed-text captions, playlist and
+channel listings with continuation pages, and the browse endpoint those
+continuations are fetched from. Every response waits a configurable latency,
+and the server counts requests and the TCP connections they arrived on.
+"""
+import json
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+API_KEY = "fake-innertube-key"
+CLIENT_VERSION = "2.20240101.00.00"
+SEGMENTS = [
+    "Welcome back to the channel.",
+    "Today we are looking at how small teams turn videos into articles.",
+    "The first draft is ready before lunch, and the editor spends their time on judgment.",
+    "Thanks for watching."
+]
+
+
+class FakeYouTubeServer:
+    """Threaded HTTP server speaking enough of youtube.com for transcript and listing downloads"""
+
+    def __init__(self, videos=200, page_size=100, latency=0.2):
+        self.video_ids = [f"vid{i:08d}" for i in range(videos)]
+        self.page_size = page_size
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, new_connection):
+        with self._lock:
+            self.requests += 1
+            if new_connection:
+                self.connections += 1
+
+    def listing(self, offset):
+        """One listing page: video entries from offset plus a continuation token if more remain"""
+        entries = ",".join(
+            json.dumps({"playlistVideoRenderer": {"videoId": video_id}}, separators=(",", ":"))
+            for video_id in self.video_ids[offset:offset + self.page_size]
+        )
+        text = f'{{"contents":[{entries}]'
+        if offset + self.page_size < len(self.video_ids):
+            token = json.dumps({"continuationCommand": {"token": str(offset + self.page_size)}}, separators=(",", ":"))
+            text += f',"continuation":{token}'
+        return text + "}"
+
+    def watch_page(self, video_id):
+        captions = {
+            "playerCaptionsTracklistRenderer": {
+                "captionTracks": [{
+                    # Real pages point at youtube.com; the client's base URL rewrite sends it back here
+                    "baseUrl": f"https://www.youtube.com/api/timedtext?v={video_id}&lang=en",
+                    "name": {"simpleText": "English"},
+                    "languageCode": "en",
+                    "isTranslatable": False
+                }],
+                "translationLanguages": []
+            }
+        }
+        return (
+            '<html><script>var ytInitialPlayerResponse = {"playabilityStatus":{"status":"OK"},'
+            f'"captions":{json.dumps(captions)},"videoDetails":{{"videoId":"{video_id}"}}}};</script></html>'
+        )
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.new_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8"):
+                body = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _begin(self):
+                server._count(self.new_connection)
+                self.new_connection = False
+                time.sleep(server.latency)
+
+            def do_GET(self):
+                self._begin()
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/watch" and query.get("v", [""])[0] in server.video_ids:
+                    self._send(200, server.watch_page(query["v"][0]))
+                elif url.path == "/api/timedtext":
+                    texts = "".join(
+                        f'<text start="{i * 2.5}" dur="2.5">{escape(segment)}</text>'
+                        for i, segment in enumerate(SEGMENTS)
+                    )
+                    self._send(200, f'<?xml version="1.0" encoding="utf-8" ?><transcript>{texts}</transcript>',
+                               "text/xml; charset=utf-8")
+                elif url.path == "/playlist" or url.path.endswith("/videos"):
+                    config = f'"INNERTUBE_API_KEY":"{API_KEY}","INNERTUBE_CLIENT_VERSION":"{CLIENT_VERSION}"'
+                    self._send(200, f"<html><script>ytcfg.set({{{config}}}); var ytInitialData = "
+                                    f"{server.listing(0)};</script></html>")
+                else:
+                    self._send(404, "not found")
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                self._begin()
+                if urlparse(self.path).path != "/youtubei/v1/browse" or "continuation" not in body:
+                    self._send(404, "not found")
+                    return
+                self._send(200, server.listing(int(body["continuation"])), "application/json")
+
+        return Handler
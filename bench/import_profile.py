@@ -0,0 +1,114 @@
+"""Import-time profile of the modules on the app's startup path.
+
+Usage:
+    python -m bench.import_profile                    # profile the default targets
+    python -m bench.import_profile agents.seo_agent   # profile specific modules
+    python -m bench.import_profile --save-baseline    # record results as the baseline
+    python -m bench.import_profile --compare          # fail if startup got slower
+
+Each target is imported in a fresh interpreter with ``-X importtime``, so
+nothing is already cached in ``sys.modules``. The report lists the total
+import time per target and the heaviest top-level packages it pulled in.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "imports.json"
+
+# What the app and the batch/worker entry points import before any agent runs
+DEFAULT_TARGETS = [
+    "agents.registry",
+    "agents.content_pipeline",
+    "utils.job_queue",
+    "utils.result_cache",
+    "utils.near_duplicates",
+    "utils.tracing",
+    "swarm_agents",
+]
+
+
+def _importtime(code):
+    """Run code in a fresh interpreter and return [(module, self_us)] from -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed"
+        raise ImportError(error)
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us)))
+    return modules
+
+
+def profile(target):
+    """Import a module in a fresh interpreter and return (total_ms, {top-level package: ms})"""
+    # Modules the interpreter loads at startup are not the target's cost
+    startup = {name for name, _ in _importtime("pass")}
+    packages = {}
+    for name, self_us in _importtime(f"import {target}"):
+        if name in startup:
+            continue
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us / 1000
+    return sum(packages.values()), packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time of the startup path")
+    parser.add_argument("targets", nargs="*", help="Modules to import (default: the app's startup modules)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest packages to list per target")
+    parser.add_argument("--save-baseline", action="store_true", help="Save results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Fail if a target is slower than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown as a fraction, plus a 20 ms floor for noise")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'target':<28}{'import ms':>11}  heaviest packages")
+    for target in args.targets or DEFAULT_TARGETS:
+        try:
+            total_ms, packages = profile(target)
+        except ImportError as e:
+            print(f"{target:<28}{'-':>11}  skipped: {str(e)}")
+            continue
+        heaviest = sorted(packages.items(), key=lambda p: p[1], reverse=True)[:args.top]
+        print(f"{target:<28}{total_ms:>11.1f}  " + ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest))
+        results[target] = round(total_ms, 1)
+
+    regressions = []
+    if args.compare:
+        if BASELINE_PATH.exists():
+            with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            for target, total_ms in results.items():
+                previous = baseline.get(target)
+                if previous is not None and total_ms > previous * (1 + args.tolerance) + 20:
+                    regressions.append(f"{target}: {previous:.1f} -> {total_ms:.1f} ms")
+        else:
+            print(f"No baseline at {BASELINE_PATH}")
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {BASELINE_PATH}")
+
+    if regressions:
+        print("\nImport time regressions beyond tolerance:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Playlist ingest benchmark against the local fake of YouTube.
+
+Usage:
+    python -m bench.prefetch                              # 200-video playlist, 16 workers
+    python -m bench.prefetch --videos 500 --workers 32 --latency 0.3
+
+Expands a playlist URL into its videos and prefetches every transcript into a
+fresh transcript store. Reports the elapsed time in units of one sequential
+video fetch, and how many connections the downloads needed.
+"""
+import argparse
+import os
+import tempfile
+import time
+from .fake_youtube import FakeYouTubeServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark playlist expansion and transcript prefetching")
+    parser.add_argument("--videos", type=int, default=200, help="Videos in the fake playlist")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent transcript downloads")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake server latency per request in seconds")
+    args = parser.parse_args()
+
+    with FakeYouTubeServer(videos=args.videos, latency=args.latency) as server, \
+            tempfile.TemporaryDirectory() as store_dir:
+        # Read when the HTTP clients and the transcript store are first imported and built
+        os.environ["YOUTUBE_BASE_URL"] = server.base_url
+        os.environ["YOUTUBE_MAX_CONNECTIONS"] = str(args.workers)
+        os.environ["TRANSCRIPT_STORE_DIR"] = store_dir
+        from agents.registry import get_agent
+        agent = get_agent("transcript")
+
+        started = time.perf_counter()
+        agent.download(server.video_ids[0])
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        urls = agent.expand("https://www.youtube.com/playlist?list=PLfake")
+        expanded = time.perf_counter() - started
+        requests_before, connections_before = server.requests, server.connections
+
+        last_report = [0.0]
+
+        def progress(done, total, video_id, error):
+            now = time.perf_counter()
+            if error or done == total or now - last_report[0] >= 1.0:
+                last_report[0] = now
+                print(f"  [{done}/{total}] {video_id}" + (f" failed: {error}" if error else ""))
+
+        started = time.perf_counter()
+        failed = agent.prefetch(urls, max_workers=args.workers, on_progress=progress)
+        elapsed = time.perf_counter() - started
+
+        print(f"\nexpanded {len(urls)} videos in {expanded:.2f}s")
+        print(f"prefetched {len(urls) - len(failed)} transcripts in {elapsed:.2f}s "
+              f"({elapsed / single:.1f}x one sequential fetch of {single:.2f}s, "
+              f"{len(urls) * single:.1f}s sequentially)")
+        print(f"requests: {server.requests - requests_before}  "
+              f"connections opened: {server.connections - connections_before}  failed: {len(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Offline throughput benchmarks against the replaying fake LLM backend.
+
+Usage:
+    python -m bench                          # run every scenario
+    python -m bench pipeline batch --runs 50 --concurrency 8
+    python -m bench --save-baseline          # record results as the new baselines
+    python -m bench --compare                # fail if slower than the saved baselines
+
+Each scenario reports runs per minute, p50/p95/p99 latency per stage (taken
+from the tracer spans) and peak Python memory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from agents.registry import get_agents
+from agents.content_pipeline import build_content_pipeline, output_fingerprints
+from batch import Checkpoint, run_item
+from utils.scheduler import get_scheduler
+from utils.tracing import get_tracer
+from .fake_llm import FakeLLMServer
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+SAMPLE_TRANSCRIPT = (
+    "Welcome back to the channel. Today we are talking about how small teams use AI to turn videos into articles. "
+    "We used to spend a full day on one video, from transcription to the final edit. "
+    "Now the first draft is ready before lunch, and the editor spends their time on judgment instead of typing. "
+    "The important part for search is speed, because the first articles published after a video catch most of the early queries. "
+    "But you still have to review everything, because automated drafts get details wrong. "
+    "So treat the tools as a fast first pass, not a finished product. Thanks for watching."
+)
+
+
+def sample_transcripts(count):
+    """Transcripts distinct enough that no run is served from the response cache or as a near duplicate"""
+    words = SAMPLE_TRANSCRIPT.split()
+    # An episode marker every few words puts one in every shingle, so transcripts share almost none
+    return [
+        f"Episode {i}. " + " ".join(f"{word} ({i})" if n % 4 == 3 else word for n, word in enumerate(words))
+        for i in range(count)
+    ]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_pipeline_scenario(transcripts, concurrency):
+    """Sequential agents/ pipeline, one video after another as the app runs it"""
+    pipeline = build_content_pipeline(get_agents())
+    tracer = get_tracer()
+    run_ids, failures = [], 0
+    for transcript in transcripts:
+        with tracer.run() as run_id:
+            try:
+                pipeline.run({"source": transcript})
+            except Exception as e:
+                print(f"Pipeline run failed: {str(e)}")
+                failures += 1
+        run_ids.append(run_id)
+    return run_ids, failures
+
+
+def run_swarm_scenario(transcripts, concurrency):
+    """swarm_agents.ContentOrchestrator with every transcript sharing one event loop"""
+    from swarm_agents import ContentOrchestrator
+
+    orchestrator = ContentOrchestrator()
+    results = asyncio.run(orchestrator.process_transcripts(transcripts))
+    return [r["run_id"] for r in results], sum(1 for r in results if not r["success"])
+
+
+def run_batch_scenario(transcripts, concurrency):
+    """The batch.py worker pool with stage checkpointing, result cache and near-duplicate lookup"""
+    pipeline = build_content_pipeline(get_agents(), max_workers=2)
+    fingerprints = output_fingerprints(get_agents())
+    run_ids, failures = [], 0
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = Checkpoint(Path(tmp) / "bench.checkpoint")
+        items = [{"key": str(i), "source": t} for i, t in enumerate(transcripts)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(run_item, item, pipeline, checkpoint, time.perf_counter(), fingerprints) for item in items]
+            for future in futures:
+                try:
+                    run_ids.append(future.result()[1])
+                except Exception as e:
+                    print(f"Batch item failed: {str(e)}")
+                    failures += 1
+        checkpoint.close()
+    return run_ids, failures
+
+
+SCENARIOS = {
+    "pipeline": run_pipeline_scenario,
+    "swarm": run_swarm_scenario,
+    "batch": run_batch_scenario,
+}
+
+
+def summarize(name, run_ids, failures, elapsed, peak_bytes, config):
+    tracer = get_tracer()
+    by_stage = {}
+    for run_id in run_ids:
+        for span in tracer.spans(run_id):
+            by_stage.setdefault(span["stage"], []).append(span["wall_ms"])
+
+    runs = len(run_ids)
+    return {
+        "scenario": name,
+        "runs": runs,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "runs_per_minute": round((runs - failures) / elapsed * 60, 2) if elapsed else 0.0,
+        "peak_memory_mb": round(peak_bytes / (1024 * 1024), 2),
+        "stages": {
+            stage: {
+                "count": len(values),
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99)
+            }
+            for stage, values in sorted(by_stage.items())
+        },
+        "config": config
+    }
+
+
+def print_report(result):
+    print(f"\n== {result['scenario']} ==")
+    print(f"runs: {result['runs']}  failures: {result['failures']}  elapsed: {result['elapsed_s']}s")
+    print(f"throughput: {result['runs_per_minute']} runs/min  peak memory: {result['peak_memory_mb']} MB")
+    print(f"{'stage':<24}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<24}{stats['count']:>7}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}{stats['p99_ms']:>11.1f}")
+
+
+def compare(result, baseline, tolerance):
+    """Print the change against a baseline and return descriptions of regressions beyond tolerance"""
+    regressions = []
+
+    def check(label, current, previous, higher_is_better=False):
+        if not previous:
+            return
+        change = (current - previous) / previous
+        print(f"  {label:<36}{previous:>12.1f} -> {current:>12.1f} ({change:+.1%})")
+        worse = -change if higher_is_better else change
+        if worse > tolerance:
+            regressions.append(f"{result['scenario']}: {label} {change:+.1%}")
+
+    print(f"-- {result['scenario']} vs baseline --")
+    check("runs_per_minute", result["runs_per_minute"], baseline.get("runs_per_minute"), higher_is_better=True)
+    check("peak_memory_mb", result["peak_memory_mb"], baseline.get("peak_memory_mb"))
+    for stage, stats in result["stages"].items():
+        previous = baseline.get("stages", {}).get(stage, {})
+        for metric in ("p50_ms", "p95_ms"):
+            check(f"{stage} {metric}", stats[metric], previous.get(metric))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks against a replaying fake LLM backend")
+    parser.add_argument("scenarios", nargs="*", help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--runs", type=int, default=20, help="Videos per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Workers for the batch scenario")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake backend latency per request, in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Fake backend generation rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/500")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the LLM response cache enabled")
+    parser.add_argument("--save-baseline", action="store_true", help="Save results as the new baselines")
+    parser.add_argument("--compare", action="store_true", help="Compare with saved baselines and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed regression before --compare fails")
+    args = parser.parse_args()
+    scenarios = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    config = {
+        "runs": args.runs,
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate,
+        "cache": args.with_cache
+    }
+    regressions = []
+    with FakeLLMServer(latency=args.latency, tokens_per_second=args.tokens_per_second, error_rate=args.error_rate) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        # Point every client at the fake backend and keep caches out of the real data directory
+        os.environ.update({
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_API_BASE": server.base_url,
+            "OPENAI_BASE_URL": server.base_url,
+            "LLM_CACHE_DIR": str(Path(tmp) / "llm_cache"),
+            "TRACE_DIR": str(Path(tmp) / "traces"),
+            "ARTIFACT_DB": str(Path(tmp) / "artifacts.db"),
+            "RESULT_CACHE_DB": str(Path(tmp) / "results.db"),
+            "NEAR_DUPLICATE_DB": str(Path(tmp) / "near_duplicates.db"),
+            "TRANSCRIPT_STORE_DIR": str(Path(tmp) / "transcript_store"),
+            "LLM_CACHE": "on" if args.with_cache else "off",
+        })
+        # Measure raw throughput unless a request/token budget is set explicitly
+        os.environ.setdefault("LLM_RPM", "0")
+        os.environ.setdefault("LLM_TPM", "0")
+        # Build the agents before timing so construction is not counted against the first scenario
+        get_agents()
+
+        for name in scenarios:
+            tracemalloc.start()
+            started = time.perf_counter()
+            try:
+                run_ids, failures = SCENARIOS[name](sample_transcripts(args.runs), args.concurrency)
+            except ImportError as e:
+                tracemalloc.stop()
+                print(f"\nSkipping {name}: {str(e)}")
+                continue
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            result = summarize(name, run_ids, failures, elapsed, peak, config)
+            print_report(result)
+
+            baseline_path = BASELINE_DIR / f"{name}.json"
+            if args.compare:
+                if baseline_path.exists():
+                    with open(baseline_path, 'r', encoding='utf-8') as f:
+                        regressions += compare(result, json.load(f), args.tolerance)
+                else:
+                    print(f"No baseline for {name} at {baseline_path}")
+            if args.save_baseline:
+                BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(baseline_path, 'w', encoding='utf-8') as f:
+                    json.dump(result, f, indent=2)
+                print(f"Saved baseline to {baseline_path}")
+
+        print(f"\nfake backend: {server.requests} requests, {server.errors} injected errors")
+        stats = get_scheduler().stats()
+        print(f"scheduler: {stats['retries']} retries, {stats['hedges']} hedges, {stats['throttled_ms']:.0f} ms throttled")
+
+    if regressions:
+        print("\nRegressions beyond tolerance:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
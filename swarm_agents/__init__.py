@@ -1,13 +1,25 @@
-from .base_agent import BaseSwarmAgent
-from .seo_agent import SEOSwarmAgent
-from .journalist_agent import JournalistSwarmAgent
-from .social_media_agent import SocialMediaSwarmAgent
-from .orchestrator import ContentOrchestrator
-
-__all__ = [
-    'BaseSwarmAgent',
-    'SEOSwarmAgent',
-    'JournalistSwarmAgent',
-    'SocialMediaSwarmAgent',
-    'ContentOrchestrator'
-]
+import importlib
+
+# Exported names and the submodules defining them, imported on first access
+# so that importing the package does not load swarm, openai and pydantic
+_EXPORTS = {
+    'BaseSwarmAgent': '.base_agent',
+    'SEOSwarmAgent': '.seo_agent',
+    'JournalistSwarmAgent': '.journalist_agent',
+    'SocialMediaSwarmAgent': '.social_media_agent',
+    'ContentOrchestrator': '.orchestrator'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,52 +1,132 @@
-from swarm.types import Agent, Result
+from swarm.types import Agent, Response
+from swarm.util import function_to_json
 from typing import List, Callable, Union, Optional
-from pathlib import Path
+import asyncio
 import json
+import os
+import time
+import weakref
 import openai
-from pydantic import Field, ConfigDict
+from pydantic import ConfigDict
+from utils.artifact_store import get_artifact_store
+from utils.http_clients import new_async_http_client
+from utils.model_router import get_model_router
+from utils.scheduler import get_scheduler
+from utils.tokens import cached_prompt_tokens, estimate_tokens, prompt_fingerprint
+from utils.tracing import current_run_id, get_tracer
+
+# Upper bound on in-flight completion requests per event loop, shared by every agent
+MAX_CONCURRENT_REQUESTS = int(os.getenv("SWARM_MAX_CONCURRENCY", "8"))
+
+# Clients and limiters are bound to the loop they were first used on
+_loop_clients = weakref.WeakKeyDictionary()
+_loop_limiters = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> openai.AsyncOpenAI:
+    """Return the AsyncOpenAI client shared by all agents on the running loop"""
+    loop = asyncio.get_running_loop()
+    client = _loop_clients.get(loop)
+    if client is None:
+        # Retries are left to the shared scheduler so they count against its budgets
+        client = openai.AsyncOpenAI(http_client=new_async_http_client(), max_retries=0)
+        _loop_clients[loop] = client
+    return client
+
+
+def get_limiter() -> asyncio.Semaphore:
+    """Return the concurrency limiter shared by all agents on the running loop"""
+    loop = asyncio.get_running_loop()
+    limiter = _loop_limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        _loop_limiters[loop] = limiter
+    return limiter
+
 
 class BaseSwarmAgent(Agent):
     model_config = ConfigDict(arbitrary_types_allowed=True)
-    
-    output_dir: Path = Field(default_factory=lambda: Path("data"))
-    client: openai.OpenAI = Field(default_factory=openai.OpenAI)
-    
+
+    client: Optional[openai.AsyncOpenAI] = None
+    # Route each request through the model router; off when the agent was given a model
+    route_models: bool = True
+
     def __init__(
         self,
         name: str,
-        model: str = "gpt-4",
+        model: Optional[str] = None,
         instructions: Union[str, Callable[[], str]] = None,
         functions: List[Callable] = None,
         parallel_tool_calls: bool = True
     ):
         super().__init__(
             name=name,
-            model=model,
+            model=model or (get_model_router().route(name, 0) or ["gpt-4"])[0],
+            route_models=model is None,
             instructions=instructions or self.default_instructions,
             functions=functions or [],
             parallel_tool_calls=parallel_tool_calls
         )
-        self.output_dir = self.output_dir / name
-        self.output_dir.mkdir(parents=True, exist_ok=True)
 
     @property
     def default_instructions(self) -> str:
         return "You are a helpful agent."
 
+    async def _complete(self, content: str, tools: bool = True, json_response: bool = False):
+        """Send a single chat completion request and return the response message.
+
+        ``tools=False`` leaves the agent's functions out of the request, and
+        ``json_response`` asks for a JSON object where the model supports it.
+        """
+        instructions = self.instructions if isinstance(self.instructions, str) else self.instructions()
+        estimated = estimate_tokens(instructions) + estimate_tokens(content)
+        model = self.model
+        if self.route_models:
+            model = (get_model_router().route(self.name, estimated) or [model])[0]
+        # Instructions and tools are static per agent and sent first, so they form a cacheable prefix
+        request = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": instructions},
+                {"role": "user", "content": content}
+            ]
+        }
+        if json_response and get_model_router().supports_json_mode(model):
+            request["response_format"] = {"type": "json_object"}
+        if tools and self.functions:
+            request["tools"] = [function_to_json(f) for f in self.functions]
+            request["parallel_tool_calls"] = self.parallel_tool_calls
+            if self.tool_choice:
+                request["tool_choice"] = self.tool_choice
+
+        client = self.client or get_async_client()
+        scheduler = get_scheduler()
+        queued = time.perf_counter()
+        async with get_limiter():
+            queue_ms = (time.perf_counter() - queued) * 1000
+            with get_tracer().span(self.name, model=model, queue_ms=queue_ms) as span:
+                span["prompt_prefix"] = prompt_fingerprint(instructions, json.dumps(request.get("tools", []), sort_keys=True))
+                response = await scheduler.acall(
+                    lambda: client.chat.completions.create(**request),
+                    tokens=estimated,
+                    span=span
+                )
+                if response.usage:
+                    span["prompt_tokens"] = response.usage.prompt_tokens
+                    span["cached_prompt_tokens"] = cached_prompt_tokens(response.usage)
+                    span["completion_tokens"] = response.usage.completion_tokens
+                    scheduler.record_usage(estimated, response.usage.total_tokens)
+        return response.choices[0].message
+
+    async def execute(self, prompt: str, tools: bool = True, json_response: bool = False) -> Response:
+        """Run the prompt against this agent and wrap the reply as a Swarm response"""
+        message = await self._complete(prompt, tools=tools, json_response=json_response)
+        return Response(messages=[message], agent=self)
+
     async def process_message(self, message) -> dict:
         """Process incoming messages and return responses"""
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.instructions if isinstance(self.instructions, str) else self.instructions()},
-                    {"role": "user", "content": message["content"]}
-                ],
-                tools=[{"type": "function", "function": f} for f in self.functions] if self.functions else None,
-                tool_choice=self.tool_choice
-            )
-
-            result = response.choices[0].message.content
+            result = (await self._complete(message["content"])).content
             self.save_output({"message": message["content"], "response": result}, f"{message['id']}.json")
 
             return {
@@ -66,14 +146,9 @@ class BaseSwarmAgent(Agent):
             }
 
     def save_output(self, data: dict, filename: str) -> None:
-        """Save output data for debugging"""
-        output_path = self.output_dir / filename
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
-
-    def load_output(self, filename: str) -> Optional[dict]:
-        """Load previously saved output"""
-        output_path = self.output_dir / filename
-        if output_path.exists():
-            with open(output_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+        """Save output data for debugging under the current run; the write happens in the background"""
+        get_artifact_store().put(current_run_id(), self.name, filename, data)
+
+    def load_output(self, filename: str, run_id: Optional[str] = None) -> Optional[dict]:
+        """Load output saved in a run, by default the current one (or the latest outside a run)"""
+        return get_artifact_store().get(run_id or current_run_id(), self.name, filename)
@@ -16,7 +16,6 @@ class JournalistSwarmAgent(BaseSwarmAgent):
 
         super().__init__(
             name="journalist_agent",
-            model="gpt-4",
             instructions=instructions,
             functions=[
                 self.write_article,
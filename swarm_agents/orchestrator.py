@@ -4,7 +4,14 @@ from typing import Dict, List, Any
 from .seo_agent import SEOSwarmAgent
 from .journalist_agent import JournalistSwarmAgent
 from .social_media_agent import SocialMediaSwarmAgent
+from utils.tracing import get_tracer
+import asyncio
 import json
+import os
+
+PLATFORMS = ["twitter", "linkedin", "facebook"]
+# Generate every platform's post in one request; off sends one request per platform
+SOCIAL_BATCHED = os.getenv("SOCIAL_BATCHED", "on").lower() not in ("0", "off", "false")
 
 class ContentOrchestrator:
     def __init__(self):
@@ -17,6 +24,12 @@ class ContentOrchestrator:
 
     async def process_transcript(self, transcript: str) -> Dict:
         """Process a YouTube transcript through the agent pipeline"""
+        with get_tracer().run() as run_id:
+            result = await self._run_pipeline(transcript)
+        result["run_id"] = run_id
+        return result
+
+    async def _run_pipeline(self, transcript: str) -> Dict:
         try:
             # Step 1: SEO Analysis
             seo_result = await self.seo_agent.analyze(transcript)
@@ -24,11 +37,15 @@ class ContentOrchestrator:
             # Step 2: Article Writing
             article_result = await self.journalist_agent.write(transcript, seo_result)
 
-            # Step 3: Social Media Posts
-            social_posts = {}
-            for platform in ["twitter", "linkedin", "facebook"]:
-                posts = await self.social_media_agent.generate_posts(article_result["content"], platform)
-                social_posts[platform] = posts
+            # Step 3: Social Media Posts, in one request or one concurrent request per platform
+            if SOCIAL_BATCHED:
+                social_posts = await self.social_media_agent.generate_all_posts(article_result["content"], PLATFORMS)
+            else:
+                posts = await asyncio.gather(*(
+                    self.social_media_agent.generate_posts(article_result["content"], platform)
+                    for platform in PLATFORMS
+                ))
+                social_posts = dict(zip(PLATFORMS, posts))
 
             return {
                 "seo_analysis": seo_result,
@@ -44,6 +61,10 @@ class ContentOrchestrator:
                 "success": False
             }
 
+    async def process_transcripts(self, transcripts: List[str]) -> List[Dict]:
+        """Process many transcripts concurrently on the current event loop"""
+        return list(await asyncio.gather(*(self.process_transcript(t) for t in transcripts)))
+
     async def regenerate_article(self, transcript: str, feedback: str) -> str:
         """Regenerate the article based on feedback"""
         try:
@@ -16,7 +16,6 @@ class SEOSwarmAgent(BaseSwarmAgent):
 
         super().__init__(
             name="seo_agent",
-            model="gpt-4",
             instructions=instructions,
             functions=[
                 self.analyze_content,
@@ -101,11 +100,10 @@ class SEOSwarmAgent(BaseSwarmAgent):
     async def optimize(self, content: str, target_keywords: List[str]) -> Dict[str, Any]:
         """Optimize content for given keywords"""
         try:
-            optimization_prompt = f"""Please optimize this content for the following keywords: {', '.join(target_keywords)}
-
-            Content:
+            optimization_prompt = f"""Content:
             {content}
 
+            Please optimize this content for the following keywords: {', '.join(target_keywords)}
             Provide specific recommendations for optimization."""
 
             result = await self.execute(optimization_prompt)
@@ -2,14 +2,12 @@ from .base_agent import BaseSwarmAgent
 from typing import Dict, List, Any
 import json
 from pydantic import Field
+from utils.json_stream import repair_json
+from utils.social_posts import PLATFORM_CONSTRAINTS, enforce_constraints, hashtags, post_text, repair_post
 
 class SocialMediaSwarmAgent(BaseSwarmAgent):
     platform_constraints: Dict[str, Dict[str, int]] = Field(
-        default_factory=lambda: {
-            "twitter": {"max_length": 280, "hashtag_limit": 3},
-            "linkedin": {"max_length": 3000, "hashtag_limit": 5},
-            "facebook": {"max_length": 5000, "hashtag_limit": 10}
-        }
+        default_factory=lambda: {platform: dict(limits) for platform, limits in PLATFORM_CONSTRAINTS.items()}
     )
 
     def __init__(self):
@@ -25,7 +23,6 @@ class SocialMediaSwarmAgent(BaseSwarmAgent):
 
         super().__init__(
             name="social_media_agent",
-            model="gpt-4",
             instructions=instructions,
             functions=[
                 self.create_posts,
@@ -88,7 +85,7 @@ class SocialMediaSwarmAgent(BaseSwarmAgent):
             
             # Use Swarm's function calling to create posts
             result = await self.execute(
-                f"Please create social media posts for {platform} with these constraints:\n\nContent:\n{content}\n\nConstraints:\n{json.dumps(constraints, indent=2)}"
+                f"Content:\n{content}\n\nPlease create social media posts for {platform} with these constraints:\n{json.dumps(constraints, indent=2)}"
             )
 
             # Extract the function call results
@@ -103,6 +100,9 @@ class SocialMediaSwarmAgent(BaseSwarmAgent):
                     "platform": platform
                 }]
 
+            for post in posts if isinstance(posts, list) else [posts]:
+                if isinstance(post, dict) and post.get("content"):
+                    self._apply_text(post, repair_post(post_text(post), constraints, max_trim=None))
             return posts
 
         except Exception as e:
@@ -114,6 +114,69 @@ class SocialMediaSwarmAgent(BaseSwarmAgent):
                 "platform": platform
             }]
 
+    async def generate_all_posts(self, content: str, platforms: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Generate one post per platform in a single request, then enforce each platform's limits.
+
+        Small violations are repaired locally; only the platforms that still fail
+        are regenerated, together in one more request, and whatever fails after
+        that is trimmed to fit.
+        """
+        posts = await self._request_posts(content, platforms)
+        valid, failed = enforce_constraints(posts, platforms, self.platform_constraints)
+        if failed:
+            feedback = "\n".join(f"- {p}: {', '.join(problems)}" for p, (_, problems) in failed.items())
+            print(f"Regenerating social posts that broke their limits:\n{feedback}")
+            retried = await self._request_posts(content, list(failed), feedback)
+            fixed, still_failed = enforce_constraints(retried, list(failed), self.platform_constraints)
+            valid.update(fixed)
+            posts.update({p: retried[p] for p in fixed})
+            for platform, (text, _) in still_failed.items():
+                text = text or failed[platform][0]
+                valid[platform] = repair_post(text, self.platform_constraints.get(platform, {}), max_trim=None) or ""
+
+        result = {}
+        for platform in platforms:
+            post = posts.get(platform)
+            post = dict(post) if isinstance(post, dict) else {"best_posting_time": ""}
+            post["platform"] = platform
+            result[platform] = self._apply_text(post, valid[platform])
+        return result
+
+    async def _request_posts(self, content: str, platforms: List[str], feedback: str = "") -> Dict[str, Any]:
+        """One request for posts on several platforms, parsed into {platform: post}; {} on failure.
+
+        The per-platform tools are left out: offered them, a model answers with one
+        tool call per platform instead of the single JSON object asked for here.
+        """
+        constraints = {p: self.platform_constraints.get(p, {}) for p in platforms}
+        prompt = (
+            f"Content:\n{content}\n\n"
+            "Please create one post for each of these platforms in a single response, as a JSON object "
+            "mapping each platform to its post, in this format:\n"
+            '{"<platform>": {"content": "post text with hashtags", "hashtags": ["#tag"], "best_posting_time": ""}}\n\n'
+            f"Follow these constraints:\n{json.dumps(constraints, indent=2)}"
+        )
+        if feedback:
+            prompt += f"\n\nYour previous posts broke these limits, rewrite them:\n{feedback}"
+        try:
+            result = await self.execute(prompt, tools=False, json_response=True)
+            raw = result.messages[0].content if result.messages else ""
+            try:
+                posts = json.loads(raw or "")
+            except json.JSONDecodeError:
+                posts = repair_json(raw or "")
+            return posts if isinstance(posts, dict) else {}
+        except Exception as e:
+            print(f"Error generating social media posts: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _apply_text(post: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """Set a post's content, keeping its hashtag list in step with the text"""
+        post["content"] = text
+        post["hashtags"] = hashtags(text)
+        return post
+
     async def optimize_posts(self, posts: List[Dict[str, Any]], metrics: Dict[str, float]) -> List[Dict[str, Any]]:
         """Optimize posts based on performance metrics"""
         try:
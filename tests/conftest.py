@@ -0,0 +1,22 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Tests import the app's top-level packages (agents, utils) the way the scripts do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep the process-wide stores out of the real data directory, as the benchmarks do
+_data = Path(tempfile.mkdtemp(prefix="youtubewriter-tests-"))
+for name, default in {
+    "ARTIFACT_DB": _data / "artifacts.db",
+    "JOB_DB": _data / "jobs.db",
+    "LLM_CACHE_DIR": _data / "llm_cache",
+    "NEAR_DUPLICATE_DB": _data / "near_duplicates.db",
+    "RESULT_CACHE_DB": _data / "results.db",
+    "TRACE_DIR": _data / "traces",
+    "TRANSCRIPT_STORE_DIR": _data / "transcript_store",
+}.items():
+    os.environ.setdefault(name, str(default))
+# Agents build an OpenAI client on construction; tests replace its LLM before any call
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from utils.artifact_store import ArtifactStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(db_path=tmp_path / "artifacts.db", flush_interval=0.01)
+
+
+def test_artifacts_are_read_back_by_run(store):
+    store.put("run-1", "seo_agent", "seo_analysis.json", {"title": "One"})
+    store.put("run-2", "seo_agent", "seo_analysis.json", {"title": "Two"})
+    store.put("run-1", "editor_agent", "edited.md", "Edited text")
+    # Readable while still queued, and after the background write
+    assert store.get("run-1", "seo_agent", "seo_analysis.json") == {"title": "One"}
+    store.flush()
+    assert store.get("run-1", "seo_agent", "seo_analysis.json") == {"title": "One"}
+    assert store.get("run-2", "seo_agent", "seo_analysis.json") == {"title": "Two"}
+    assert store.get("run-1", "editor_agent", "edited.md") == "Edited text"
+    assert store.get("run-3", "seo_agent", "seo_analysis.json") is None
+
+
+def test_without_a_run_the_latest_artifact_is_returned(store):
+    store.put("run-1", "seo_agent", "seo_analysis.json", {"title": "One"})
+    store.flush()
+    store.put("run-2", "seo_agent", "seo_analysis.json", {"title": "Two"})
+    assert store.get(None, "seo_agent", "seo_analysis.json") == {"title": "Two"}
+    store.flush()
+    assert store.get(None, "seo_agent", "seo_analysis.json") == {"title": "Two"}
+    assert store.get(None, "seo_agent", "missing.json") is None
+
+
+def test_list_run_and_artifacts_saved_outside_a_run(store):
+    store.put("run-1", "seo_agent", "a.json", [1, 2])
+    store.put("run-1", "social_media_agent", "b.json", {"twitter": "hi"})
+    store.put(None, "seo_agent", "a.json", [3])
+    assert store.list_run("run-1") == {("seo_agent", "a.json"): [1, 2], ("social_media_agent", "b.json"): {"twitter": "hi"}}
+    assert store.get("", "seo_agent", "a.json") == [3]
+
+
+def test_prune_keeps_the_most_recent_runs(tmp_path):
+    store = ArtifactStore(db_path=tmp_path / "artifacts.db", flush_interval=0.01, keep_runs=2)
+    for run in ("run-1", "run-2", "run-3"):
+        store.put(run, "seo_agent", "a.json", {"run": run})
+        store.flush()
+    with sqlite3.connect(store.db_path) as conn:
+        store._prune(conn)
+    assert store.get("run-1", "seo_agent", "a.json") is None
+    assert store.get("run-3", "seo_agent", "a.json") == {"run": "run-3"}
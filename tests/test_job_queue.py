@@ -0,0 +1,90 @@
+import pytest
+
+from utils.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("utils.job_queue.time.time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return JobQueue(db_path=tmp_path / "jobs.db", heartbeat_timeout=30.0)
+
+
+def test_claim_takes_the_oldest_queued_job_once(queue, clock):
+    first = queue.submit("video-1", {"overlap_edit": True})
+    clock.now += 1
+    second = queue.submit("video-2")
+    assert queue.claim("w1") == {"id": first, "source": "video-1", "options": {"overlap_edit": True}}
+    assert queue.claim("w2")["id"] == second
+    assert queue.claim("w3") is None
+    assert queue.get(first)["status"] == RUNNING
+
+
+def test_events_and_status_transitions(queue):
+    job_id = queue.submit("video")
+    assert queue.get(job_id)["status"] == QUEUED
+    queue.claim("w1")
+    queue.add_event(job_id, "start", "seo")
+    queue.add_event(job_id, "done", "seo", {"seo": {"title": "T"}})
+    events = queue.events(job_id)
+    assert [(e["kind"], e["stage"]) for e in events] == [("start", "seo"), ("done", "seo")]
+    assert queue.events(job_id, after=events[0]["seq"]) == events[1:]
+    assert queue.results(job_id) == {"seo": {"title": "T"}}
+
+    queue.finish(job_id, trace=[{"stage": "seo"}])
+    job = queue.get(job_id)
+    assert job["status"] == DONE
+    assert job["trace"] == [{"stage": "seo"}]
+    assert job["finished"] is not None
+
+
+def test_failed_job_keeps_its_error(queue):
+    job_id = queue.submit("video")
+    queue.claim("w1")
+    queue.fail(job_id, "ValueError: bad")
+    assert queue.get(job_id)["status"] == FAILED
+    assert queue.get(job_id)["error"] == "ValueError: bad"
+    assert queue.get("missing") is None
+
+
+def test_jobs_of_a_silent_worker_are_requeued(queue, clock):
+    job_id = queue.submit("video")
+    queue.heartbeat("w1")
+    queue.claim("w1")
+    queue.add_event(job_id, "done", "seo", {"seo": {}})
+    assert queue.requeue_stale() == 0
+    assert queue.live_workers() == 1
+
+    clock.now += 31
+    assert queue.live_workers() == 0
+    assert queue.requeue_stale() == 1
+    assert queue.get(job_id)["status"] == QUEUED
+    # The next attempt starts over without the dead attempt's events
+    queue.heartbeat("w2")
+    assert queue.claim("w2")["id"] == job_id
+    assert queue.events(job_id) == []
+
+
+def test_withdraw_only_takes_back_unclaimed_jobs(queue, clock):
+    claimed = queue.submit("video-1")
+    clock.now += 1
+    queued = queue.submit("video-2")
+    queue.claim("w1")
+    assert queue.withdraw(queued, "no workers")
+    assert queue.get(queued)["status"] == FAILED
+    assert queue.get(queued)["error"] == "no workers"
+    assert not queue.withdraw(claimed)
+    assert queue.get(claimed)["status"] == RUNNING
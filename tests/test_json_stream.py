@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from utils.json_stream import JSONFieldStream, repair_json
+
+SEO = {
+    "title": "How AI Is Reshaping Publishing",
+    "keywords": ["ai", "video to article"],
+    "user_intent": ["learn, quickly"],
+    "meta_description": "A \"quoted\" {brace} description"
+}
+
+
+def test_valid_json_passes_through():
+    assert repair_json(json.dumps(SEO)) == SEO
+
+
+@pytest.mark.parametrize("text", [
+    "```json\n" + json.dumps(SEO) + "\n```",
+    "Here is the analysis:\n" + json.dumps(SEO) + "\nHope this helps!",
+])
+def test_fences_and_surrounding_prose_are_ignored(text):
+    assert repair_json(text) == SEO
+
+
+def test_trailing_commas_are_dropped():
+    assert repair_json('{"a": [1, 2,], "b": {"c": 3,},}') == {"a": [1, 2], "b": {"c": 3}}
+
+
+def test_cut_off_string_is_closed():
+    assert repair_json('{"title": "Cut off mid') == {"title": "Cut off mid"}
+
+
+def test_cut_off_structure_drops_the_unfinished_member():
+    assert repair_json('{"title": "T", "keywords": ["a", "b"], "user_intent": [') == {
+        "title": "T", "keywords": ["a", "b"], "user_intent": []
+    }
+    assert repair_json('{"title": "T", "meta') == {"title": "T"}
+
+
+def test_unsalvageable_text_returns_none():
+    assert repair_json("no json here") is None
+    assert repair_json("") is None
+
+
+def stream(text, size):
+    parser = JSONFieldStream()
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return parser, completed
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_fields_are_reported_in_order_whatever_the_chunking(size):
+    parser, completed = stream("```json\n" + json.dumps(SEO, indent=2) + "\n```", size)
+    assert completed == list(SEO.items())
+    assert parser.fields == SEO
+    assert parser.done
+
+
+def test_field_is_reported_as_soon_as_it_is_complete():
+    parser = JSONFieldStream()
+    assert parser.feed('{"title": "T", "keywords": ["a",') == [("title", "T")]
+    assert parser.feed(' "b"], "tldr') == [("keywords", ["a", "b"])]
+    assert parser.feed('_points": []}') == [("tldr_points", [])]
+    assert parser.done
+
+
+def test_unquoted_or_broken_values_are_salvaged():
+    parser = JSONFieldStream()
+    parser.feed('{"count": 3, "items": [1, 2,], "flag": true}')
+    assert parser.fields == {"count": 3, "items": [1, 2], "flag": True}
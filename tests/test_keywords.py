@@ -0,0 +1,64 @@
+from agents.seo_agent import SEOAgent
+from utils.keywords import STOPWORDS, extract_keywords, extract_keywords_batch
+
+TRANSCRIPT = (
+    "Today we are looking at solar panels for small homes. Solar panels convert sunlight into electricity, "
+    "and a good inverter keeps the solar panels running efficiently all year. Battery storage lets you keep "
+    "the electricity for the evening, so battery storage matters as much as the panels themselves. "
+    "We compare three inverter brands and two battery storage systems in real homes."
+)
+
+
+def test_recurring_phrases_rank_first():
+    keywords = extract_keywords(TRANSCRIPT)["keywords"]
+    assert keywords[0] in ("solar panels", "battery storage")
+    assert {"solar panels", "battery storage"} <= set(keywords)
+
+
+def test_keywords_skip_stopwords_and_covered_phrases():
+    keywords = extract_keywords(TRANSCRIPT)["keywords"]
+    assert not any(word in STOPWORDS for keyword in keywords for word in keyword.split())
+    # "storage" alone is covered by "battery storage"
+    assert "storage" not in keywords
+    assert len(keywords) == len(set(keywords)) <= 10
+
+
+def test_tldr_candidates_keep_transcript_order():
+    candidates = extract_keywords(TRANSCRIPT, tldr_k=2)["tldr_candidates"]
+    assert len(candidates) == 2
+    assert TRANSCRIPT.index(candidates[0]) < TRANSCRIPT.index(candidates[1])
+
+
+def test_url_slug_comes_from_the_top_keywords():
+    result = extract_keywords(TRANSCRIPT)
+    assert result["url_slug"] == "-".join(" ".join(result["keywords"][:2]).split())
+
+
+def test_batch_matches_single_documents_without_shared_words():
+    other = "Sourdough bread needs a lively starter. Feed the starter daily and bake the sourdough bread hot."
+    batch = extract_keywords_batch([TRANSCRIPT, other])
+    assert batch[0]["keywords"][0] in ("solar panels", "battery storage")
+    assert "sourdough bread" in batch[1]["keywords"]
+    assert not set(batch[0]["keywords"]) & set(batch[1]["keywords"])
+
+
+def test_empty_text_has_no_candidates():
+    assert extract_keywords("") == {"keywords": [], "tldr_candidates": [], "url_slug": ""}
+    assert extract_keywords("um uh yeah okay") == {"keywords": [], "tldr_candidates": [], "url_slug": ""}
+
+
+def test_run_on_captions_are_split_into_sentences():
+    captions = " ".join(["solar panels save money on energy bills every month"] * 20)
+    assert extract_keywords(captions)["tldr_candidates"]
+
+
+def test_local_seo_uses_the_extracted_slug():
+    candidates = extract_keywords(TRANSCRIPT)
+    seo_data = SEOAgent._normalize(SEOAgent.local_seo(candidates))
+    assert seo_data["url_slug"] == candidates["url_slug"]
+    assert seo_data["keywords"] == candidates["keywords"]
+    assert SEOAgent.local_seo({"keywords": [], "tldr_candidates": [], "url_slug": ""}) is None
+
+
+def test_normalize_slugifies_the_title_without_an_extracted_slug():
+    assert SEOAgent._normalize({"title": "Solar Panels: A Guide"})["url_slug"] == "solar-panels-a-guide"
@@ -0,0 +1,73 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils.llm_cache import LLMCache
+
+MESSAGES = [SimpleNamespace(type="system", content="You are an editor."), SimpleNamespace(type="human", content="Edit")]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(cache_dir=tmp_path)
+
+
+def test_key_covers_model_settings_prompt_version_and_messages():
+    key = LLMCache.make_key("gpt-4o-mini", 0.7, "editor_agent:1", MESSAGES)
+    assert key == LLMCache.make_key("gpt-4o-mini", 0.7, "editor_agent:1", list(MESSAGES))
+    assert key != LLMCache.make_key("gpt-4o", 0.7, "editor_agent:1", MESSAGES)
+    assert key != LLMCache.make_key("gpt-4o-mini", 0.2, "editor_agent:1", MESSAGES)
+    assert key != LLMCache.make_key("gpt-4o-mini", 0.7, "editor_agent:2", MESSAGES)
+    assert key != LLMCache.make_key("gpt-4o-mini", 0.7, "editor_agent:1", MESSAGES[:1])
+
+
+def test_set_then_get_hits_memory(cache):
+    cache.set("k", "response")
+    assert cache.get("k") == "response"
+    assert cache.get("missing") is None
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_hit_is_promoted_to_memory(cache, tmp_path):
+    cache.set("k", "response")
+    fresh = LLMCache(cache_dir=tmp_path)
+    assert fresh.get("k") == "response"
+    assert fresh.get("k") == "response"
+    stats = fresh.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["memory_entries"]) == (1, 1, 1)
+
+
+def test_memory_tier_keeps_the_most_recently_used(tmp_path):
+    cache = LLMCache(cache_dir=tmp_path, max_memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.stats()["memory_entries"] == 2
+    # "b" was pushed out of memory but is still on disk
+    assert cache.get("b") == "2"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_the_least_recently_used(tmp_path):
+    cache = LLMCache(cache_dir=tmp_path, max_memory_entries=0)
+    cache.set("a", "x" * 100)
+    entry_size = cache.stats()["disk_bytes"]
+    cache.max_disk_bytes = entry_size * 3 - 1
+    cache.set("b", "x" * 100)
+    os.utime(tmp_path / "a.json", (1, 1))
+    os.utime(tmp_path / "b.json", (2, 2))
+    cache.get("a")
+    cache.set("c", "x" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["disk_bytes"] <= cache.max_disk_bytes
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = LLMCache(cache_dir=tmp_path, enabled=False)
+    cache.set("k", "response")
+    assert cache.get("k") is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,121 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from utils.llm_cache import LLMCache
+from utils.model_router import ModelRouter
+
+PROFILES = {
+    "models": {
+        "small": {"tier": 1, "context_tokens": 16000, "latency_ms": 300, "tokens_per_second": 100,
+                  "cost_per_1k_input": 0.0005, "cost_per_1k_output": 0.0015},
+        "mini": {"tier": 1, "context_tokens": 128000, "latency_ms": 400, "tokens_per_second": 90,
+                 "cost_per_1k_input": 0.00015, "cost_per_1k_output": 0.0006},
+        "medium": {"tier": 2, "context_tokens": 128000, "latency_ms": 600, "tokens_per_second": 60,
+                   "cost_per_1k_input": 0.005, "cost_per_1k_output": 0.015},
+        "large": {"tier": 3, "context_tokens": 128000, "latency_ms": 900, "tokens_per_second": 30,
+                  "cost_per_1k_input": 0.01, "cost_per_1k_output": 0.03, "json_mode": False},
+    },
+    "stages": {
+        "default": {"target": "latency", "output_tokens": 500, "rules": [{"min_tier": 1}]},
+        "writer": {"target": "cost", "output_tokens": 1000,
+                   "rules": [{"max_input_tokens": 50000, "min_tier": 1}, {"min_tier": 2}]},
+    }
+}
+
+
+def test_stage_target_picks_among_the_allowed_tier():
+    router = ModelRouter(PROFILES)
+    assert router.route("default", 1000)[0] == "small"
+    assert router.route("writer", 1000)[0] == "mini"
+    assert ModelRouter(PROFILES, target="quality").route("writer", 1000)[0] == "large"
+
+
+def test_fallbacks_are_bigger_models_in_tier_order():
+    assert ModelRouter(PROFILES).route("default", 1000) == ["small", "medium", "large"]
+    assert ModelRouter(PROFILES, max_fallbacks=1).route("default", 1000) == ["small", "medium"]
+
+
+def test_rules_raise_the_tier_for_large_inputs():
+    assert ModelRouter(PROFILES).route("writer", 60000) == ["medium", "large"]
+
+
+def test_models_whose_context_is_too_small_are_skipped():
+    assert ModelRouter(PROFILES).route("default", 20000)[0] == "mini"
+
+
+def test_unknown_stage_uses_the_default_rules():
+    router = ModelRouter(PROFILES)
+    assert router.route("editor_agent", 1000) == router.route("default", 1000)
+
+
+def test_disabled_router_leaves_the_choice_to_the_agent():
+    assert ModelRouter(PROFILES, enabled=False).route("default", 1000) == []
+    assert ModelRouter({}).route("default", 1000) == []
+    assert ModelRouter(PROFILES, enabled=False).fingerprint("default") == ""
+    with pytest.raises(ValueError):
+        ModelRouter(PROFILES, target="fastest")
+
+
+def test_json_mode_and_fingerprint():
+    router = ModelRouter(PROFILES)
+    assert router.supports_json_mode("mini")
+    assert not router.supports_json_mode("large")
+    assert router.fingerprint("writer") != ModelRouter(PROFILES, target="quality").fingerprint("writer")
+
+
+def test_shipped_profiles_start_every_stage_on_tier_one():
+    router = ModelRouter.from_file()
+    for stage in ("default", "seo_agent", "journalist_agent", "editor_agent", "social_media_agent"):
+        for tokens in (500, 3000, 20000):
+            models = router.route(stage, tokens)
+            assert router.models[models[0]]["tier"] == 1, (stage, tokens, models)
+
+
+class FakeChat:
+    """Stands in for ChatOpenAI, answering from a per-model table and recording which models were asked"""
+    model_name = "fake"
+    temperature = 0.7
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.models = []
+
+    def generate(self, batches, model=None, **kwargs):
+        self.models.append(model)
+        message = SimpleNamespace(content=self.replies[model])
+        return SimpleNamespace(generations=[[SimpleNamespace(message=message)]], llm_output={})
+
+
+class Agent(BaseAgent):
+    def process(self, input_data):
+        return None
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    def make(replies):
+        agent = Agent("default")
+        agent.llm = FakeChat(replies)
+        agent.cache = LLMCache(cache_dir=tmp_path)
+        agent.router = ModelRouter(PROFILES)
+        return agent
+    return make
+
+
+def test_invalid_response_is_retried_on_the_next_bigger_model(make_agent):
+    agent = make_agent({"small": "nope", "medium": "ok", "large": "ok"})
+    messages = [SimpleNamespace(type="human", content="Write")]
+    assert agent.invoke_llm(messages, validate=lambda content: content == "ok") == "ok"
+    assert agent.llm.models == ["small", "medium"]
+    # The accepted response is cached under its model; the rejected one is not
+    assert agent.invoke_llm(messages, validate=lambda content: content == "ok") == "ok"
+    assert agent.llm.models == ["small", "medium", "small"]
+
+
+def test_last_response_is_returned_when_every_model_fails(make_agent):
+    agent = make_agent({"small": "a", "medium": "b", "large": "c"})
+    messages = [SimpleNamespace(type="human", content="Write")]
+    assert agent.invoke_llm(messages, validate=lambda content: False) == "c"
+    assert agent.llm.models == ["small", "medium", "large"]
@@ -0,0 +1,93 @@
+import random
+import sqlite3
+
+import pytest
+
+from utils.near_duplicates import NearDuplicateIndex
+
+_rng = random.Random(7)
+VOCABULARY = [f"word{i}" for i in range(2000)]
+TRANSCRIPT = " ".join(_rng.choice(VOCABULARY) for _ in range(600))
+# The same talk with a short intro added and the last few sentences cut
+CLIP = "welcome back to the channel " + " ".join(TRANSCRIPT.split()[:570])
+OTHER = " ".join(_rng.choice(VOCABULARY) for _ in range(600))
+
+
+@pytest.fixture
+def make_index(tmp_path):
+    def make(policy="auto", **kwargs):
+        return NearDuplicateIndex(db_path=tmp_path / "near_duplicates.db", policy=policy, **kwargs)
+    return make
+
+
+def test_signature_similarity_tracks_shared_text(make_index):
+    index = make_index()
+    signature = index.signature(TRANSCRIPT)
+    assert index.similarity(signature, index.signature(TRANSCRIPT)) == 1.0
+    assert index.similarity(signature, index.signature(CLIP)) > 0.8
+    assert index.similarity(signature, index.signature(OTHER)) < 0.1
+    assert index.signature("") is None
+
+
+def test_signatures_are_comparable_across_instances(make_index, tmp_path):
+    other = NearDuplicateIndex(db_path=tmp_path / "other.db", policy="reuse")
+    assert list(make_index().signature(TRANSCRIPT)) == list(other.signature(TRANSCRIPT))
+
+
+def test_query_returns_matches_above_the_threshold(make_index):
+    index = make_index()
+    index.add("video:a", index.signature(TRANSCRIPT))
+    index.add("video:b", index.signature(OTHER))
+    matches = index.query(index.signature(CLIP))
+    assert [key for key, _ in matches] == ["video:a"]
+    assert matches[0][1] >= index.threshold
+    assert make_index(threshold=0.99).query(index.signature(CLIP)) == []
+
+
+def test_query_excludes_the_source_itself(make_index):
+    index = make_index()
+    signature = index.signature(TRANSCRIPT)
+    index.add("video:a", signature)
+    assert index.query(signature, exclude="video:a") == []
+    assert index.query(signature)[0][0] == "video:a"
+
+
+def test_oldest_signatures_are_dropped_past_max_entries(make_index):
+    index = make_index(max_entries=1)
+    index.add("video:a", index.signature(TRANSCRIPT))
+    index.add("video:b", index.signature(OTHER))
+    assert index.query(index.signature(TRANSCRIPT)) == []
+    assert index.query(index.signature(OTHER))[0][0] == "video:b"
+
+
+@pytest.mark.parametrize("policy, similarity, expected", [
+    ("reuse", 0.85, "reuse"),
+    ("adapt", 0.99, "adapt"),
+    ("auto", 0.99, "reuse"),
+    ("auto", 0.85, "adapt"),
+    ("auto", 0.5, None),
+])
+def test_policy_modes(make_index, policy, similarity, expected):
+    assert make_index(policy).mode(similarity) == expected
+
+
+def test_off_policy_does_nothing(make_index, tmp_path):
+    index = make_index("off")
+    assert not index.enabled
+    assert index.mode(1.0) is None
+    assert index.query([1, 2, 3]) == []
+    index.add("video:a", [1, 2, 3])
+    assert not (tmp_path / "near_duplicates.db").exists()
+
+
+def test_unknown_policy_is_rejected(make_index):
+    with pytest.raises(ValueError):
+        make_index("always")
+
+
+def test_index_from_an_older_signature_scheme_is_cleared(make_index, tmp_path):
+    index = make_index()
+    index.add("video:a", index.signature(TRANSCRIPT))
+    with sqlite3.connect(tmp_path / "near_duplicates.db") as conn:
+        conn.execute("PRAGMA user_version = 1")
+    assert make_index().query(index.signature(TRANSCRIPT)) == []
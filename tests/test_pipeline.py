@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from utils.pipeline import Pipeline, Stage, StageTimeout
+
+
+def test_stage_starts_when_its_inputs_are_ready():
+    order = []
+
+    def record(name, value):
+        order.append(name)
+        return value
+
+    pipeline = Pipeline([
+        Stage("c", lambda a, b: record("c", a + b), inputs=["a", "b"]),
+        Stage("a", lambda source: record("a", source + 1), inputs=["source"]),
+        Stage("b", lambda a: record("b", a * 2), inputs=["a"]),
+    ])
+    values = pipeline.run({"source": 1})
+    assert values == {"source": 1, "a": 2, "b": 4, "c": 6}
+    assert order == ["a", "b", "c"]
+
+
+def test_values_already_present_skip_their_stage():
+    calls = []
+    pipeline = Pipeline([
+        Stage("a", lambda source: calls.append("a") or 1, inputs=["source"]),
+        Stage("b", lambda a: calls.append("b") or a + 1, inputs=["a"]),
+    ])
+    assert pipeline.run({"source": 0, "a": 10})["b"] == 11
+    assert calls == ["b"]
+
+
+def test_targets_run_only_the_stages_they_need():
+    calls = []
+    pipeline = Pipeline([
+        Stage("a", lambda source: calls.append("a") or 1, inputs=["source"]),
+        Stage("b", lambda a: calls.append("b") or 2, inputs=["a"]),
+        Stage("c", lambda source: calls.append("c") or 3, inputs=["source"]),
+    ])
+    values = pipeline.run({"source": 0}, targets=["b"])
+    assert sorted(calls) == ["a", "b"]
+    assert "c" not in values
+
+
+def test_multiple_outputs_and_stage_callbacks():
+    started, done = [], []
+    pipeline = Pipeline([
+        Stage("split", lambda source: {"left": source[0], "right": source[1]}, inputs=["source"],
+              outputs=["left", "right"]),
+    ])
+    values = pipeline.run({"source": "xy"}, on_stage_start=started.append,
+                          on_stage_done=lambda name, outputs: done.append((name, outputs)))
+    assert values["left"] == "x" and values["right"] == "y"
+    assert started == ["split"]
+    assert done == [("split", {"left": "x", "right": "y"})]
+
+
+def test_emitted_outputs_start_dependents_before_the_stage_finishes():
+    dependent_ran = threading.Event()
+
+    def producer(source, emit):
+        emit(early=source.upper())
+        # Only finishes once the dependent has run on the early output
+        assert dependent_ran.wait(timeout=5)
+        # Emitted outputs need not be repeated in the returned dict
+        return {"final": source + "!"}
+
+    def consumer(early):
+        dependent_ran.set()
+        return early + "?"
+
+    pipeline = Pipeline([
+        Stage("producer", producer, inputs=["source"], outputs=["early", "final"], emits=["early"]),
+        Stage("consumer", consumer, inputs=["early"]),
+    ])
+    values = pipeline.run({"source": "hi"})
+    assert values == {"source": "hi", "early": "HI", "final": "hi!", "consumer": "HI?"}
+
+
+def test_emitting_an_undeclared_output_fails():
+    pipeline = Pipeline([
+        Stage("producer", lambda source, emit: emit(other=1), inputs=["source"], emits=["early"],
+              outputs=["early", "producer"]),
+    ])
+    with pytest.raises(ValueError):
+        pipeline.run({"source": 0})
+
+
+def test_stage_timeout():
+    release = threading.Event()
+    pipeline = Pipeline([Stage("slow", lambda source: release.wait(5), inputs=["source"], timeout=0.1)])
+    started = time.monotonic()
+    with pytest.raises(StageTimeout):
+        pipeline.run({"source": 0})
+    release.set()
+    assert time.monotonic() - started < 2
+
+
+def test_missing_input_is_reported():
+    pipeline = Pipeline([Stage("a", lambda missing: 1, inputs=["missing"])])
+    with pytest.raises(ValueError, match="missing"):
+        pipeline.run({})
+
+
+def test_two_stages_cannot_produce_the_same_output():
+    pipeline = Pipeline([Stage("a", lambda source: 1, inputs=["source"], outputs=["x"])])
+    with pytest.raises(ValueError):
+        pipeline.add_stage(Stage("b", lambda source: 2, inputs=["source"], outputs=["x"]))
+
+
+def test_stage_errors_propagate():
+    def fail(source):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        Pipeline([Stage("a", fail, inputs=["source"])]).run({"source": 0})
@@ -0,0 +1,99 @@
+from itertools import count
+from types import SimpleNamespace
+
+import pytest
+
+from agents.content_pipeline import run_cached
+from utils.pipeline import Pipeline, Stage
+from utils.result_cache import DegradedOutput, ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(db_path=tmp_path / "results.db")
+
+
+def test_outputs_are_returned_under_their_current_fingerprint(cache):
+    cache.put("video:a", "seo", "f1", {"title": "A"})
+    cache.put("video:a", "article", "f2", "text")
+    assert cache.get_many("video:a", {"seo": "f1", "article": "f2"}) == {"seo": {"title": "A"}, "article": "text"}
+    assert cache.get_many("video:b", {"seo": "f1"}) == {}
+
+
+def test_changed_fingerprint_misses_only_that_output(cache):
+    cache.put("video:a", "seo", "f1", {"title": "A"})
+    cache.put("video:a", "article", "f2", "text")
+    assert cache.get_many("video:a", {"seo": "f1", "article": "changed"}) == {"seo": {"title": "A"}}
+
+
+def test_put_replaces_an_older_fingerprint(cache):
+    cache.put("video:a", "seo", "old", {"title": "Old"})
+    cache.put("video:a", "seo", "new", {"title": "New"})
+    assert cache.get_many("video:a", {"seo": "old"}) == {}
+    assert cache.get_many("video:a", {"seo": "new"}) == {"seo": {"title": "New"}}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = count(1)
+    monkeypatch.setattr("utils.result_cache.time.time", lambda: next(clock))
+    cache = ResultCache(db_path=tmp_path / "results.db", max_entries=2)
+    cache.put("video:a", "seo", "f", 1)
+    cache.put("video:b", "seo", "f", 2)
+    cache.get_many("video:a", {"seo": "f"})
+    cache.put("video:c", "seo", "f", 3)
+    assert cache.get_many("video:b", {"seo": "f"}) == {}
+    assert cache.get_many("video:a", {"seo": "f"}) == {"seo": 1}
+    assert cache.get_many("video:c", {"seo": "f"}) == {"seo": 3}
+
+
+def test_invalidate_and_disabled_cache(tmp_path, cache):
+    cache.put("video:a", "seo", "f", 1)
+    cache.invalidate("video:a")
+    assert cache.get_many("video:a", {"seo": "f"}) == {}
+
+    disabled = ResultCache(db_path=tmp_path / "results.db", enabled=False)
+    disabled.put("video:a", "seo", "f", 1)
+    assert cache.get_many("video:a", {"seo": "f"}) == {}
+    assert disabled.get_many("video:a", {"seo": "f"}) == {}
+
+
+def test_degraded_outputs_are_not_stored(cache):
+    cache.put("video:a", "seo", "f", DegradedOutput(title="Article Title"))
+    assert cache.get_many("video:a", {"seo": "f"}) == {}
+
+
+def _pipeline(seo, calls):
+    def analyze(source):
+        calls.append("seo")
+        return seo()
+
+    def write(seo):
+        calls.append("article")
+        return f"article about {seo['title']}"
+
+    return Pipeline([
+        Stage("seo", analyze, inputs=["source"]),
+        Stage("article", write, inputs=["seo"]),
+    ])
+
+
+AGENTS = {"transcript": SimpleNamespace(source_key=lambda source: f"text:{source}")}
+FINGERPRINTS = {"seo": "f1", "article": "f2"}
+
+
+def test_run_cached_reuses_stored_outputs(cache):
+    calls = []
+    pipeline = _pipeline(lambda: {"title": "Solar"}, calls)
+    first = run_cached(pipeline, AGENTS, "video", FINGERPRINTS, cache)
+    second = run_cached(pipeline, AGENTS, "video", FINGERPRINTS, cache)
+    assert first["article"] == second["article"] == "article about Solar"
+    assert calls == ["seo", "article"]
+
+
+def test_run_cached_skips_degraded_outputs_and_what_was_built_from_them(cache):
+    calls = []
+    pipeline = _pipeline(lambda: DegradedOutput(title="Article Title"), calls)
+    run_cached(pipeline, AGENTS, "video", FINGERPRINTS, cache)
+    run_cached(pipeline, AGENTS, "video", FINGERPRINTS, cache)
+    assert calls == ["seo", "article"] * 2
+    assert cache.get_many("text:video", FINGERPRINTS) == {}
@@ -0,0 +1,138 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from utils import scheduler as scheduler_module
+from utils.scheduler import RequestScheduler, TokenBucket, is_retryable
+
+
+def status_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return openai.APIStatusError(f"status {status}", response=response, body=None)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps instead of sleeping, and make the jittered backoff take its upper bound"""
+    recorded = []
+    monkeypatch.setattr(scheduler_module.time, "sleep", recorded.append)
+    monkeypatch.setattr(scheduler_module.random, "uniform", lambda low, high: high)
+    return recorded
+
+
+def flaky(errors, result="ok"):
+    """A callable that raises the given errors in turn, then returns result"""
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    fn.calls = calls
+    return fn
+
+
+def test_retryable_errors():
+    assert is_retryable(status_error(429))
+    assert is_retryable(status_error(503))
+    assert is_retryable(openai.APIConnectionError(request=httpx.Request("POST", "https://x")))
+    assert not is_retryable(status_error(400))
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_backoff_doubles_up_to_the_cap(sleeps):
+    scheduler = RequestScheduler(max_retries=5, base_delay=1.0, max_delay=5.0)
+    fn = flaky([status_error(500)] * 4)
+    assert scheduler.call(fn) == "ok"
+    assert len(fn.calls) == 5
+    assert [s for s in sleeps if s] == [1.0, 2.0, 4.0, 5.0]
+    assert scheduler.stats()["retries"] == 4
+
+
+def test_retry_after_header_is_honoured(sleeps):
+    scheduler = RequestScheduler(max_retries=2)
+    fn = flaky([status_error(429, {"retry-after": "7"})])
+    span = {}
+    assert scheduler.call(fn, span=span) == "ok"
+    assert 7.0 in sleeps
+    assert span["retries"] == 1
+
+
+def test_non_retryable_errors_are_raised_at_once(sleeps):
+    fn = flaky([status_error(400)])
+    with pytest.raises(openai.APIStatusError):
+        RequestScheduler(max_retries=5).call(fn)
+    assert len(fn.calls) == 1
+
+
+def test_gives_up_after_max_retries(sleeps):
+    fn = flaky([status_error(502)] * 10)
+    with pytest.raises(openai.APIStatusError):
+        RequestScheduler(max_retries=2).call(fn)
+    assert len(fn.calls) == 3
+
+
+def test_stream_retries_only_before_the_first_chunk(sleeps):
+    scheduler = RequestScheduler(max_retries=3)
+    attempts = []
+
+    def fails_before_output():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise status_error(500)
+        yield "a"
+        yield "b"
+
+    assert list(scheduler.stream(fails_before_output)) == ["a", "b"]
+    assert len(attempts) == 2
+
+    def fails_after_output():
+        yield "a"
+        raise status_error(500)
+
+    chunks = []
+    with pytest.raises(openai.APIStatusError):
+        for chunk in scheduler.stream(fails_after_output):
+            chunks.append(chunk)
+    assert chunks == ["a"]
+
+
+def test_async_call_retries(monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr(scheduler_module.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(scheduler_module.random, "uniform", lambda low, high: high)
+    errors = [status_error(429), status_error(500)]
+
+    async def fn():
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    assert asyncio.run(RequestScheduler(max_retries=3, base_delay=0.5).acall(fn)) == "done"
+    assert [s for s in slept if s] == [0.5, 1.0]
+
+
+def test_token_bucket_makes_callers_wait_once_spent():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0.0
+    # One more unit at one unit per second
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.refund(10)
+    assert bucket.reserve(1) == 0.0
+
+
+def test_rate_budget_delays_calls(sleeps):
+    scheduler = RequestScheduler(rpm=60)
+    for _ in range(61):
+        scheduler.call(lambda: None)
+    assert sleeps[-1] == pytest.approx(1.0, abs=0.05)
+    assert scheduler.stats()["throttled_ms"] > 0
@@ -0,0 +1,68 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents.seo_agent import SEOAgent
+from utils.llm_cache import LLMCache
+from utils.model_router import ModelRouter
+
+REPLY = json.dumps({
+    "title": "Solar Panels for Small Homes",
+    "keywords": ["solar panels", "battery storage"],
+    "user_intent": ["Compare home solar setups"],
+    "tldr_points": ["Panels and storage matter equally"],
+    "meta_description": "How to pick solar panels and storage."
+})
+
+
+class FakeChat:
+    """Stands in for ChatOpenAI, streaming a fixed reply and counting requests"""
+    model_name = "fake"
+    temperature = 0.7
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.requests = 0
+
+    def stream(self, messages, **kwargs):
+        self.requests += 1
+        for start in range(0, len(self.reply), 16):
+            yield SimpleNamespace(content=self.reply[start:start + 16])
+
+
+@pytest.fixture
+def make_agent(tmp_path):
+    def make(reply):
+        agent = SEOAgent(mode="llm")
+        agent.llm = FakeChat(reply)
+        agent.cache = LLMCache(cache_dir=tmp_path / "llm_cache")
+        # Routing off, so the agent's own (fake) model is used and no fallback is tried
+        agent.router = ModelRouter({})
+        return agent
+    return make
+
+
+def test_parseable_reply_is_cached(make_agent):
+    agent = make_agent(REPLY)
+    first = agent.analyze("solar panels and battery storage")
+    second = agent.analyze("solar panels and battery storage")
+    assert first == second
+    assert first["title"] == "Solar Panels for Small Homes"
+    assert agent.llm.requests == 1
+
+
+def test_unparseable_reply_is_not_cached(make_agent):
+    agent = make_agent("Sorry, I cannot produce that.")
+    for _ in range(2):
+        assert agent.analyze("solar panels and battery storage")["title"] == "Article Title"
+    assert agent.llm.requests == 2
+    assert agent.cache.stats()["memory_hits"] == 0
+
+
+def test_cached_reply_failing_validation_is_requested_again(make_agent):
+    agent = make_agent(REPLY)
+    messages = [SimpleNamespace(type="user", content="hello")]
+    agent.cache.set(agent._cache_key(messages, "fake"), "not json")
+    assert "".join(agent.stream_llm(messages, validate=agent._parses)) == REPLY
+    assert agent.llm.requests == 1
@@ -0,0 +1,66 @@
+from utils.social_posts import (
+    PLATFORM_CONSTRAINTS,
+    check_post,
+    enforce_constraints,
+    hashtags,
+    post_text,
+    repair_post,
+)
+
+TWITTER = PLATFORM_CONSTRAINTS["twitter"]
+
+
+def test_compliant_posts_pass_unchanged():
+    posts = {"twitter": "Short and sweet. #AI", "linkedin": {"content": "A longer take. #AI #Video"}}
+    valid, failed = enforce_constraints(posts, ["twitter", "linkedin"])
+    assert valid == {"twitter": "Short and sweet. #AI", "linkedin": "A longer take. #AI #Video"}
+    assert failed == {}
+
+
+def test_extra_hashtags_are_dropped_locally():
+    valid, failed = enforce_constraints({"twitter": "Big news #one #two #three #four #five"}, ["twitter"])
+    assert valid["twitter"] == "Big news #one #two #three"
+    assert not failed
+
+
+def test_slightly_long_post_is_trimmed_keeping_its_hashtags():
+    text = "This sentence is padding. " * 11 + "Last words here. #AI"
+    assert 280 < len(text) <= 280 * 1.15
+    valid, failed = enforce_constraints({"twitter": text}, ["twitter"])
+    assert not failed
+    assert len(valid["twitter"]) <= 280
+    assert valid["twitter"].endswith("#AI")
+
+
+def test_far_too_long_and_missing_posts_fail():
+    posts = {"twitter": "word " * 100}
+    valid, failed = enforce_constraints(posts, ["twitter", "facebook"])
+    assert valid == {}
+    assert failed["twitter"][0] == posts["twitter"].strip()
+    assert failed["twitter"][1] == ["499 characters, limit is 280"]
+    assert failed["facebook"] == ("", ["post is missing"])
+
+
+def test_unparsed_reply_fails_every_platform():
+    valid, failed = enforce_constraints(None, ["twitter", "linkedin"])
+    assert valid == {}
+    assert set(failed) == {"twitter", "linkedin"}
+
+
+def test_custom_constraints_apply():
+    valid, failed = enforce_constraints({"mastodon": "x" * 20}, ["mastodon"], {"mastodon": {"max_length": 10}})
+    assert not valid
+    assert failed["mastodon"][1] == ["20 characters, limit is 10"]
+
+
+def test_forced_repair_cuts_on_a_word():
+    text = repair_post("word " * 100, TWITTER, max_trim=None)
+    assert len(text) <= 280
+    assert text.endswith("word…")
+
+
+def test_post_text_and_hashtags():
+    assert post_text({"text": " hello "}) == "hello"
+    assert post_text(["one", {"content": "two"}]) == "one\n\ntwo"
+    assert hashtags("C# is not a tag, #this is, and so is#not") == ["#this"]
+    assert check_post("fine #a", TWITTER) == []
@@ -0,0 +1,56 @@
+import pytest
+
+from utils.transcript_normalizer import (
+    TranscriptNormalizer,
+    collapse_repetition,
+    drop_caption_overlap,
+    strip_fillers,
+    strip_non_speech,
+)
+
+
+@pytest.mark.parametrize("text", [
+    "that that I had had before",
+    "no no no, I said",
+    "what it is is a choice",
+    "we went there, we went there",
+])
+def test_grammatical_repetition_is_kept(text):
+    assert collapse_repetition(text) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I I think the the point is", "I think the point is"),
+    ("so so so yeah", "so yeah"),
+    ("you know you know, it works", "you know, it works"),
+    ("you know you know you know right", "you know right"),
+    ("and then we and then we left", "and then we left"),
+])
+def test_stutters_are_collapsed(text, expected):
+    assert collapse_repetition(text) == expected
+
+
+def test_caption_overlap_is_dropped():
+    segments = ["we used to spend a full", "spend a full day on one video", "day on one video from start"]
+    assert drop_caption_overlap(segments) == ["we used to spend a full", "day on one video", "from start"]
+
+
+def test_single_word_overlap_is_kept_unless_the_segment_repeats():
+    assert drop_caption_overlap(["it works", "works great"]) == ["it works", "works great"]
+    assert drop_caption_overlap(["it works", "works"]) == ["it works"]
+
+
+def test_non_speech_and_fillers_are_removed():
+    assert strip_non_speech("[Music] hello >> there ♪ la la ♪").split() == ["hello", "there"]
+    assert strip_fillers("Yes, um, I think uh it works") == "Yes, I think it works"
+
+
+def test_normalize_reports_token_savings():
+    result = TranscriptNormalizer().normalize(["[Music] um the the", "the the point is"])
+    assert result["text"] == "the point is"
+    assert result["tokens_saved"] == result["tokens_before"] - result["tokens_after"] > 0
+
+
+def test_pasted_text_keeps_repetition():
+    result = TranscriptNormalizer().normalize_text("I I think um the the point [Music]\nthe point")
+    assert result["text"] == "I I think the the point the point"
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from utils.transcript_store import TranscriptStore
+
+TTL = 3600
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("utils.transcript_store.time.time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return TranscriptStore(store_dir=tmp_path, ttl_seconds=TTL)
+
+
+def test_entries_expire_after_the_ttl(store, clock):
+    store.put("abc", [{"text": "hi"}], "hi")
+    clock.now += TTL - 1
+    assert store.get("abc")["text"] == "hi"
+    clock.now += 2
+    assert store.get("abc") is None
+    assert store.get("abc", allow_stale=True)["text"] == "hi"
+
+
+def test_expired_entry_is_fetched_again(store, clock):
+    store.put("abc", [], "old")
+    clock.now += TTL + 1
+    assert store.get_or_fetch("abc", lambda video_id: ([], "new"))["text"] == "new"
+    assert store.get("abc")["text"] == "new"
+
+
+def test_expired_entry_stands_in_when_the_fetch_fails(store, clock):
+    store.put("abc", [], "old")
+    clock.now += TTL + 1
+
+    def fail(video_id):
+        raise ConnectionError("down")
+
+    assert store.get_or_fetch("abc", fail)["text"] == "old"
+    with pytest.raises(ConnectionError):
+        store.get_or_fetch("missing", fail)
+
+
+def test_size_cap_evicts_the_least_recently_used(tmp_path, clock):
+    store = TranscriptStore(store_dir=tmp_path, ttl_seconds=TTL)
+    store.put("a", [], "x" * 50)
+    size = store._total
+    store.max_bytes = size * 2 + size // 2
+    clock.now += 1
+    store.put("b", [], "y" * 50)
+    clock.now += 1
+    # Reading "a" makes "b" the least recently used, although "a" was written first
+    assert store.get("a") is not None
+    clock.now += 1
+    store.put("c", [], "z" * 50)
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store._total <= store.max_bytes
+
+
+def test_recency_survives_a_restart(tmp_path, clock):
+    store = TranscriptStore(store_dir=tmp_path, ttl_seconds=TTL)
+    for name in ("a", "b"):
+        clock.now += 1
+        store.put(name, [], name * 50)
+    clock.now += 1
+    store.get("a")
+    assert [path.name for path in TranscriptStore(store_dir=tmp_path)._entries] == ["b.json.gz", "a.json.gz"]
+
+
+def test_concurrent_fetches_of_one_video_share_a_single_fetch(tmp_path):
+    store = TranscriptStore(store_dir=tmp_path, ttl_seconds=TTL)
+    calls = []
+    started = threading.Event()
+
+    def fetch(video_id):
+        calls.append(video_id)
+        started.set()
+        time.sleep(0.05)
+        return [], "text"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get_or_fetch("abc", fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ["abc"]
+    assert [entry["text"] for entry in results] == ["text"] * 8
+    assert store._fetch_locks == {}
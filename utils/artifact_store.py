@@ -0,0 +1,157 @@
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    agent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_json INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_lookup ON artifacts (agent, name, run_id);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts (run_id);
+"""
+
+# Artifacts saved outside a traced run are grouped under this run ID
+NO_RUN = ""
+
+
+class ArtifactStore:
+    """Run-scoped debug artifacts in SQLite, written in batches by a background thread.
+
+    ``put`` only queues the artifact, so saving costs the caller no disk I/O.
+    Queued artifacts are visible to ``get`` straight away and reach the database
+    on the next flush, at most ``flush_interval`` seconds later.
+    """
+
+    def __init__(self, db_path=None, flush_interval=0.5, batch_size=200, keep_runs=1000):
+        self.db_path = Path(db_path or Path("data") / "artifacts.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.keep_runs = keep_runs
+        self._queue = queue.Queue()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._flushed = threading.Condition()
+        self._enqueued = 0
+        self._written = 0
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        self._reader = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._writer = threading.Thread(target=self._write_loop, name="artifact-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def put(self, run_id, agent, name, data):
+        """Queue an artifact for writing; dicts and lists are stored as JSON"""
+        is_json = isinstance(data, (dict, list))
+        content = json.dumps(data) if is_json else str(data)
+        row = (run_id or NO_RUN, agent, name, int(is_json), content, time.time())
+        with self._pending_lock:
+            self._pending[row[:3]] = row
+            self._enqueued += 1
+        self._queue.put(row)
+
+    def get(self, run_id, agent, name):
+        """Return an artifact from a run, or the latest one saved under that name when run_id is None"""
+        with self._pending_lock:
+            if run_id is not None:
+                row = self._pending.get((run_id, agent, name))
+            else:
+                rows = [r for k, r in self._pending.items() if k[1:] == (agent, name)]
+                row = max(rows, key=lambda r: r[5]) if rows else None
+        if row is None:
+            query = "SELECT run_id, agent, name, is_json, content, created FROM artifacts WHERE agent = ? AND name = ?"
+            params = [agent, name]
+            if run_id is not None:
+                query += " AND run_id = ?"
+                params.append(run_id)
+            with self._read_lock:
+                row = self._reader.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[4]) if row[3] else row[4]
+
+    def list_run(self, run_id):
+        """Return {(agent, name): content} for every artifact saved in a run"""
+        self.flush()
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT agent, name, is_json, content FROM artifacts WHERE run_id = ? ORDER BY id", (run_id,)
+            ).fetchall()
+        return {(agent, name): json.loads(content) if is_json else content for agent, name, is_json, content in rows}
+
+    def flush(self, timeout=10.0):
+        """Block until everything queued so far has been written"""
+        with self._flushed:
+            target = self._enqueued
+            self._flushed.wait_for(lambda: self._written >= target, timeout=timeout)
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.db_path)
+        batches = 0
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # Gather whatever else arrives shortly after, so bursts become one transaction
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO artifacts (run_id, agent, name, is_json, content, created) VALUES (?, ?, ?, ?, ?, ?)",
+                        batch
+                    )
+                batches += 1
+                if batches % 50 == 0:
+                    self._prune(conn)
+            except sqlite3.Error as e:
+                print(f"Error writing artifacts: {str(e)}")
+            with self._pending_lock:
+                for row in batch:
+                    if self._pending.get(row[:3]) is row:
+                        del self._pending[row[:3]]
+            with self._flushed:
+                self._written += len(batch)
+                self._flushed.notify_all()
+
+    def _prune(self, conn):
+        """Drop artifacts of all but the most recent keep_runs runs"""
+        with conn:
+            conn.execute(
+                "DELETE FROM artifacts WHERE run_id NOT IN "
+                "(SELECT run_id FROM artifacts GROUP BY run_id ORDER BY MAX(id) DESC LIMIT ?)",
+                (self.keep_runs,)
+            )
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_artifact_store():
+    """Return the process-wide artifact store shared by every agent"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ArtifactStore(
+                db_path=os.getenv("ARTIFACT_DB"),
+                keep_runs=int(os.getenv("ARTIFACT_KEEP_RUNS", "1000"))
+            )
+        return _default_store
@@ -0,0 +1,76 @@
+import os
+import threading
+import httpx
+import openai
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connection pool shared by every OpenAI client in the process
+POOL_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "32")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "16")),
+    keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_SECONDS", "120"))
+)
+TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+# Where YouTube pages and captions are fetched from; point at a local stub server for tests
+YOUTUBE_ORIGIN = "https://www.youtube.com"
+YOUTUBE_BASE_URL = os.getenv("YOUTUBE_BASE_URL", YOUTUBE_ORIGIN).rstrip("/")
+YOUTUBE_MAX_CONNECTIONS = int(os.getenv("YOUTUBE_MAX_CONNECTIONS", "16"))
+
+_http_client = None
+_openai_client = None
+_youtube_session = None
+_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide keep-alive httpx client used by the synchronous agents"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(limits=POOL_LIMITS, timeout=TIMEOUT)
+        return _http_client
+
+
+def get_openai_client():
+    """Return the process-wide OpenAI client, backed by the shared connection pool"""
+    global _openai_client
+    http_client = get_http_client()
+    with _lock:
+        if _openai_client is None:
+            # Retries are left to the shared scheduler so they count against its budgets
+            _openai_client = openai.OpenAI(
+                base_url=os.getenv("OPENAI_API_BASE") or None,
+                http_client=http_client,
+                max_retries=0
+            )
+        return _openai_client
+
+
+def new_async_http_client():
+    """Create a keep-alive async httpx client; async clients must not be shared across event loops"""
+    return httpx.AsyncClient(limits=POOL_LIMITS, timeout=TIMEOUT)
+
+
+class _YouTubeSession(requests.Session):
+    """requests session that sends youtube.com URLs to YOUTUBE_BASE_URL instead"""
+
+    def request(self, method, url, *args, **kwargs):
+        if YOUTUBE_BASE_URL != YOUTUBE_ORIGIN and url.startswith(YOUTUBE_ORIGIN):
+            url = YOUTUBE_BASE_URL + url[len(YOUTUBE_ORIGIN):]
+        return super().request(method, url, *args, **kwargs)
+
+
+def get_youtube_session():
+    """Return the process-wide keep-alive session for YouTube pages and caption downloads"""
+    global _youtube_session
+    with _lock:
+        if _youtube_session is None:
+            session = _YouTubeSession()
+            # One pool per host, sized so every prefetch worker can hold a connection
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=YOUTUBE_MAX_CONNECTIONS)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _youtube_session = session
+        return _youtube_session
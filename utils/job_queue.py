@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    source TEXT NOT NULL,
+    options TEXT NOT NULL,
+    worker TEXT,
+    error TEXT,
+    trace TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE TABLE IF NOT EXISTS job_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    outputs TEXT,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    seen REAL NOT NULL
+);
+"""
+
+# Job states
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """SQLite-backed queue of pipeline jobs shared by the web app and worker processes.
+
+    Workers record a "start" and a "done" event per stage, so the submitter can
+    poll progress and partial results while the job runs. A job whose worker
+    stops sending heartbeats goes back to the queue.
+    """
+
+    def __init__(self, db_path=None, heartbeat_timeout=30.0):
+        self.db_path = Path(db_path or Path("data") / "jobs.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.heartbeat_timeout = heartbeat_timeout
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        # A connection per call keeps the queue safe to use from any thread or process
+        return sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+
+    def submit(self, source, options=None):
+        """Queue a pipeline run and return its job ID"""
+        job_id = uuid.uuid4().hex[:12]
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, source, options, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, source, json.dumps(options or {}), time.time())
+            )
+        return job_id
+
+    def claim(self, worker_id):
+        """Atomically take the oldest queued job for a worker, or return None"""
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, source, options FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started = ? WHERE id = ?",
+                    (RUNNING, worker_id, time.time(), row[0])
+                )
+                # A requeued job starts over, so drop the events of the attempt that died
+                conn.execute("DELETE FROM job_events WHERE job_id = ?", (row[0],))
+            finally:
+                conn.execute("COMMIT")
+        return {"id": row[0], "source": row[1], "options": json.loads(row[2])}
+
+    def add_event(self, job_id, kind, stage, outputs=None):
+        """Record that a stage started ("start") or finished ("done") with its outputs"""
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO job_events (job_id, kind, stage, outputs, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, stage, json.dumps(outputs) if outputs is not None else None, time.time())
+            )
+
+    def finish(self, job_id, trace=None):
+        """Mark a job done, keeping its trace spans for display"""
+        self._close(job_id, DONE, trace=json.dumps(trace or []))
+
+    def fail(self, job_id, error, trace=None):
+        self._close(job_id, FAILED, error=error, trace=json.dumps(trace or []))
+
+    def withdraw(self, job_id, reason="withdrawn"):
+        """Close a job no worker has claimed, so the submitter can run it itself; False if already claimed"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ? AND status = ?",
+                (FAILED, reason, time.time(), job_id, QUEUED)
+            ).rowcount == 1
+
+    def _close(self, job_id, status, error=None, trace=None):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, trace = ?, finished = ? WHERE id = ?",
+                (status, error, trace, time.time(), job_id)
+            )
+
+    def get(self, job_id):
+        """Return a job's status, input, error and trace, or None if it does not exist"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, status, error, trace, created, started, finished, source, options FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "status": row[1],
+            "error": row[2],
+            "trace": json.loads(row[3]) if row[3] else [],
+            "created": row[4],
+            "started": row[5],
+            "finished": row[6],
+            "source": row[7],
+            "options": json.loads(row[8])
+        }
+
+    def events(self, job_id, after=0):
+        """Return stage events recorded after sequence number ``after``, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, kind, stage, outputs FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after)
+            ).fetchall()
+        return [{
+            "seq": seq,
+            "kind": kind,
+            "stage": stage,
+            "outputs": json.loads(outputs) if outputs else {}
+        } for seq, kind, stage, outputs in rows]
+
+    def results(self, job_id):
+        """Return every output produced so far by a job"""
+        values = {}
+        for event in self.events(job_id):
+            values.update(event["outputs"])
+        return values
+
+    def heartbeat(self, worker_id):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (id, pid, seen) VALUES (?, ?, ?)",
+                (worker_id, os.getpid(), time.time())
+            )
+
+    def live_workers(self):
+        """Return the number of workers that sent a heartbeat recently"""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM workers WHERE seen > ?", (time.time() - self.heartbeat_timeout,)
+            ).fetchone()[0]
+
+    def requeue_stale(self):
+        """Put running jobs whose worker has gone quiet back in the queue; returns how many"""
+        cutoff = time.time() - self.heartbeat_timeout
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL WHERE status = ? AND worker NOT IN "
+                "(SELECT id FROM workers WHERE seen > ?)",
+                (QUEUED, RUNNING, cutoff)
+            ).rowcount
+
+
+_default_queue = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide queue on the configured database; it holds no open connection"""
+    global _default_queue
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue(
+                db_path=os.getenv("JOB_DB"),
+                heartbeat_timeout=float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "30"))
+            )
+        return _default_queue
@@ -0,0 +1,136 @@
+import json
+import re
+
+_FENCE = re.compile(r'^\s*```[a-zA-Z]*\s*$', re.MULTILINE)
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def repair_json(text):
+    """Parse nearly-valid JSON from an LLM reply, or return None if it cannot be salvaged.
+
+    Handles code fences and prose around the object, trailing commas, and output
+    cut off mid-string or mid-structure (unfinished trailing members are dropped).
+    """
+    text = _FENCE.sub('', text)
+    start = min((i for i in (text.find('{'), text.find('[')) if i >= 0), default=-1)
+    if start < 0:
+        return None
+
+    out = []
+    stack = []
+    # (length of out, open brackets) at each top-level-safe cut point, used to drop a broken tail
+    cuts = []
+    in_string = escape = False
+    for c in text[start:]:
+        if in_string:
+            out.append(c)
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+        if c == '"':
+            in_string = True
+        elif c in _CLOSERS:
+            stack.append(c)
+        elif c in '}]':
+            # Drop trailing commas before a closer
+            while out and out[-1] in ' \t\r\n,':
+                out.pop()
+            if not stack:
+                break
+            stack.pop()
+            out.append(c)
+            if not stack:
+                break
+            cuts.append((len(out), list(stack)))
+            continue
+        elif c == ',':
+            cuts.append((len(out), list(stack)))
+        out.append(c)
+
+    candidates = []
+    body = ''.join(out)
+    if in_string:
+        body += '"'
+    candidates.append(body.rstrip().rstrip(',') + ''.join(_CLOSERS[b] for b in reversed(stack)))
+    for length, open_brackets in reversed(cuts):
+        candidates.append(''.join(out[:length]).rstrip().rstrip(',')
+                          + ''.join(_CLOSERS[b] for b in reversed(open_brackets)))
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+class JSONFieldStream:
+    """Incrementally parse a streamed JSON object, reporting each top-level field once it is complete.
+
+    Text before the opening brace (such as a code fence) is ignored. Field values
+    that are not valid JSON on their own are passed through ``repair_json``.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.done = False
+        self.fields = {}
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the (key, value) pairs completed by it"""
+        self.buffer += chunk
+        completed = []
+        while self.pos < len(self.buffer) and not self.done:
+            c = self.buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif c == '\\':
+                    self.escape = True
+                elif c == '"':
+                    self.in_string = False
+                    if self.key_start is not None:
+                        self.key = json.loads(self.buffer[self.key_start:self.pos + 1])
+                        self.key_start = None
+            elif self.depth == 0:
+                if c == '{':
+                    self.depth = 1
+            elif c == '"':
+                self.in_string = True
+                if self.depth == 1 and self.key is None:
+                    self.key_start = self.pos
+            elif c == ':' and self.depth == 1 and self.key is not None and self.value_start is None:
+                self.value_start = self.pos + 1
+            elif c in '{[':
+                self.depth += 1
+            elif c == ',' and self.depth == 1:
+                if self.value_start is not None:
+                    completed.append(self._complete(self.buffer[self.value_start:self.pos]))
+            elif c in '}]':
+                if self.depth == 1 and self.value_start is not None:
+                    completed.append(self._complete(self.buffer[self.value_start:self.pos]))
+                self.depth -= 1
+                self.done = self.depth == 0
+            self.pos += 1
+        return completed
+
+    def _complete(self, text):
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            value = repair_json(text) if text.strip()[:1] in '{[' else text.strip().strip('"')
+        pair = (self.key, value)
+        self.fields[self.key] = value
+        self.key = None
+        self.value_start = None
+        return pair
@@ -0,0 +1,152 @@
+import re
+import numpy as np
+from slugify import slugify
+
+STOPWORDS = frozenset("""
+a about above after again against all almost also am an and any are as at be because been before being below
+between both but by can could did do does doing done down during each either else enough even ever every few
+for from further get gets getting go goes going gonna got had has have having he her here hers herself him
+himself his how i if in into is it its itself just kind know let lot lots like made make makes many maybe me
+might more most much must my myself need no nor not now of off oh ok okay on once one only or other our ours
+ourselves out over own pretty put quite rather really right said same say says see she should so some something
+sort still such sure take than thank thanks that the their theirs them themselves then there these they thing
+things think this those though through to today too two under until up upon us very want was way we well were
+what when where whether which while who whom whose why will with within without would yeah yes yet you your
+yours yourself yourselves um uh
+""".split())
+
+_SENTENCE = re.compile(r'(?<=[.!?])\s+')
+_TOKEN = re.compile(r"[a-z0-9]+(?:['\-][a-z0-9]+)*|[^\sa-z0-9]")
+# Auto-captions often have no punctuation; cut run-on text into pseudo-sentences of this many words
+MAX_SENTENCE_WORDS = 40
+MAX_PHRASE_WORDS = 3
+
+
+def _sentences(text):
+    sentences = []
+    for sentence in _SENTENCE.split(text.strip()):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(" ".join(words[start:start + MAX_SENTENCE_WORDS]))
+    return [s for s in sentences if s]
+
+
+def _runs(sentence):
+    """Runs of content words between stopwords and punctuation"""
+    runs = []
+    current = []
+    for token in _TOKEN.findall(sentence.lower()):
+        if token in STOPWORDS or not token[0].isalnum() or len(token) < 2 or token.isdigit():
+            if current:
+                runs.append(current)
+            current = []
+        else:
+            current.append(token)
+    if current:
+        runs.append(current)
+    return runs
+
+
+def extract_keywords_batch(texts, top_k=10, tldr_k=3):
+    """Extract keyword and TLDR candidates from many transcripts in one vectorized pass.
+
+    Candidates are the n-grams (up to MAX_PHRASE_WORDS words) within runs of
+    content words. They are scored RAKE-style: word degree over frequency, summed
+    over the phrase and boosted by how often the phrase recurs. Each word is
+    weighted by its inverse document frequency across the batch, so words
+    common to every transcript rank lower. TLDR candidates are the sentences
+    with the highest mean TF-IDF weight, in their original order.
+
+    Returns one {"keywords", "tldr_candidates", "url_slug"} dict per text.
+    """
+    vocab = {}
+    sentences = []
+    # One entry per content word occurrence
+    word_id, word_run, word_sentence = [], [], []
+    for doc, text in enumerate(texts):
+        for sentence in _sentences(text):
+            sentences.append((doc, sentence))
+            for run in _runs(sentence):
+                word_id.extend(vocab.setdefault(word, len(vocab)) for word in run)
+                word_run.extend([word_run[-1] + 1 if word_run else 0] * len(run))
+                word_sentence.extend([len(sentences) - 1] * len(run))
+
+    docs = len(texts)
+    results = [{"keywords": [], "tldr_candidates": [], "url_slug": ""} for _ in texts]
+    if not vocab:
+        return results
+
+    words = list(vocab)
+    word_id = np.array(word_id)
+    word_run = np.array(word_run)
+    word_sentence = np.array(word_sentence)
+    sentence_doc = np.array([doc for doc, _ in sentences])
+    word_doc = sentence_doc[word_sentence]
+
+    # Per (document, word) counts and RAKE degrees, accumulated over the flattened occurrences.
+    # Only the cells that occur are kept, so memory grows with the text rather than docs x vocabulary.
+    cells, cell, counts = np.unique(word_doc * len(vocab) + word_id, return_inverse=True, return_counts=True)
+    cell_doc, cell_word = np.divmod(cells, len(vocab))
+    run_length = np.minimum(np.bincount(word_run)[word_run], MAX_PHRASE_WORDS)
+    degree = np.bincount(cell, weights=run_length, minlength=len(cells))
+    idf = np.log((1 + docs) / (1 + np.bincount(cell_word, minlength=len(vocab)))) + 1
+    doc_words = np.bincount(cell_doc, weights=counts, minlength=docs)
+    word_score = (degree / counts * idf[cell_word])[cell]
+    tfidf = (counts / doc_words[cell_doc] * idf[cell_word])[cell]
+
+    # Every n-gram that stays inside one run, as rows of (doc, n, word ids padded with -1)
+    rows, scores = [], []
+    for n in range(1, MAX_PHRASE_WORDS + 1):
+        start = np.arange(len(word_id) - n + 1)
+        start = start[word_run[start] == word_run[start + n - 1]]
+        row = np.full((len(start), 2 + MAX_PHRASE_WORDS), -1)
+        row[:, 0] = word_doc[start]
+        row[:, 1] = n
+        score = np.zeros(len(start))
+        for k in range(n):
+            row[:, 2 + k] = word_id[start + k]
+            score += word_score[start + k]
+        rows.append(row)
+        scores.append(score)
+    # Group identical rows into distinct phrases; a lexsort is much faster than np.unique(axis=0)
+    rows = np.concatenate(rows)
+    grouped = np.lexsort(rows.T[::-1])
+    rows = rows[grouped]
+    first = np.flatnonzero(np.concatenate([[True], np.any(rows[1:] != rows[:-1], axis=1)]))
+    occurrences = np.diff(np.append(first, len(rows)))
+    phrases = rows[first]
+    phrase_doc = phrases[:, 0]
+    phrase_score = np.concatenate(scores)[grouped[first]] * (1 + np.log(occurrences))
+
+    # Sentence score: mean TF-IDF weight of its content words
+    sentence_weight = np.bincount(word_sentence, weights=tfidf, minlength=len(sentences))
+    sentence_length = np.bincount(word_sentence, minlength=len(sentences))
+    sentence_score = np.divide(sentence_weight, sentence_length, out=np.zeros(len(sentences)),
+                               where=sentence_length > 0)
+    # Very short sentences make poor summary points
+    sentence_score[np.array([len(s.split()) < 6 for _, s in sentences])] = 0
+
+    order = np.lexsort((-phrase_score, phrase_doc))
+    # Only the best few candidates of each document need the Python-side deduplication below
+    rank = np.arange(len(order)) - np.searchsorted(phrase_doc[order], phrase_doc[order])
+    for index in order[rank < top_k * 5]:
+        phrase = [words[w] for w in phrases[index, 2:2 + phrases[index, 1]]]
+        keywords = results[phrase_doc[index]]["keywords"]
+        # Skip phrases mostly covered by a better-ranked one, e.g. "video" after "video articles"
+        if len(keywords) < top_k and not any(
+                len(set(phrase) & set(kw.split())) >= min(len(phrase), 2) for kw in keywords):
+            keywords.append(" ".join(phrase))
+    for index in np.lexsort((-sentence_score, sentence_doc)):
+        doc, sentence = sentences[index]
+        candidates = results[doc]["tldr_candidates"]
+        if len(candidates) < tldr_k and sentence_score[index] > 0:
+            candidates.append((index, sentence))
+    for result in results:
+        result["tldr_candidates"] = [sentence for _, sentence in sorted(result["tldr_candidates"])]
+        result["url_slug"] = slugify(" ".join(result["keywords"][:2]), max_length=60, word_boundary=True)
+    return results
+
+
+def extract_keywords(text, top_k=10, tldr_k=3):
+    """Keyword candidates, TLDR sentence candidates and a URL slug for one transcript"""
+    return extract_keywords_batch([text], top_k=top_k, tldr_k=tldr_k)[0]
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class LLMCache:
+    """Two-tier (memory LRU + disk) cache of LLM responses keyed by request content"""
+
+    def __init__(self, cache_dir=None, max_memory_entries=256, max_disk_bytes=200 * 1024 * 1024, enabled=True):
+        self.enabled = enabled
+        self.cache_dir = Path(cache_dir or Path("data") / "llm_cache")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, temperature, prompt_version, messages):
+        """Build a content-addressed key from the model settings and the messages sent"""
+        payload = json.dumps({
+            "model": model,
+            "temperature": temperature,
+            "prompt_version": prompt_version,
+            "messages": [[m.type, m.content] for m in messages]
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        with self._lock:
+            if not self.enabled:
+                self.misses += 1
+                return None
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    value = json.load(f)["content"]
+                os.utime(path)  # mark as recently used for eviction
+            except (OSError, ValueError, KeyError):
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value
+
+    def set(self, key, value):
+        """Store a response in both tiers, evicting old disk entries if over budget"""
+        with self._lock:
+            if not self.enabled:
+                return
+            self._remember(key, value)
+            path = self._path(key)
+            previous = path.stat().st_size if path.exists() else 0
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"content": value}, f)
+            self._disk_bytes += path.stat().st_size - previous
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used disk entries until back under 90% of the budget"""
+        target = self.max_disk_bytes * 0.9
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for path in entries:
+            if self._disk_bytes <= target:
+                break
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            self._disk_bytes -= size
+
+    def stats(self):
+        """Return hit/miss counters and current tier sizes"""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide cache shared by every agent"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(
+                cache_dir=os.getenv("LLM_CACHE_DIR"),
+                max_disk_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024,
+                enabled=os.getenv("LLM_CACHE", "on").lower() not in ("0", "off", "false")
+            )
+        return _default_cache
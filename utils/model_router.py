@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_PROFILES = Path(__file__).resolve().parent.parent / "configs" / "models.json"
+TARGETS = ("latency", "cost", "quality")
+
+
+class ModelRouter:
+    """Picks the model for each LLM call from a profile table of models and per-stage rules.
+
+    A stage's first rule whose ``max_input_tokens`` covers the request sets the
+    smallest model tier allowed. Among the models of that tier or above whose
+    context fits the input plus the stage's expected output, the stage's target
+    picks one: the lowest estimated ``latency``, the lowest estimated ``cost``,
+    or the highest tier for ``quality``. Bigger models follow as fallbacks for
+    responses that fail validation.
+    """
+
+    def __init__(self, profiles, target=None, max_fallbacks=2, enabled=True):
+        self.models = profiles.get("models", {})
+        self.stages = profiles.get("stages", {})
+        if target is not None and target not in TARGETS:
+            raise ValueError(f"Unknown routing target '{target}', expected one of {', '.join(TARGETS)}")
+        self.target = target
+        self.max_fallbacks = max_fallbacks
+        self.enabled = enabled and bool(self.models)
+
+    @classmethod
+    def from_file(cls, path=None, **kwargs):
+        with open(path or DEFAULT_PROFILES, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def _stage(self, stage):
+        return self.stages.get(stage) or self.stages.get("default", {})
+
+    def estimate(self, model, input_tokens, output_tokens):
+        """Estimated (latency in seconds, cost in dollars) of one call"""
+        profile = self.models[model]
+        latency = profile.get("latency_ms", 0) / 1000 + output_tokens / profile.get("tokens_per_second", 50)
+        cost = (input_tokens * profile.get("cost_per_1k_input", 0)
+                + output_tokens * profile.get("cost_per_1k_output", 0)) / 1000
+        return latency, cost
+
+    def route(self, stage, input_tokens):
+        """Return the models to try for a call, chosen model first, then bigger fallbacks.
+
+        Returns an empty list when routing is off, so callers keep their own model.
+        """
+        if not self.enabled:
+            return []
+        config = self._stage(stage)
+        output_tokens = config.get("output_tokens", 800)
+        min_tier = 1
+        for rule in config.get("rules", []):
+            if input_tokens <= rule.get("max_input_tokens", float("inf")):
+                min_tier = rule.get("min_tier", 1)
+                break
+        fits = [name for name, profile in self.models.items()
+                if profile.get("context_tokens", float("inf")) >= input_tokens + output_tokens]
+        candidates = [name for name in fits if self.models[name].get("tier", 1) >= min_tier]
+        if not candidates:
+            # Nothing in the allowed tiers fits; the largest context is the best remaining bet
+            candidates = sorted(self.models, key=lambda name: self.models[name].get("context_tokens", 0))[-1:]
+
+        target = self.target or config.get("target", "latency")
+        if target == "quality":
+            chosen = max(candidates, key=lambda name: self.models[name].get("tier", 1))
+        else:
+            index = 0 if target == "latency" else 1
+            chosen = min(candidates, key=lambda name: self.estimate(name, input_tokens, output_tokens)[index])
+
+        tier = self.models[chosen].get("tier", 1)
+        bigger = sorted(
+            (name for name in fits if self.models[name].get("tier", 1) > tier),
+            key=lambda name: (self.models[name].get("tier", 1), self.estimate(name, input_tokens, output_tokens))
+        )
+        return [chosen] + bigger[:self.max_fallbacks]
+
+    def supports_json_mode(self, model):
+        """Whether a model accepts the JSON object response format; unknown models are assumed to"""
+        return self.models.get(model, {}).get("json_mode", True)
+
+    def fingerprint(self, stage):
+        """Hash of the routing settings that decide a stage's models"""
+        if not self.enabled:
+            return ""
+        payload = json.dumps([self._stage(stage), self.models, self.target], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_router = None
+_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the process-wide router over the configured profile table"""
+    global _router
+    with _lock:
+        if _router is None:
+            _router = ModelRouter.from_file(
+                os.getenv("MODEL_PROFILES"),
+                target=os.getenv("MODEL_ROUTING_TARGET") or None,
+                max_fallbacks=int(os.getenv("MODEL_MAX_FALLBACKS", "2")),
+                enabled=os.getenv("MODEL_ROUTING", "on").lower() not in ("0", "off", "false")
+            )
+        return _router
@@ -0,0 +1,195 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    source_key TEXT PRIMARY KEY,
+    signature BLOB NOT NULL,
+    added REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_added ON signatures (added);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket TEXT NOT NULL,
+    source_key TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, source_key)
+);
+CREATE INDEX IF NOT EXISTS buckets_source_key ON buckets (source_key);
+"""
+
+_WORD = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+# Bump when the signature scheme changes; older indexes are cleared on open
+SIGNATURE_VERSION = 2
+# Shingles hashed per block, bounding the permutations x shingles matrix
+_BLOCK = 4096
+POLICIES = ("off", "reuse", "adapt", "auto")
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of normalized transcripts, with an LSH band index for near-duplicate lookup.
+
+    Transcripts are compared by the Jaccard similarity of their word shingles,
+    estimated from ``num_perm`` MinHash values. Signatures are split into
+    ``bands`` bands; transcripts sharing any band are candidates, and only
+    candidates at or above ``threshold`` estimated similarity are returned.
+
+    ``policy`` decides what a match is used for: "reuse" copies the stored
+    outputs, "adapt" rewrites the stored article for the new transcript, and
+    "auto" reuses matches at or above ``reuse_threshold`` and adapts the rest.
+    With the "off" policy nothing is set up, and numpy is not even imported.
+    """
+
+    def __init__(self, db_path=None, threshold=0.8, reuse_threshold=0.95, policy="off",
+                 num_perm=128, bands=16, shingle_size=5, max_entries=50000):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown near-duplicate policy '{policy}', expected one of {', '.join(POLICIES)}")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.enabled = policy != "off"
+        self.policy = policy
+        self.threshold = threshold
+        self.reuse_threshold = reuse_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.db_path = Path(db_path or Path("data") / "near_duplicates.db")
+        if not self.enabled:
+            return
+        import numpy as np
+        # Fixed seed so signatures stay comparable across processes and restarts. With 32-bit
+        # shingle hashes and multipliers, a * h + b stays below 2**64 and never overflows.
+        rng = np.random.default_rng(num_perm)
+        self._a = rng.integers(1, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SIGNATURE_VERSION:
+                # Signatures from another scheme cannot be compared with new ones
+                conn.executescript("DROP TABLE IF EXISTS signatures; DROP TABLE IF EXISTS buckets;")
+                conn.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+
+    def signature(self, text):
+        """Return the MinHash signature of a transcript as a uint64 array, or None if it has no words"""
+        import numpy as np
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+        # Hash each distinct word once, then combine word hashes into shingle hashes with numpy
+        vocab = {}
+        ids = np.array([vocab.setdefault(w, len(vocab)) for w in words])
+        word_hashes = np.array(
+            [int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "little") for w in vocab],
+            dtype=np.uint64
+        )[ids]
+        size = min(self.shingle_size, len(words))
+        count = len(words) - size + 1
+        shingles = np.zeros(count, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for k in range(size):
+                # Multiply-and-add wraps modulo 2**64, which is what a rolling hash wants
+                shingles = shingles * np.uint64(1099511628211) + word_hashes[k:k + count]
+        shingles = np.unique((shingles >> np.uint64(32)) ^ (shingles & np.uint64(0xFFFFFFFF)))
+        prime = np.uint64(_PRIME)
+        signature = np.full(len(self._a), prime, dtype=np.uint64)
+        for start in range(0, len(shingles), _BLOCK):
+            block = shingles[start:start + _BLOCK]
+            signature = np.minimum(signature, ((self._a * block + self._b) % prime).min(axis=1))
+        return signature
+
+    @staticmethod
+    def similarity(first, second):
+        """Estimated Jaccard similarity of two signatures"""
+        import numpy as np
+        return float(np.mean(np.asarray(first) == np.asarray(second)))
+
+    def _buckets(self, signature):
+        import numpy as np
+        for band in range(self.bands):
+            rows = np.asarray(signature[band * self.rows:(band + 1) * self.rows], dtype=np.uint64)
+            yield band, hashlib.blake2b(rows.tobytes(), digest_size=8).hexdigest()
+
+    def query(self, signature, exclude=None):
+        """Return [(source_key, similarity)] of indexed transcripts at or above the threshold, best first"""
+        if not self.enabled or signature is None:
+            return []
+        import numpy as np
+        buckets = list(self._buckets(signature))
+        with closing(self._connect()) as conn:
+            candidates = conn.execute(
+                "SELECT DISTINCT s.source_key, s.signature FROM buckets b "
+                "JOIN signatures s ON s.source_key = b.source_key WHERE "
+                + " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(buckets)),
+                [value for bucket in buckets for value in bucket]
+            ).fetchall()
+        matches = []
+        for source_key, blob in candidates:
+            if source_key == exclude:
+                continue
+            score = self.similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+            if score >= self.threshold:
+                matches.append((source_key, score))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def mode(self, similarity):
+        """What a match of this similarity is used for under the policy: "reuse", "adapt" or None"""
+        if not self.enabled or similarity < self.threshold:
+            return None
+        if self.policy == "auto":
+            return "reuse" if similarity >= self.reuse_threshold else "adapt"
+        return self.policy
+
+    def add(self, source_key, signature):
+        """Index a transcript's signature under its source key, replacing any earlier one"""
+        if not self.enabled or signature is None:
+            return
+        import numpy as np
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM buckets WHERE source_key = ?", (source_key,))
+            conn.execute(
+                "INSERT OR REPLACE INTO signatures (source_key, signature, added) VALUES (?, ?, ?)",
+                (source_key, np.asarray(signature, dtype=np.uint64).tobytes(), time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO buckets (band, bucket, source_key) VALUES (?, ?, ?)",
+                [(band, bucket, source_key) for band, bucket in self._buckets(signature)]
+            )
+            stale = [row[0] for row in conn.execute(
+                "SELECT source_key FROM signatures ORDER BY added DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            )]
+            if stale:
+                conn.executemany("DELETE FROM signatures WHERE source_key = ?", [(key,) for key in stale])
+                conn.executemany("DELETE FROM buckets WHERE source_key = ?", [(key,) for key in stale])
+            conn.execute("COMMIT")
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index():
+    """Return the process-wide index on the configured database; it holds no open connection"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = NearDuplicateIndex(
+                db_path=os.getenv("NEAR_DUPLICATE_DB"),
+                threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8")),
+                reuse_threshold=float(os.getenv("NEAR_DUPLICATE_REUSE_THRESHOLD", "0.95")),
+                policy=os.getenv("NEAR_DUPLICATE_POLICY", "off").lower(),
+                max_entries=int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "50000"))
+            )
+        return _default_index
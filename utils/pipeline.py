@@ -0,0 +1,153 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class StageTimeout(TimeoutError):
+    """Raised when a stage runs past its timeout"""
+
+
+class Stage:
+    """A unit of pipeline work that reads named inputs and produces named outputs.
+
+    ``fn`` is called with the inputs as keyword arguments. A stage with a single
+    output returns the value itself; a stage with several returns a dict.
+
+    Outputs listed in ``emits`` may be published before the stage finishes: ``fn``
+    then also receives an ``emit(**outputs)`` callback, and stages waiting only on
+    those outputs start right away.
+    """
+
+    def __init__(self, name, fn, inputs, outputs=None, timeout=None, emits=None):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs or [name])
+        self.timeout = timeout
+        self.emits = list(emits or [])
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs}, outputs={self.outputs})"
+
+
+class Pipeline:
+    """Runs stages on a thread pool as soon as their inputs are available"""
+
+    def __init__(self, stages=None, max_workers=4):
+        self.stages = []
+        self.max_workers = max_workers
+        for stage in stages or []:
+            self.add_stage(stage)
+
+    def add_stage(self, stage):
+        """Add a stage, replacing any existing stage with the same name"""
+        self.stages = [s for s in self.stages if s.name != stage.name]
+        produced = {o for s in self.stages for o in s.outputs}
+        clash = produced.intersection(stage.outputs)
+        if clash:
+            raise ValueError(f"Outputs {sorted(clash)} of stage '{stage.name}' are already produced by another stage")
+        self.stages.append(stage)
+        return self
+
+    def _needed_for(self, targets, values):
+        """The stages still to run to produce targets, directly or through their inputs"""
+        needed = set(targets) - set(values)
+        chosen = []
+        changed = True
+        while changed:
+            changed = False
+            for stage in self.stages:
+                if stage not in chosen and needed.intersection(o for o in stage.outputs if o not in values):
+                    chosen.append(stage)
+                    needed.update(stage.inputs)
+                    changed = True
+        return chosen
+
+    def run(self, values, on_stage_start=None, on_stage_done=None, initializer=None, targets=None):
+        """Run every stage whose outputs are not already in values and return all values.
+
+        With targets, only the stages needed to produce those outputs are run.
+        Callbacks run on the calling thread: on_stage_start(name) when a stage is
+        submitted and on_stage_done(name, outputs) when it finishes, before any
+        stage depending on it is started.
+        """
+        values = dict(values)
+        stages = self.stages if targets is None else self._needed_for(targets, values)
+        pending = [s for s in stages if not all(o in values for o in s.outputs)]
+        running = {}
+        # Early outputs per streaming stage, and a future that wakes the loop when one arrives
+        emitted = {}
+        signals = {}
+        lock = threading.Lock()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, initializer=initializer)
+
+        def emitter(stage):
+            def emit(**outputs):
+                unknown = set(outputs) - set(stage.emits)
+                if unknown:
+                    raise ValueError(f"Stage '{stage.name}' cannot emit {sorted(unknown)}")
+                with lock:
+                    emitted[stage.name].update(outputs)
+                    signal = signals.get(stage.name)
+                    if signal is not None and not signal.done():
+                        signal.set_result(None)
+            return emit
+
+        def new_signal(stage):
+            signal = Future()
+            signals[stage.name] = signal
+            running[signal] = (stage, None)
+
+        try:
+            while pending or running:
+                for stage in [s for s in pending if all(i in values for i in s.inputs)]:
+                    pending.remove(stage)
+                    if on_stage_start:
+                        on_stage_start(stage.name)
+                    kwargs = {i: values[i] for i in stage.inputs}
+                    if stage.emits:
+                        emitted[stage.name] = {}
+                        kwargs["emit"] = emitter(stage)
+                        with lock:
+                            new_signal(stage)
+                    # Copy the caller's context so tracing spans land in the current run
+                    future = executor.submit(contextvars.copy_context().run, stage.fn, **kwargs)
+                    deadline = time.monotonic() + stage.timeout if stage.timeout else None
+                    running[future] = (stage, deadline)
+
+                if not running:
+                    missing = sorted({i for s in pending for i in s.inputs if i not in values})
+                    raise ValueError(f"Stages {[s.name for s in pending]} are waiting on inputs nobody produces: {missing}")
+
+                deadlines = [d for _, d in running.values() if d is not None]
+                wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    if future not in running:
+                        continue  # signal of a stage that finished earlier in this batch
+                    stage, _ = running.pop(future)
+                    if signals.get(stage.name) is future:
+                        # Publish early outputs so stages waiting on them can start
+                        with lock:
+                            values.update(emitted[stage.name])
+                            new_signal(stage)
+                        continue
+                    result = future.result()
+                    outputs = result if len(stage.outputs) > 1 else {stage.outputs[0]: result}
+                    if stage.emits:
+                        with lock:
+                            running.pop(signals.pop(stage.name), None)
+                            outputs = {**emitted.pop(stage.name), **outputs}
+                    values.update({o: outputs[o] for o in stage.outputs})
+                    if on_stage_done:
+                        on_stage_done(stage.name, {o: outputs[o] for o in stage.outputs})
+
+                now = time.monotonic()
+                for stage, deadline in running.values():
+                    if deadline is not None and now >= deadline:
+                        raise StageTimeout(f"Stage '{stage.name}' timed out after {stage.timeout}s")
+            return values
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,107 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    source_key TEXT NOT NULL,
+    output TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (source_key, output)
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class DegradedOutput(dict):
+    """A fallback result an agent built because the model's reply was unusable.
+
+    It is used like the dict it holds, but is never stored in the result cache,
+    so one bad reply does not stick to a video for every later run.
+    """
+
+
+def is_degraded(value):
+    return isinstance(value, DegradedOutput)
+
+
+class ResultCache:
+    """Pipeline outputs shared across sessions and processes, keyed by input and stage fingerprint.
+
+    Each output is stored under the fingerprint of the prompts and models that
+    produced it (and of every stage upstream). A changed prompt therefore only
+    misses for its own stage and the ones after it. Entries are evicted least
+    recently used first once there are more than ``max_entries``.
+    """
+
+    def __init__(self, db_path=None, max_entries=5000, enabled=True):
+        self.enabled = enabled
+        self.db_path = Path(db_path or Path("data") / "results.db")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+
+    def get_many(self, source_key, fingerprints):
+        """Return {output: value} for every output cached under its current fingerprint"""
+        if not self.enabled:
+            return {}
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT output, fingerprint, value FROM results WHERE source_key = ?", (source_key,)
+            ).fetchall()
+            hits = {output: json.loads(value) for output, fingerprint, value in rows
+                    if fingerprints.get(output) == fingerprint}
+            if hits:
+                conn.executemany(
+                    "UPDATE results SET last_used = ? WHERE source_key = ? AND output = ?",
+                    [(time.time(), source_key, output) for output in hits]
+                )
+        return hits
+
+    def put(self, source_key, output, fingerprint, value):
+        """Store an output, replacing any copy produced under an older fingerprint; degraded outputs are skipped"""
+        if not self.enabled or is_degraded(value):
+            return
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (source_key, output, fingerprint, value, last_used) VALUES (?, ?, ?, ?, ?)",
+                (source_key, output, fingerprint, json.dumps(value), time.time())
+            )
+            conn.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, source_key):
+        """Forget every cached output of one input"""
+        with closing(self._connect()) as conn:
+            conn.execute("DELETE FROM results WHERE source_key = ?", (source_key,))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide cache on the configured database; it holds no open connection"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache(
+                db_path=os.getenv("RESULT_CACHE_DB"),
+                max_entries=int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "5000")),
+                enabled=os.getenv("RESULT_CACHE", "on").lower() not in ("0", "off", "false")
+            )
+        return _default_cache
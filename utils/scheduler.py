@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` units per minute.
+
+    ``reserve`` debits immediately and returns how long the caller must wait before
+    using the reservation, so sync and async callers can share one bucket.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.available = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take ``amount`` units and return the seconds to wait until they are covered"""
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            # Never ask for more than a full bucket, or a single large request would wait forever
+            self.available -= min(amount, self.capacity)
+            return max(0.0, -self.available / self.rate)
+
+    def refund(self, amount):
+        """Return over-reserved units (or charge extra ones when ``amount`` is negative)"""
+        with self._lock:
+            self.available = min(self.capacity, self.available + amount)
+
+
+def is_retryable(error):
+    """True for rate limits, timeouts, dropped connections and 5xx responses"""
+    # Imported here so the scheduler does not load openai for callers that never fail
+    import openai
+
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def _retry_after(error):
+    """Seconds the server asked us to wait, if it said"""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """Single gate for every LLM call: request/token budgets, retries and hedging.
+
+    Each call reserves one request and its estimated tokens from the RPM/TPM
+    buckets, waiting when the budget is spent. Retryable failures back off with
+    full jitter (or the server's Retry-After) up to ``max_retries`` times. With
+    ``hedge_after`` set, a non-streaming call still running after that many
+    seconds gets a duplicate request and the first success wins.
+    """
+
+    def __init__(self, rpm=0, tpm=0, max_retries=5, base_delay=1.0, max_delay=30.0, hedge_after=None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after or None
+        self._hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm-hedge")
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.hedges = 0
+        self.throttled_ms = 0.0
+
+    def _reserve(self, tokens):
+        delay = 0.0
+        if self.requests:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        with self._lock:
+            self.throttled_ms += delay * 1000
+        return delay
+
+    def _backoff(self, attempt, error):
+        delay = _retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def record_usage(self, estimated_tokens, actual_tokens):
+        """Correct the token budget once the real usage of a call is known"""
+        if self.tokens and actual_tokens:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    @staticmethod
+    def _note(span, key, amount):
+        if span is not None:
+            span[key] = round(span.get(key, 0) + amount, 2)
+
+    def call(self, fn, tokens=0, span=None, hedge=True):
+        """Run ``fn()`` under the budgets, retrying transient errors; blocks the calling thread"""
+        for attempt in range(self.max_retries + 1):
+            delay = self._reserve(tokens)
+            self._note(span, "queue_ms", delay * 1000)
+            time.sleep(delay)
+            try:
+                if hedge and self.hedge_after:
+                    return self._hedged(fn, tokens, span)
+                return fn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self._note(span, "retries", 1)
+                time.sleep(self._backoff(attempt, e))
+
+    def _hedged(self, fn, tokens, span):
+        first = self._hedge_pool.submit(contextvars.copy_context().run, fn)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        with self._lock:
+            self.hedges += 1
+        self._note(span, "hedges", 1)
+        time.sleep(self._reserve(tokens))
+        pending = {first, self._hedge_pool.submit(contextvars.copy_context().run, fn)}
+        # The slower request cannot be cancelled mid-flight; its result is simply dropped
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f.exception() is not None):
+                if future.exception() is None or not pending:
+                    return future.result()
+
+    def stream(self, fn, tokens=0, span=None):
+        """Yield from the iterator ``fn()`` returns, retrying only failures before the first chunk"""
+        for attempt in range(self.max_retries + 1):
+            delay = self._reserve(tokens)
+            self._note(span, "queue_ms", delay * 1000)
+            time.sleep(delay)
+            started = False
+            try:
+                for chunk in fn():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                # Once text has been handed on, a retry would duplicate it
+                if started or attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self._note(span, "retries", 1)
+                time.sleep(self._backoff(attempt, e))
+
+    async def acall(self, fn, tokens=0, span=None, hedge=True):
+        """Await ``fn()`` under the budgets, retrying transient errors and hedging slow calls"""
+        for attempt in range(self.max_retries + 1):
+            delay = self._reserve(tokens)
+            self._note(span, "queue_ms", delay * 1000)
+            await asyncio.sleep(delay)
+            try:
+                if hedge and self.hedge_after:
+                    return await self._ahedged(fn, tokens, span)
+                return await fn()
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                self._note(span, "retries", 1)
+                await asyncio.sleep(self._backoff(attempt, e))
+
+    async def _ahedged(self, fn, tokens, span):
+        first = asyncio.ensure_future(fn())
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        with self._lock:
+            self.hedges += 1
+        self._note(span, "hedges", 1)
+        await asyncio.sleep(self._reserve(tokens))
+        pending = {first, asyncio.ensure_future(fn())}
+        try:
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t.exception() is not None):
+                    if task.exception() is None or not pending:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        """Return retry, hedge and throttling counters"""
+        with self._lock:
+            return {"retries": self.retries, "hedges": self.hedges, "throttled_ms": round(self.throttled_ms, 2)}
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Return the process-wide scheduler that every agent's LLM calls go through"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler(
+                rpm=int(os.getenv("LLM_RPM", "500")),
+                tpm=int(os.getenv("LLM_TPM", "150000")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "5")),
+                hedge_after=float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "0"))
+            )
+        return _default_scheduler
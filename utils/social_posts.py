@@ -0,0 +1,120 @@
+import re
+
+# Length and hashtag limits per platform, shared by the LangChain and Swarm social agents
+PLATFORM_CONSTRAINTS = {
+    "twitter": {"max_length": 280, "hashtag_limit": 3},
+    "linkedin": {"max_length": 3000, "hashtag_limit": 5},
+    "facebook": {"max_length": 5000, "hashtag_limit": 10},
+    "instagram": {"max_length": 2200, "hashtag_limit": 30}
+}
+
+# Posts over the length limit by at most this share of it are trimmed locally instead of regenerated
+MAX_TRIM_RATIO = 0.15
+
+_HASHTAG = re.compile(r'(?<![\w#])#\w+')
+_TRAILING_HASHTAGS = re.compile(r'(?:\s*(?<![\w#])#\w+)+\s*$')
+_SENTENCE_END = re.compile(r'[.!?](?=\s)')
+
+
+def post_text(post):
+    """The text of a post, whether the model returned a string or an object with a content field"""
+    if isinstance(post, dict):
+        post = post.get("content") or post.get("text") or ""
+    elif isinstance(post, list):
+        post = "\n\n".join(post_text(p) for p in post)
+    return str(post or "").strip()
+
+
+def hashtags(text):
+    """The hashtags in a post, in order"""
+    return _HASHTAG.findall(text)
+
+
+def check_post(text, constraints):
+    """Return the constraint violations of a post, empty when it complies"""
+    problems = []
+    if not text:
+        return ["post is missing"]
+    max_length = constraints.get("max_length")
+    if max_length and len(text) > max_length:
+        problems.append(f"{len(text)} characters, limit is {max_length}")
+    hashtag_limit = constraints.get("hashtag_limit")
+    count = len(hashtags(text))
+    if hashtag_limit is not None and count > hashtag_limit:
+        problems.append(f"{count} hashtags, limit is {hashtag_limit}")
+    return problems
+
+
+def _trim_hashtags(text, limit):
+    """Remove every hashtag after the first ``limit``, with the space before it"""
+    kept = 0
+    parts = []
+    last = 0
+    for match in _HASHTAG.finditer(text):
+        kept += 1
+        if kept > limit:
+            parts.append(text[last:match.start()].rstrip(" "))
+            last = match.end()
+    parts.append(text[last:])
+    return re.sub(r' {2,}', ' ', "".join(parts)).strip()
+
+
+def _shorten(text, max_length):
+    """Cut text to max_length, keeping its trailing hashtags when they fit and ending on a sentence or word"""
+    tags = _TRAILING_HASHTAGS.search(text)
+    body, tags = (text[:tags.start()], " " + tags.group(0).strip()) if tags else (text, "")
+    budget = max_length - len(tags)
+    if budget < max_length // 2:
+        body, tags, budget = text, "", max_length
+    if len(body) <= budget:
+        return (body + tags).strip()
+    cut = body[:budget]
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut + " ")]
+    if ends and ends[-1] >= budget * 0.6:
+        cut = cut[:ends[-1]]
+    else:
+        cut = cut[:budget - 1].rsplit(None, 1)[0].rstrip(",;:-") + "…"
+    return (cut + tags).strip()
+
+
+def repair_post(text, constraints, max_trim=MAX_TRIM_RATIO):
+    """Fix small violations locally: drop extra hashtags and trim a slightly long post.
+
+    Returns the repaired text, or None when the post needs more than ``max_trim``
+    of its length limit cut (or is missing) and should be regenerated instead.
+    ``max_trim=None`` trims however much it takes.
+    """
+    if not text:
+        return None
+    hashtag_limit = constraints.get("hashtag_limit")
+    if hashtag_limit is not None:
+        text = _trim_hashtags(text, hashtag_limit)
+    max_length = constraints.get("max_length")
+    if max_length and len(text) > max_length:
+        if max_trim is not None and len(text) > max_length * (1 + max_trim):
+            return None
+        text = _shorten(text, max_length)
+    return text
+
+
+def enforce_constraints(posts, platforms, constraints=PLATFORM_CONSTRAINTS):
+    """Check each platform's post against its constraints, repairing small violations.
+
+    Returns ``(valid, failed)``: ``valid`` maps platforms to compliant post text,
+    ``failed`` maps the platforms that need regenerating to ``(text, problems)``.
+    """
+    valid, failed = {}, {}
+    posts = posts if isinstance(posts, dict) else {}
+    for platform in platforms:
+        text = post_text(posts.get(platform))
+        limits = constraints.get(platform, {})
+        problems = check_post(text, limits)
+        if not problems:
+            valid[platform] = text
+            continue
+        repaired = repair_post(text, limits)
+        if repaired is not None:
+            valid[platform] = repaired
+        else:
+            failed[platform] = (text, problems)
+    return valid, failed
@@ -0,0 +1,67 @@
+import hashlib
+import re
+
+# OpenAI models average roughly four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Cheap token count estimate that needs no tokenizer"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def cached_prompt_tokens(usage):
+    """Prompt tokens the provider served from its prefix cache, read from a usage dict or object"""
+    if not usage:
+        return 0
+    details = usage.get("prompt_tokens_details") if isinstance(usage, dict) else getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens") or 0
+    return getattr(details, "cached_tokens", None) or 0
+
+
+def prompt_fingerprint(*parts):
+    """Short hash of a prompt's static prefix, so spans show which requests could share a cached prefix"""
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def split_into_windows(text, max_tokens, overlap_tokens=0):
+    """Split text into consecutive windows of at most max_tokens, cut on sentence boundaries.
+
+    Consecutive windows share about overlap_tokens of trailing text so that
+    ideas spanning a cut are seen whole by at least one window.
+    """
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    windows = []
+    current = []
+    current_tokens = 0
+    for sentence in sentences:
+        # Hard-wrap sentences that are longer than a window on their own
+        while estimate_tokens(sentence) > max_tokens:
+            cut = max_tokens * CHARS_PER_TOKEN
+            cut = sentence.rfind(' ', 0, cut) if ' ' in sentence[:cut] else cut
+            head, sentence = sentence[:cut], sentence[cut:].lstrip()
+            if current:
+                windows.append(' '.join(current))
+                current, current_tokens = [], 0
+            windows.append(head)
+
+        tokens = estimate_tokens(sentence) + 1  # joining space and rounding
+        if current and current_tokens + tokens > max_tokens:
+            windows.append(' '.join(current))
+            # Carry the tail of the previous window over as overlap
+            overlap = []
+            overlap_count = 0
+            for previous in reversed(current):
+                overlap_count += estimate_tokens(previous)
+                if overlap_count > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+            current = overlap
+            current_tokens = sum(estimate_tokens(s) + 1 for s in current)
+        current.append(sentence)
+        current_tokens += tokens
+
+    if current:
+        windows.append(' '.join(current))
+    return [w for w in windows if w]
@@ -0,0 +1,114 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+_current_run = contextvars.ContextVar("trace_run_id", default=None)
+
+
+def current_run_id():
+    """Return the run ID of the active trace, or None outside a run"""
+    return _current_run.get()
+
+
+class Tracer:
+    """Collects per-call spans (latency, queue wait, tokens, cache hits, errors) grouped by run ID"""
+
+    def __init__(self, trace_dir=None, max_runs=200):
+        self.trace_dir = Path(trace_dir or Path("data") / "traces")
+        self.max_runs = max_runs
+        self._runs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def run(self, run_id=None):
+        """Group every span recorded inside the block under one run ID and export it on exit"""
+        run_id = run_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._runs.setdefault(run_id, [])
+            while len(self._runs) > self.max_runs:
+                self._runs.popitem(last=False)
+        token = _current_run.set(run_id)
+        try:
+            yield run_id
+        finally:
+            _current_run.reset(token)
+            self.export_jsonl(run_id)
+
+    @contextmanager
+    def span(self, stage, agent=None, model=None, queue_ms=0.0):
+        """Time the block and record it; the yielded dict can be updated with tokens and cache hits"""
+        record = {
+            "run_id": current_run_id(),
+            "stage": stage,
+            "agent": agent or stage,
+            "model": model,
+            "start": time.time(),
+            "wall_ms": 0.0,
+            "queue_ms": round(queue_ms, 2),
+            "prompt_tokens": 0,
+            "cached_prompt_tokens": 0,
+            "completion_tokens": 0,
+            "prompt_prefix": None,
+            "cache_hit": False,
+            "error": None
+        }
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self._record(record)
+
+    def _record(self, record):
+        run_id = record["run_id"]
+        if run_id is None:
+            return
+        with self._lock:
+            self._runs.setdefault(run_id, []).append(record)
+
+    def spans(self, run_id):
+        """Return the spans recorded for a run, ordered by start time"""
+        with self._lock:
+            return sorted(self._runs.get(run_id, []), key=lambda s: s["start"])
+
+    def timeline(self, run_id):
+        """Return spans with start offsets relative to the first span, for display"""
+        spans = self.spans(run_id)
+        origin = spans[0]["start"] if spans else 0
+        return [{**s, "offset_ms": round((s["start"] - origin) * 1000, 2)} for s in spans]
+
+    def to_jsonl(self, run_id):
+        return "".join(json.dumps(s) + "\n" for s in self.spans(run_id))
+
+    def export_jsonl(self, run_id, path=None):
+        """Write a run's spans to a JSONL file and return its path"""
+        spans = self.to_jsonl(run_id)
+        if not spans:
+            return None
+        path = Path(path) if path else self.trace_dir / f"{run_id}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(spans)
+        return path
+
+
+_default_tracer = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Return the process-wide tracer"""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer(trace_dir=os.getenv("TRACE_DIR"))
+        return _default_tracer
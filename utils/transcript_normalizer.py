@@ -0,0 +1,136 @@
+import re
+from utils.tokens import estimate_tokens
+
+_NON_SPEECH = re.compile(
+    r'\[(?:music|applause|laughter|laughs|inaudible|silence|cheering|crosstalk|noise|background noise|__)\]'
+    r'|\((?:music|applause|laughter|laughs|inaudible)\)'
+    r'|[♪♫]+[^♪♫]*[♪♫]+|[♪♫]+'
+    r'|^\s*>>\s*|(?<=\s)>>\s*',
+    re.IGNORECASE
+)
+_FILLERS = re.compile(r'\b(?:um+|uh+|erm+|hmm+|mhm+|uh-huh)\b[,.]?\s*', re.IGNORECASE)
+_WORD = re.compile(r'[\w\']+')
+_WHITESPACE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT = re.compile(r'\s+([,.!?;:])')
+_PUNCT = re.compile(r'[,.!?;:]')
+# Words whose immediate repeat is a stutter; a doubled "that" or "had" is often grammatical
+STUTTER_WORDS = frozenset(
+    "i i'm i've a an the and but so or to of we you it it's they he she my this like just".split()
+)
+
+
+def _norm(word):
+    match = _WORD.search(word.lower())
+    return match.group(0) if match else word.lower()
+
+
+def drop_caption_overlap(segments):
+    """Remove the words each rolling caption repeats from the end of the previous one"""
+    result = []
+    previous = []
+    for segment in segments:
+        words = segment.split()
+        if not words:
+            continue
+        keys = [_norm(w) for w in words]
+        overlap = 0
+        for size in range(min(len(previous), len(keys)), 0, -1):
+            if previous[-size:] == keys[:size]:
+                overlap = size
+                break
+        # Single-word overlaps are usually coincidence unless the whole segment repeats
+        if overlap == 1 and len(keys) > 1:
+            overlap = 0
+        remaining = words[overlap:]
+        if remaining:
+            result.append(' '.join(remaining))
+        previous = keys
+    return result
+
+
+def strip_non_speech(text):
+    """Remove [Music]/[Applause]-style markers, music notes and speaker-change arrows"""
+    return _NON_SPEECH.sub(' ', text)
+
+
+def strip_fillers(text):
+    """Remove filler sounds such as um, uh and erm"""
+    return _FILLERS.sub('', text)
+
+
+def collapse_repetition(text, max_phrase_words=6):
+    """Collapse stutters in spoken captions: repeated phrases ("you know you know") and stutter words ("the the").
+
+    Phrases of two or more words are collapsed whatever their words; a single
+    repeated word only if it is in STUTTER_WORDS. A copy with punctuation in it
+    ("no, no") is deliberate and kept. The last copy is the one kept, with its
+    punctuation.
+    """
+    words = text.split()
+    for size in range(max_phrase_words, 0, -1):
+        keys = [_norm(w) for w in words]
+        result = []
+        result_keys = []
+        for word, key in zip(words, keys):
+            result.append(word)
+            result_keys.append(key)
+            if len(result_keys) < 2 * size or result_keys[-size:] != result_keys[-2 * size:-size]:
+                continue
+            if size == 1 and key not in STUTTER_WORDS:
+                continue
+            earlier = result[-2 * size:-size]
+            if any(_PUNCT.search(w) for w in earlier):
+                continue
+            del result[-2 * size:-size]
+            del result_keys[-2 * size:-size]
+        words = result
+    return ' '.join(words)
+
+
+def tidy_whitespace(text):
+    return _SPACE_BEFORE_PUNCT.sub(r'\1', _WHITESPACE.sub(' ', text)).strip()
+
+
+DEFAULT_SEGMENT_RULES = [drop_caption_overlap]
+DEFAULT_TEXT_RULES = [strip_non_speech, strip_fillers, collapse_repetition, tidy_whitespace]
+# Pasted text has no rolling captions or caption stutter to undo
+PASTED_TEXT_RULES = [strip_non_speech, strip_fillers, tidy_whitespace]
+
+
+class TranscriptNormalizer:
+    """Local, rule-based cleanup that shrinks transcripts before they reach any LLM.
+
+    Segment rules take and return a list of caption strings; text rules take and
+    return the joined text. Pasted text gets only the pasted text rules. All the
+    lists can be replaced or extended.
+    """
+
+    def __init__(self, segment_rules=None, text_rules=None, pasted_text_rules=None):
+        self.segment_rules = list(DEFAULT_SEGMENT_RULES if segment_rules is None else segment_rules)
+        self.text_rules = list(DEFAULT_TEXT_RULES if text_rules is None else text_rules)
+        self.pasted_text_rules = list(PASTED_TEXT_RULES if pasted_text_rules is None else pasted_text_rules)
+
+    def normalize(self, segments):
+        """Normalize caption segments and report the token savings"""
+        return self._apply(segments, self.segment_rules, self.text_rules)
+
+    def _apply(self, segments, segment_rules, text_rules):
+        original = ' '.join(segments)
+        for rule in segment_rules:
+            segments = rule(segments)
+        text = ' '.join(segments)
+        for rule in text_rules:
+            text = rule(text)
+
+        tokens_before = estimate_tokens(original)
+        tokens_after = estimate_tokens(text)
+        return {
+            "text": text,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after
+        }
+
+    def normalize_text(self, text):
+        """Normalize pasted text, which is only stripped of non-speech markers and fillers"""
+        return self._apply(text.splitlines(), [], self.pasted_text_rules)
@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class TranscriptStore:
+    """Gzip-compressed on-disk store of transcripts keyed by YouTube video ID"""
+
+    def __init__(self, store_dir=None, ttl_seconds=7 * 24 * 3600, max_bytes=500 * 1024 * 1024):
+        self.store_dir = Path(store_dir or Path("data") / "transcript_store")
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # video_id -> (lock, number of callers holding or waiting for it)
+        self._fetch_locks = {}
+        # Entries least recently used first as path -> (mtime, size), with their total size. A hit
+        # touches the file's mtime. Scanned once here and kept up to date by get, put and eviction,
+        # so a put never rescans the directory
+        self._entries = OrderedDict()
+        self._total = 0
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        for path in self.store_dir.glob("*.json.gz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        with self._lock:
+            self._entries = OrderedDict((path, (mtime, size)) for mtime, size, path in sorted(entries))
+            self._total = sum(size for _, size, _ in entries)
+
+    def _path(self, video_id):
+        name = video_id if _VIDEO_ID.match(video_id) else hashlib.sha256(video_id.encode("utf-8")).hexdigest()
+        return self.store_dir / f"{name}.json.gz"
+
+    def get(self, video_id, allow_stale=False):
+        """Return the stored entry for video_id, or None if missing or expired"""
+        path = self._path(video_id)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not allow_stale and time.time() - entry["fetched_at"] > self.ttl_seconds:
+            return None
+        self._touch(path)
+        return entry
+
+    def _touch(self, path):
+        """Mark an entry as just used, so the size cap evicts it last"""
+        now = time.time()
+        with self._lock:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                return
+            if path in self._entries:
+                self._entries[path] = (now, self._entries[path][1])
+                self._entries.move_to_end(path)
+
+    def put(self, video_id, segments, text):
+        """Store the raw segment list and joined text for video_id"""
+        entry = {"video_id": video_id, "segments": segments, "text": text, "fetched_at": time.time()}
+        path = self._path(video_id)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            _, old_size = self._entries.pop(path, (0, 0))
+            self._entries[path] = (entry["fetched_at"], path.stat().st_size)
+            self._total += self._entries[path][1] - old_size
+        self._evict()
+        return entry
+
+    def get_or_fetch(self, video_id, fetch):
+        """Return the stored entry, calling fetch(video_id) -> (segments, text) on a miss.
+
+        Concurrent callers for the same video share one fetch. If the fetch fails
+        and an expired entry exists, the expired entry is served instead.
+        """
+        entry = self.get(video_id)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            fetch_lock, holders = self._fetch_locks.get(video_id, (None, 0))
+            fetch_lock = fetch_lock or threading.Lock()
+            self._fetch_locks[video_id] = (fetch_lock, holders + 1)
+        try:
+            with fetch_lock:
+                # Another caller may have fetched it while we waited
+                entry = self.get(video_id)
+                if entry is not None:
+                    return entry
+                try:
+                    segments, text = fetch(video_id)
+                except Exception:
+                    stale = self.get(video_id, allow_stale=True)
+                    if stale is not None:
+                        return stale
+                    raise
+                return self.put(video_id, segments, text)
+        finally:
+            # The lock is dropped only by its last holder, so a waiter never ends up with a fresh one
+            with self._lock:
+                _, holders = self._fetch_locks[video_id]
+                if holders == 1:
+                    del self._fetch_locks[video_id]
+                else:
+                    self._fetch_locks[video_id] = (fetch_lock, holders - 1)
+
+    def _evict(self):
+        """Drop entries unused for several TTLs, then the least recently used until under the size cap.
+
+        Expired entries are kept for a while so they can stand in when the upstream fails.
+        """
+        with self._lock:
+            now = time.time()
+            while self._entries:
+                path, (mtime, size) = next(iter(self._entries.items()))
+                if now - mtime <= self.ttl_seconds * 4 and self._total <= self.max_bytes:
+                    break
+                self._entries.popitem(last=False)
+                self._total -= size
+                path.unlink(missing_ok=True)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_transcript_store():
+    """Return the process-wide transcript store"""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = TranscriptStore(
+                store_dir=os.getenv("TRANSCRIPT_STORE_DIR"),
+                ttl_seconds=int(os.getenv("TRANSCRIPT_TTL_HOURS", "168")) * 3600,
+                max_bytes=int(os.getenv("TRANSCRIPT_STORE_MAX_MB", "500")) * 1024 * 1024
+            )
+        return _default_store
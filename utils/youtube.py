@@ -0,0 +1,72 @@
+import re
+from urllib.parse import urlparse, parse_qs
+from utils.http_clients import YOUTUBE_ORIGIN, get_youtube_session
+
+YOUTUBE_HOSTS = ('youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com')
+
+# Video entries on playlist pages, channel tabs and their continuation responses
+_VIDEO_ENTRY = re.compile(
+    r'"(?:playlistVideoRenderer|videoRenderer|gridVideoRenderer|reelItemRenderer)":\{"videoId":"([A-Za-z0-9_-]{11})"'
+)
+_CONTINUATION = re.compile(r'"continuationCommand":\{"token":"([^"]+)"')
+_API_KEY = re.compile(r'"INNERTUBE_API_KEY":"([^"]+)"')
+_CLIENT_VERSION = re.compile(r'"INNERTUBE_CLIENT_VERSION":"([^"]+)"')
+_CHANNEL_PATH = re.compile(r'^/(@[^/]+|channel/[^/]+|c/[^/]+|user/[^/]+)(?:/[^/]*)?$')
+
+
+def collection_url(url):
+    """Return the listing page for a playlist or channel URL, or None for anything else"""
+    parsed_url = urlparse(url)
+    if parsed_url.hostname not in YOUTUBE_HOSTS:
+        return None
+    if parsed_url.path == '/playlist':
+        playlist_id = parse_qs(parsed_url.query).get('list')
+        return f"{YOUTUBE_ORIGIN}/playlist?list={playlist_id[0]}" if playlist_id else None
+    match = _CHANNEL_PATH.match(parsed_url.path.rstrip('/'))
+    if match:
+        return f"{YOUTUBE_ORIGIN}/{match.group(1)}/videos"
+    return None
+
+
+def list_video_ids(url, limit=None):
+    """Return the video IDs of a playlist or channel URL in page order, following continuations.
+
+    Raises ValueError for URLs that are not playlists or channels.
+    """
+    listing_url = collection_url(url)
+    if listing_url is None:
+        raise ValueError("Not a YouTube playlist or channel URL")
+
+    session = get_youtube_session()
+    response = session.get(listing_url, headers={'Accept-Language': 'en-US'})
+    response.raise_for_status()
+    page = response.text
+
+    api_key = _API_KEY.search(page)
+    client_version = _CLIENT_VERSION.search(page)
+    video_ids = []
+    seen = set()
+    while True:
+        found = len(video_ids)
+        for video_id in _VIDEO_ENTRY.findall(page):
+            if video_id not in seen:
+                seen.add(video_id)
+                video_ids.append(video_id)
+        if limit and len(video_ids) >= limit:
+            return video_ids[:limit]
+
+        continuation = _CONTINUATION.search(page)
+        # A page without new videos means the listing is exhausted, whatever its token says
+        if not (continuation and api_key and client_version) or len(video_ids) == found:
+            return video_ids
+        # Later pages come from the same browse endpoint the web client scrolls with
+        response = session.post(
+            f"{YOUTUBE_ORIGIN}/youtubei/v1/browse",
+            params={'key': api_key.group(1)},
+            json={
+                'context': {'client': {'clientName': 'WEB', 'clientVersion': client_version.group(1)}},
+                'continuation': continuation.group(1)
+            }
+        )
+        response.raise_for_status()
+        page = response.text
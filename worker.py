@@ -0,0 +1,118 @@
+"""Background workers that run pipeline jobs submitted by the web app.
+
+Usage:
+    python worker.py --processes 4
+
+Each process claims queued jobs from the SQLite job queue (JOB_DB), runs the
+content pipeline and records every stage as it starts and finishes, so the
+app can show progress and partial results. Throughput scales with the number
+of worker processes rather than with open browser sessions.
+"""
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from agents.content_pipeline import build_content_pipeline, output_fingerprints, run_cached
+from agents.registry import get_agents
+from utils.config import load_config
+from utils.job_queue import get_job_queue
+from utils.result_cache import get_result_cache
+from utils.tracing import get_tracer
+
+
+def run_job(job, queue, agents):
+    """Run one claimed job, recording stage events, and mark it done or failed"""
+    options = {
+        "social_from_draft": job["options"].get("social_from_draft", False),
+        "incremental_edit": job["options"].get("incremental_edit", False),
+        "overlap_edit": job["options"].get("overlap_edit", False)
+    }
+    from utils.near_duplicates import get_near_duplicate_index
+    pipeline = build_content_pipeline(agents, **options)
+    tracer = get_tracer()
+    # The job ID doubles as the trace run ID, so artifacts and traces line up with the job
+    with tracer.run(run_id=job["id"]) as run_id:
+        try:
+            run_cached(
+                pipeline, agents, job["source"], output_fingerprints(agents, **options), get_result_cache(),
+                # Cached outputs show up as one finished "cache" stage
+                on_cached=lambda values: queue.add_event(job["id"], "done", "cache", values),
+                near_duplicates=get_near_duplicate_index(),
+                on_stage_start=lambda name: queue.add_event(job["id"], "start", name),
+                on_stage_done=lambda name, outputs: queue.add_event(job["id"], "done", name, outputs)
+            )
+        except Exception as e:
+            print(f"Job {job['id']} failed: {str(e)}")
+            queue.fail(job["id"], f"{type(e).__name__}: {e}", trace=tracer.timeline(run_id))
+            return
+    queue.finish(job["id"], trace=tracer.timeline(run_id))
+
+
+def work(worker_id, poll_interval=0.5, heartbeat_interval=5.0):
+    """Claim and run jobs until interrupted"""
+    queue = get_job_queue()
+    agents = get_agents()
+    stop = threading.Event()
+
+    def beat():
+        # Heartbeats continue while a long job runs, so the job is not requeued under us
+        while not stop.is_set():
+            queue.heartbeat(worker_id)
+            stop.wait(heartbeat_interval)
+
+    threading.Thread(target=beat, name="worker-heartbeat", daemon=True).start()
+    print(f"Worker {worker_id} ready")
+    try:
+        while True:
+            job = queue.claim(worker_id)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            print(f"Worker {worker_id} running job {job['id']}")
+            run_job(job, queue, agents)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background pipeline workers")
+    parser.add_argument("--processes", "-p", type=int, default=int(os.getenv("JOB_WORKERS", "2")),
+                        help="Worker processes to start")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds between polls of an empty queue")
+    args = parser.parse_args()
+    load_config()
+
+    queue = get_job_queue()
+    requeued = queue.requeue_stale()
+    if requeued:
+        print(f"Requeued {requeued} jobs left running by stopped workers")
+
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    processes = [
+        multiprocessing.Process(target=work, args=(f"{prefix}-{i}", args.poll_interval), name=f"worker-{i}")
+        for i in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    # Treat SIGTERM like Ctrl-C so the workers are stopped with the parent
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while any(p.is_alive() for p in processes):
+            time.sleep(queue.heartbeat_timeout / 2)
+            queue.requeue_stale()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+if __name__ == "__main__":
+    main()